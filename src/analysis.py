@@ -0,0 +1,424 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+from xml.dom import minidom
+from multiprocessing import Process, Queue
+import datetime
+import time
+
+from preprocessor import Preprocessor
+from parser import Parser
+from db_manager import DatabaseManager
+from info_store import InfoStore
+from metrics import Metrics, timed_get, tu_metrics, write_summary
+
+
+# number of translation units written to the database per transaction
+DB_COMMIT_INTERVAL = 16
+
+# log level selected by default in the execute pane
+DEFAULT_LOG_LEVEL = 'WARNING'
+
+
+def analyze(snd_pipe, db_path, pp_cfg, parser_cfg, srcFiles, use_pipeline=False, analyzer_process=1, pp_process=1, parser_process=1, bulk_load=False, incremental=False):
+    db = DatabaseManager()
+
+    #
+    # files shared by the processes of this run. results cross the queues as
+    # InfoStore handles and headers which come out the same are stored once
+    #
+    run_dir = tempfile.mkdtemp(prefix='pycodeanalyzer-')
+    info_store = InfoStore(os.path.join(run_dir, 'info'))
+
+    #
+    # without a persistent token cache the workers share a token store for this run,
+    # so each file is tokenized once no matter how many workers include it
+    #
+    if (pp_process if use_pipeline else analyzer_process) > 1 and not pp_cfg.get('tokenCacheDir'):
+        pp_cfg = dict(pp_cfg, tokenCacheDir=os.path.join(run_dir, 'tokens'), tokenCacheSize=sys.maxint)
+
+    pp_list = [Preprocessor(**pp_cfg) for i in range(pp_process if use_pipeline else analyzer_process)]
+    parser_list = [Parser(**parser_cfg) for i in range(parser_process if use_pipeline else analyzer_process)]
+    use_pipeline = use_pipeline
+
+    t_0 = datetime.datetime.now()
+
+    main_metrics = Metrics('main')
+    file_metrics = {}
+
+    # the database is replaced below, so read the timings of the previous run first
+    timings = DatabaseManager.loadAnalysisTimes(db_path)
+
+    #
+    # results are written to the database as they arrive and freed right away
+    #
+    if incremental and os.path.isfile(db_path):
+        db.loadDB(db_path)
+        db.clearWorkerMetrics()
+        pp_list[0].preprocess_predef()
+        numSrcFiles = len(srcFiles)
+        allSrcFiles = srcFiles
+        srcFiles = db.updateFiles(srcFiles)
+        print 'analyze: %d of %d files changed' % (len(srcFiles), numSrcFiles)
+    else:
+        db.createDB(db_path, bulk_load)
+        db.addData({'predefined': pp_list[0].preprocess_predef()})
+        allSrcFiles = None
+
+    numFiles = len(srcFiles)
+
+    task_queue = Queue()
+    done_queue = Queue()
+    stats_queue = Queue()
+
+    #
+    # every worker takes the next file from the shared queue as soon as it is idle,
+    # so the most expensive files go first to keep them off the tail
+    #
+    for i, srcFile in enumerate(schedule(srcFiles, timings)):
+        task_queue.put(srcFile)
+    for i in range(len(pp_list)):
+        task_queue.put('STOP')
+
+    if not use_pipeline:
+        analyzer_p_list = [Process(target=analyzer_worker, args=(pp, parser, info_store, task_queue, done_queue, stats_queue, 'analyzer %d' % i))
+                           for i, (pp, parser) in enumerate(zip(pp_list, parser_list))]
+        for analyzer_p in analyzer_p_list:
+            analyzer_p.start()
+
+        for i in range(numFiles):
+            #print 'analyze: [%d/%d]' % (i,numFiles), srcFile
+            srcFile = add_translation_unit(db, info_store, done_queue, main_metrics, file_metrics)
+            if not bulk_load and (i + 1) % DB_COMMIT_INTERVAL == 0:
+                db.saveDB()
+            snd_pipe.send((i, numFiles, srcFile))
+            if snd_pipe.poll():
+                db.finalizeDB()
+                db.closeDB()
+                for analyzer_p in analyzer_p_list:
+                    analyzer_p.terminate()
+                for analyzer_p in analyzer_p_list:
+                    analyzer_p.join()
+                Preprocessor.clearTokenCache()
+                shutil.rmtree(run_dir, True)
+                snd_pipe.send('STOPPED')
+                print 'analyze: canceled'
+                return
+        results = [stats_queue.get() for analyzer_p in analyzer_p_list]
+        names = ['analyzer %d' % i for i in range(len(analyzer_p_list))]
+        for analyzer_p in analyzer_p_list:
+            analyzer_p.join()
+    else:
+        pp_queue = Queue()
+
+        pp_p_list = [Process(target=preprocessor_worker, args=(pp, info_store, task_queue, pp_queue, stats_queue, 'preprocessor %d' % i))
+                     for i, pp in enumerate(pp_list)]
+        for pp_p in pp_p_list:
+            pp_p.start()
+
+        parser_p_list = [Process(target=parser_worker, args=(parser, info_store, pp_queue, done_queue, stats_queue, 'parser %d' % i))
+                         for i, parser in enumerate(parser_list)]
+        for parser_p in parser_p_list:
+            parser_p.start()
+
+        for i in range(numFiles):
+            #print 'analyze: [%d/%d]' % (i,numFiles), srcFile
+            srcFile = add_translation_unit(db, info_store, done_queue, main_metrics, file_metrics)
+            if not bulk_load and (i + 1) % DB_COMMIT_INTERVAL == 0:
+                db.saveDB()
+            snd_pipe.send((i, numFiles, srcFile))
+            if snd_pipe.poll():
+                db.finalizeDB()
+                db.closeDB()
+                for pp_p in pp_p_list:
+                    pp_p.terminate()
+                for parser_p in parser_p_list:
+                    parser_p.terminate()
+                for pp_p in pp_p_list:
+                    pp_p.join()
+                for parser_p in parser_p_list:
+                    parser_p.join()
+                Preprocessor.clearTokenCache()
+                shutil.rmtree(run_dir, True)
+                snd_pipe.send('STOPPED')
+                print 'analyze: canceled'
+                return
+
+        for i in range(len(parser_p_list)):
+            pp_queue.put('STOP')
+        results = [stats_queue.get() for p in pp_p_list + parser_p_list]
+        names = ['preprocessor %d' % i for i in range(len(pp_p_list))] + ['parser %d' % i for i in range(len(parser_p_list))]
+        for pp_p in pp_p_list:
+            pp_p.join()
+        for parser_p in parser_p_list:
+            parser_p.join()
+
+    shutil.rmtree(run_dir, True)
+
+    stats = dict([(name, stat) for name, stat, metrics in results])
+    worker_metrics = [main_metrics] + [metrics for name, stat, metrics in results]
+    for name, (counter, busy, wall), metrics in results:
+        metrics.add('worker', 'files', counter)
+        metrics.add('worker', 'busy_seconds', busy)
+        metrics.add('worker', 'wall_seconds', wall)
+    for metrics in worker_metrics:
+        db.addMetrics(None, metrics.rows())
+
+    if allSrcFiles is not None:
+        removed = db.removeUnreachableFiles(allSrcFiles)
+        print 'analyze: %d files no longer included' % len(removed)
+    db.resolveReferences()
+    db.finalizeDB()
+    db.createIndexes()
+    table_rows = db.getRowCounts()
+    db.closeDB()
+
+    t_1 = datetime.datetime.now()
+
+    print 'analyze: done', t_1 - t_0
+    print 'analyze: %d duplicate header inserts skipped' % db.skippedInserts
+    print_utilization([(name,) + stats[name] for name in names])
+
+    summary_path = os.path.splitext(db_path)[0] + '.metrics.json'
+    write_summary(summary_path, db_path, (t_1 - t_0).total_seconds(), worker_metrics, file_metrics, table_rows, db.skippedInserts)
+    print 'analyze: metrics written to the Metrics table and', summary_path
+    snd_pipe.send((numFiles, numFiles, 'Generating Database ... done'))
+
+def add_translation_unit(db, info_store, done_queue, metrics, file_metrics):
+    '''
+    write the next finished translation unit to the database and return its path
+
+    the time and the rows it took are recorded with the metrics of the workers
+    '''
+    t_s = time.time()
+    handle = done_queue.get()
+    t_g = time.time()
+    info = info_store.get(handle)
+    t_d = time.time()
+    metrics.add('database', 'queue_wait_seconds', t_g - t_s)
+    metrics.add('database', 'store_get_seconds', t_d - t_g)
+
+    srcFile = info['path']
+    changes = db.conn.total_changes
+    db.addTranslationUnit(info)
+    rows = info.get('metrics', []) + [('main', 'database', 'seconds', time.time() - t_d),
+                                      ('main', 'database', 'rows', db.conn.total_changes - changes)]
+    db.addMetrics(db.getFid(srcFile), rows)
+    file_metrics[srcFile] = rows
+
+    return srcFile
+
+def schedule(srcFiles, timings):
+    '''
+    returns srcFiles ordered by the estimated cost of analysis, longest first
+
+    the cost of a file is the time the previous run spent on it. files analyzed
+    for the first time are estimated from their size and the time per byte of
+    the timed files
+    '''
+    sizes = dict([(path, os.path.getsize(path) if os.path.isfile(path) else 0) for path in srcFiles])
+
+    timed = [path for path in srcFiles if timings.has_key(path)]
+    timedSize = sum([sizes[path] for path in timed])
+    secPerByte = sum([timings[path] for path in timed]) / timedSize if timedSize else 1.0
+
+    return sorted(srcFiles, key=lambda path: (-timings.get(path, sizes[path] * secPerByte), path))
+
+def print_utilization(stats):
+    '''
+    print how long each worker was busy compared to the longest running worker
+    '''
+    if not sum([counter for name, counter, busy, wall in stats]):
+        return
+
+    span = max([wall for name, counter, busy, wall in stats])
+
+    print 'analyze: worker utilization'
+    for name, counter, busy, wall in stats:
+        print '    %-16s %5d files  busy %8.2fs  idle %8.2fs  %5.1f%%' % (name, counter, busy, span - busy, 100.0 * busy / span)
+    print '    %-16s %5d files  busy %8.2fs  idle %8.2fs  %5.1f%%' % ('total',
+                                                                      sum([s[1] for s in stats]),
+                                                                      sum([s[2] for s in stats]),
+                                                                      span * len(stats) - sum([s[2] for s in stats]),
+                                                                      100.0 * sum([s[2] for s in stats]) / (span * len(stats)))
+
+def analyzer_worker(pp, parser, info_store, input_queue, output_queue, stats_queue, name):
+    metrics = Metrics(name)
+    t_0 = datetime.datetime.now()
+    busy = datetime.timedelta()
+    counter = 0
+    for srcFile in timed_get(input_queue.get, 'STOP', metrics, 'preprocess'):
+        #print 'analyzer_worker:', srcFile, counter
+        t_s = datetime.datetime.now()
+        ppInfo = pp.preprocess(srcFile)
+        t_p = datetime.datetime.now()
+        tuMetrics = tu_metrics(name, ppInfo, (t_p - t_s).total_seconds())
+        info = parser.parse(ppInfo)
+        t_1 = datetime.datetime.now()
+        tuMetrics.append((name, 'parse', 'seconds', (t_1 - t_p).total_seconds()))
+        t = t_1 - t_s
+        info['time'] = t.total_seconds()
+        info['metrics'] = tuMetrics
+        busy += t
+        output_queue.put(info_store.put(info))
+        metrics.add('parse', 'store_put_seconds', (datetime.datetime.now() - t_1).total_seconds())
+        counter += 1
+    t_1 = datetime.datetime.now()
+    print 'analyzer_worker: done', t_1 - t_0
+    metrics.addPreprocessor(pp)
+    metrics.addParser(parser)
+    stats_queue.put((name, (counter, busy.total_seconds(), (t_1 - t_0).total_seconds()), metrics))
+
+def preprocessor_worker(pp, info_store, input_queue, output_queue, stats_queue, name):
+    metrics = Metrics(name)
+    t_0 = datetime.datetime.now()
+    busy = datetime.timedelta()
+    counter = 0
+    for srcFile in timed_get(input_queue.get, 'STOP', metrics, 'preprocess'):
+        #print 'preprocessor_worker:', srcFile, counter
+        t_s = datetime.datetime.now()
+        ppInfo = pp.preprocess(srcFile)
+        t_1 = datetime.datetime.now()
+        t = t_1 - t_s
+        ppInfo['time'] = t.total_seconds()
+        ppInfo['metrics'] = tu_metrics(name, ppInfo, t.total_seconds())
+        busy += t
+        output_queue.put(info_store.put(ppInfo))
+        metrics.add('preprocess', 'store_put_seconds', (datetime.datetime.now() - t_1).total_seconds())
+        counter += 1
+    t_1 = datetime.datetime.now()
+    print 'preprocessor_worker: done', t_1 - t_0
+    metrics.addPreprocessor(pp)
+    stats_queue.put((name, (counter, busy.total_seconds(), (t_1 - t_0).total_seconds()), metrics))
+
+def parser_worker(parser, info_store, input_queue, output_queue, stats_queue, name):
+    metrics = Metrics(name)
+    t_0 = datetime.datetime.now()
+    busy = datetime.timedelta()
+    counter = 0
+    for handle in timed_get(input_queue.get, 'STOP', metrics, 'parse'):
+        #print 'parsre_worker:', handle, counter
+        t_g = datetime.datetime.now()
+        ppInfo = info_store.get(handle)
+        t_s = datetime.datetime.now()
+        metrics.add('parse', 'store_get_seconds', (t_s - t_g).total_seconds())
+        info = parser.parse(ppInfo)
+        t_1 = datetime.datetime.now()
+        t = t_1 - t_s
+        info['time'] += t.total_seconds()
+        info['metrics'].append((name, 'parse', 'seconds', t.total_seconds()))
+        busy += t
+        output_queue.put(info_store.put(info))
+        metrics.add('parse', 'store_put_seconds', (datetime.datetime.now() - t_1).total_seconds())
+        counter += 1
+    t_1 = datetime.datetime.now()
+    print 'parser_worker: done', t_1 - t_0
+    metrics.addParser(parser)
+    stats_queue.put((name, (counter, busy.total_seconds(), (t_1 - t_0).total_seconds()), metrics))
+
+def load_project(path):
+    '''
+    Read a project setting file saved by the GUI and return the source files
+    and the preprocessor/parser configurations the GUI would pass to analyze()
+    '''
+    doc = minidom.parse(path)
+
+    projRootDir = os.path.expanduser(doc.getElementsByTagName('project_setup')[0].attributes['dir'].value)
+    outDir = os.path.join(projRootDir, 'analyzer_output')
+
+    #
+    # Load project source files
+    #
+    srcFiles = set()
+    for node in doc.getElementsByTagName('srcFiles')[0].getElementsByTagName('path'):
+        fname = node.attributes['value'].value.replace('{PROJ_ROOT}', projRootDir)
+        if fname and os.path.isfile(fname):
+            srcFiles.add(fname)
+
+    #
+    # Load preprocessor setting
+    #
+    ppElem = doc.getElementsByTagName('preprocessor_setup')[0]
+    elem = ppElem.getElementsByTagName('sysIncDirs')[0]
+    sysIncDirs = [node.attributes['value'].value for node in elem.getElementsByTagName('dir')]
+    if not eval(elem.attributes['process'].value):
+        sysIncDirs = []
+    appIncDirs = [os.path.expanduser(node.attributes['value'].value.replace('{PROJ_ROOT}', projRootDir))
+                  for node in ppElem.getElementsByTagName('localIncDirs')[0].getElementsByTagName('dir')]
+    predefMacros = dict([(str(node.attributes['name'].value), str(node.attributes['value'].value))
+                         for node in ppElem.getElementsByTagName('macro')])
+
+    ppCfg = {'appIncDirs': appIncDirs,
+             'sysIncDirs': sysIncDirs,
+             'predefMacros': predefMacros,
+             'save': eval(ppElem.attributes['save'].value),
+             'removeComment': eval(ppElem.attributes['rmvCmt'].value),
+             'outputDir': os.path.join(outDir, 'pp'),
+             'expandObjMacro': eval(ppElem.attributes['expandObj'].value),
+             'expandFuncMacro': eval(ppElem.attributes['expandFunc'].value),
+             'logLevel': DEFAULT_LOG_LEVEL,
+             'logPath': os.path.join(outDir, 'preprocessor.log'),
+             }
+
+    #
+    # Load parser setting
+    #
+    parserElem = doc.getElementsByTagName('parser_setup')[0]
+    builtinTypes = [node.attributes['name'].value
+                    for node in parserElem.getElementsByTagName('builtin_types')[0].getElementsByTagName('type')]
+
+    parserCfg = {'builtinTypes': builtinTypes,
+                 'outDir': None if not eval(parserElem.attributes['save'].value) else \
+                           os.path.join(outDir, 'parse_tree'),
+                 'logLevel': DEFAULT_LOG_LEVEL,
+                 'logPath': os.path.join(outDir, 'parser.log'),
+                 }
+
+    return {'projRootDir': projRootDir,
+            'outDir': outDir,
+            'dbPath': os.path.join(outDir, ''.join([projRootDir.replace(os.sep, '_').strip('_'), '.sqlite'])),
+            'srcFiles': sorted(srcFiles),
+            'ppCfg': ppCfg,
+            'parserCfg': parserCfg,
+            }
+
+
+class ProgressWriter:
+    '''
+    Stand-in for the pipe analyze() reports progress to.
+
+    Progress is written to the stream as a line of text per file, or as a JSON
+    object per line when useJson is set. It never asks analyze() to stop.
+    '''
+
+    def __init__(self, stream=sys.stdout, useJson=False):
+        self.stream = stream
+        self.useJson = useJson
+        self.t_0 = datetime.datetime.now()
+
+    def send(self, msg):
+        elapsed = datetime.datetime.now() - self.t_0
+
+        if msg == 'STOPPED':
+            event = {'event': 'canceled'}
+            line = 'Canceled'
+        else:
+            i, total, result = msg
+            if i == total:
+                event = {'event': 'done', 'total': total, 'message': result}
+                line = result
+            else:
+                event = {'event': 'progress', 'done': i+1, 'total': total, 'path': result}
+                line = '[%d/%d] %s ... done' % (i+1, total, result)
+
+        if self.useJson:
+            event['elapsed'] = elapsed.total_seconds()
+            line = json.dumps(event)
+
+        self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def poll(self):
+        return False
@@ -1,8 +1,10 @@
+import os
+import sys
 import optparse
 
-import wx
-
-from gui import analyzer_frame
+from token_cache import TokenCache, DEFAULT_TOKEN_CACHE_DIR
+from predef_snapshot import PredefSnapshot, DEFAULT_PREDEF_SNAPSHOT_DIR
+from tree_writer import TREE_WRITERS
 
 
 def getOptions():
@@ -23,12 +25,107 @@ def getOptions():
     parser.add_option("--nparser", dest="numParserProc", default="1", type="int",
                       help='''Number of parser processes. This is used when both -p/--pipeline and
                               -m/--multiprocessing flags are set.''')
+    parser.add_option("--regex-scanner", dest="useRegexScanner", action="store_true", default=False,
+                      help="Tokenize source files with the whole-buffer regex scanner")
+    parser.add_option("--token-cache", dest="tokenCacheDir", default="", type="string", metavar="DIR",
+                      help="Directory of the persistent token cache. e.g. %s" % DEFAULT_TOKEN_CACHE_DIR)
+    parser.add_option("--token-cache-size", dest="tokenCacheSize", default="512", type="int", metavar="MB",
+                      help="Maximum size of the persistent token cache in MB")
+    parser.add_option("--clear-token-cache", dest="clearTokenCache", action="store_true", default=False,
+                      help="Remove all entries of the persistent token cache before analysis")
+    parser.add_option("--predef-snapshot", dest="predefSnapshotDir", default=DEFAULT_PREDEF_SNAPSHOT_DIR, type="string",
+                      metavar="DIR", help="Directory of the snapshots of the predefined macros per compiler [default: %default]")
+    parser.add_option("--no-predef-snapshot", dest="predefSnapshotDir", action="store_const", const="",
+                      help="Probe the compiler for the predefined macros on every start")
+    parser.add_option("--clear-predef-snapshot", dest="clearPredefSnapshot", action="store_true", default=False,
+                      help="Remove the snapshots of the predefined macros before analysis")
+    parser.add_option("--compress-preprocessed", dest="saveCompressed", action="store_true", default=False,
+                      help="Gzip the preprocessed files which are saved when the project saves them")
+    parser.add_option("--bulk-load", dest="bulkLoad", action="store_true", default=False,
+                      help="Generate the database unjournaled in a single transaction and make it durable at the end")
+    parser.add_option("--incremental", dest="incremental", action="store_true", default=False,
+                      help="Update the existing database and analyze only source files whose inputs changed")
+    parser.add_option("--declarations-only", dest="declarationsOnly", action="store_true", default=False,
+                      help='''Skip function bodies and only analyze declarations. The bodies are parsed
+                              when the database is queried for what is inside them.''')
+    parser.add_option("--tree-format", dest="treeFormat", default="xml", type="choice", choices=sorted(TREE_WRITERS),
+                      help="Format of the saved parse trees: %s [default: %%default]" % ', '.join(sorted(TREE_WRITERS)))
+    parser.add_option("--headless", dest="headless", action="store_true", default=False,
+                      help="Execute analysis of the -f/--file project without the GUI. wxPython is not imported.")
+    parser.add_option("--json", dest="json", action="store_true", default=False,
+                      help="Report progress of --headless analysis as a JSON object per line")
+    parser.add_option("--trace", dest="traceDir", default="", type="string", metavar="DIR",
+                      help="Write a JSON-lines trace of the preprocessor and the parser to DIR. This is slow.")
     options, args = parser.parse_args()
+
+    if options.headless and not options.projFilePath:
+        parser.error("--headless requires -f/--file")
+
     return options
 
+def runHeadless(opt):
+    from analysis import analyze, load_project, ProgressWriter
+
+    proj = load_project(opt.projFilePath)
+
+    ppCfg = proj['ppCfg']
+    ppCfg['useRegexScanner'] = opt.useRegexScanner
+    ppCfg['tokenCacheDir'] = opt.tokenCacheDir
+    ppCfg['tokenCacheSize'] = opt.tokenCacheSize * 1024 * 1024
+    ppCfg['predefSnapshotDir'] = opt.predefSnapshotDir
+    ppCfg['saveCompressed'] = opt.saveCompressed
+    proj['parserCfg']['declarationsOnly'] = opt.declarationsOnly
+    proj['parserCfg']['treeFormat'] = opt.treeFormat
+
+    if opt.traceDir:
+        if not os.path.exists(opt.traceDir):
+            os.makedirs(opt.traceDir)
+        ppCfg['tracePath'] = os.path.abspath(os.path.join(opt.traceDir, 'preprocessor.trace.jsonl'))
+        proj['parserCfg']['tracePath'] = os.path.abspath(os.path.join(opt.traceDir, 'parser.trace.jsonl'))
+
+    #
+    # keep stdout for progress only; messages of analyze() and the workers go to stderr
+    #
+    progress = ProgressWriter(sys.stdout, opt.json)
+    if opt.json:
+        sys.stdout = sys.stderr
+
+    if not os.path.exists(proj['outDir']):
+        os.makedirs(proj['outDir'])
+
+    oldcwd = os.getcwd()
+    os.chdir(proj['outDir'])
+
+    analyze(progress,
+            proj['dbPath'],
+            ppCfg,
+            proj['parserCfg'],
+            proj['srcFiles'],
+            opt.pipeline,
+            opt.numProc if opt.multiprocessing else 1,
+            opt.numPpProc if opt.multiprocessing else 1,
+            opt.numParserProc if opt.multiprocessing else 1,
+            opt.bulkLoad,
+            opt.incremental,
+            )
+
+    os.chdir(oldcwd)
+
 def main():
     opt = getOptions()
 
+    if opt.clearTokenCache:
+        TokenCache(opt.tokenCacheDir or DEFAULT_TOKEN_CACHE_DIR).clear()
+    if opt.clearPredefSnapshot:
+        PredefSnapshot(opt.predefSnapshotDir or DEFAULT_PREDEF_SNAPSHOT_DIR).clear()
+
+    if opt.headless:
+        runHeadless(opt)
+        return
+
+    import wx
+    from gui import analyzer_frame
+
     app = wx.App(0)
 
     frame = analyzer_frame.MainFrame(opt)
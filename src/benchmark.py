@@ -0,0 +1,402 @@
+import os
+import json
+import time
+import random
+import shutil
+import tempfile
+import resource
+import platform
+import datetime
+import subprocess
+import optparse
+import traceback
+from multiprocessing import Process, Pipe
+
+from scanner import Scanner
+from preprocessor import Preprocessor
+from parser import Parser
+from db_manager import DatabaseManager
+from analysis import DEFAULT_LOG_LEVEL
+
+
+# version of the layout of the result file. 2: peak_rss_kb is the peak of the stage alone
+RESULT_VERSION = 2
+
+# (stage, metric) pairs compared by --compare, higher is better
+COMPARED_METRICS = (('scanner', 'tokens_per_sec'),
+                    ('preprocessor', 'tokens_per_sec'),
+                    ('preprocessor', 'tus_per_sec'),
+                    ('parser', 'tokens_per_sec'),
+                    ('parser', 'tus_per_sec'),
+                    ('database', 'rows_per_sec'),
+                    )
+
+
+def getOptions():
+    parser = optparse.OptionParser("usage: %prog [options]")
+    parser.add_option("-o", "--output", dest="output", default="benchmark.json", type="string", metavar="FILE",
+                      help="JSON file the results are written to")
+    parser.add_option("--compare", dest="compare", default="", type="string", metavar="FILE",
+                      help="Results of an earlier run to compare with")
+    parser.add_option("--corpus", dest="corpusDir", default="", type="string", metavar="DIR",
+                      help="Generate the corpus into DIR and keep it. A temporary directory is used by default.")
+    parser.add_option("--files", dest="numFiles", default="32", type="int",
+                      help="Number of translation units")
+    parser.add_option("--include-depth", dest="includeDepth", default="4", type="int",
+                      help="Depth of the header chain every translation unit includes")
+    parser.add_option("--macro-density", dest="macroDensity", default="0.2", type="float",
+                      help="Fraction of the operands in function bodies which are macros")
+    parser.add_option("--function-size", dest="functionSize", default="20", type="int",
+                      help="Number of statements per function")
+    parser.add_option("--functions", dest="numFunctions", default="8", type="int",
+                      help="Number of functions per translation unit")
+    parser.add_option("--seed", dest="seed", default="0", type="int",
+                      help="Seed of the corpus generator")
+    parser.add_option("--repeat", dest="repeat", default="3", type="int",
+                      help="Number of runs. The best time of every stage is reported.")
+    parser.add_option("--regex-scanner", dest="useRegexScanner", action="store_true", default=False,
+                      help="Tokenize source files with the whole-buffer regex scanner")
+    parser.add_option("--declarations-only", dest="declarationsOnly", action="store_true", default=False,
+                      help="Parse in declarations only mode, which skips function bodies")
+    options, args = parser.parse_args()
+
+    if options.numFiles < 1 or options.includeDepth < 1 or options.repeat < 1:
+        parser.error("--files, --include-depth and --repeat must be positive")
+
+    return options
+
+#
+# Synthetic corpus
+#
+def generate_corpus(corpusDir, numFiles, includeDepth, macroDensity, functionSize, numFunctions, seed=0):
+    '''
+    write a C corpus of numFiles translation units to corpusDir and return their paths
+
+    every translation unit includes a chain of includeDepth headers. each header
+    defines macros, a struct, an enum, a typedef and prototypes, and the function
+    bodies of the translation units use them with the given macro density.
+    '''
+    rand = random.Random(seed)
+
+    if not os.path.exists(corpusDir):
+        os.makedirs(corpusDir)
+
+    for level in range(includeDepth):
+        lines = ['#ifndef INC_%d_H' % level,
+                 '#define INC_%d_H' % level,
+                 '']
+        if level + 1 < includeDepth:
+            lines += ['#include "inc_%d.h"' % (level + 1), '']
+        lines += ['#define LIMIT_%d %d' % (level, rand.randint(1, 1000)),
+                  '#define SCALE_%d(x) ((x) * %d)' % (level, rand.randint(2, 9)),
+                  '#define MAX_%d(a, b) ((a) > (b) ? (a) : (b))' % level,
+                  '',
+                  'typedef int count%d_t;' % level,
+                  '',
+                  'enum mode%d {MODE%d_OFF = 0, MODE%d_ON, MODE%d_AUTO};' % (level, level, level, level),
+                  '',
+                  'struct record%d' % level,
+                  '{',
+                  '    count%d_t count;' % level,
+                  '    enum mode%d mode;' % level,
+                  '    int values[LIMIT_%d];' % level,
+                  '};',
+                  '',
+                  'int helper%d(int a, int b);' % level,
+                  'extern struct record%d shared%d;' % (level, level),
+                  '',
+                  '#endif',
+                  '']
+        _write(os.path.join(corpusDir, 'inc_%d.h' % level), lines)
+
+    srcFiles = []
+    for n in range(numFiles):
+        lines = ['#include "inc_0.h"',
+                 '',
+                 'static int state%d;' % n,
+                 '']
+        for f in range(numFunctions):
+            lines += _function(rand, n, f, functionSize, macroDensity, includeDepth)
+        path = os.path.join(corpusDir, 'unit_%d.c' % n)
+        _write(path, lines)
+        srcFiles.append(path)
+
+    return srcFiles
+
+def _function(rand, unit, index, functionSize, macroDensity, includeDepth):
+    def operand(names):
+        level = rand.randrange(includeDepth)
+        if rand.random() < macroDensity:
+            return rand.choice(('LIMIT_%d' % level,
+                                'SCALE_%d(%s)' % (level, rand.choice(names)),
+                                'MAX_%d(%s, %s)' % (level, rand.choice(names), rand.choice(names))))
+        return rand.choice(names + ['%d' % rand.randint(0, 99)])
+
+    level = rand.randrange(includeDepth)
+    names = ['a', 'b']
+    lines = ['int unit%d_func%d(int a, int b)' % (unit, index),
+             '{',
+             '    struct record%d rec;' % level,
+             '    count%d_t total = 0;' % level,
+             '    int i;']
+
+    for s in range(functionSize):
+        kind = rand.randrange(6)
+        if kind == 0:
+            var = 'v%d' % s
+            lines.append('    int %s = %s + %s;' % (var, operand(names), operand(names)))
+            names.append(var)
+        elif kind == 1:
+            lines.append('    total += %s * %s;' % (operand(names), operand(names)))
+        elif kind == 2:
+            lines += ['    if (%s > %s)' % (operand(names), operand(names)),
+                      '    {',
+                      '        total -= %s;' % operand(names),
+                      '    }',
+                      '    else',
+                      '    {',
+                      '        total += helper%d(%s, %s);' % (rand.randrange(includeDepth), operand(names), operand(names)),
+                      '    }']
+        elif kind == 3:
+            lines += ['    for (i = 0; i < %s; i++)' % operand(names),
+                      '    {',
+                      '        rec.values[i %% LIMIT_%d] = %s;' % (level, operand(names)),
+                      '    }']
+        elif kind == 4:
+            lines += ['    switch (rec.mode)',
+                      '    {',
+                      '    case MODE%d_ON:' % level,
+                      '        total++;',
+                      '        break;',
+                      '    default:',
+                      '        total = %s;' % operand(names),
+                      '        break;',
+                      '    }']
+        else:
+            lines.append('    state%d = helper%d(total, %s);' % (unit, rand.randrange(includeDepth), operand(names)))
+
+    lines += ['    return total;',
+              '}',
+              '']
+    return lines
+
+def _write(path, lines):
+    f = open(path, 'w')
+    f.write('\n'.join(lines))
+    f.close()
+
+#
+# Stages
+#
+def count_tokens(ppInfo):
+    '''
+    number of tokens of a translation unit and the headers it includes
+    '''
+    num = len(ppInfo['tokens'])
+    for include in ppInfo['includes']:
+        if include[-1]:
+            num += count_tokens(include[-1])
+    return num
+
+def peak_rss():
+    '''
+    peak resident set size of the process so far in KB
+    '''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def run_in_child(target, *args):
+    '''
+    return target(*args) run in a child process
+
+    ru_maxrss never goes down, so every stage runs in a child of its own and
+    reports the peak of that child, which holds the inputs of the stage and
+    nothing which earlier stages or runs left behind
+    '''
+    recv, send = Pipe(False)
+
+    def child():
+        try:
+            send.send((True, target(*args)))
+        except:
+            send.send((False, traceback.format_exc()))
+
+    p = Process(target=child)
+    p.start()
+    ok, ret = recv.recv()
+    p.join()
+    if not ok:
+        raise RuntimeError('benchmark: %s failed in a child process\n%s' % (target.__name__, ret))
+    return ret
+
+def scan_stage(corpusDir, useRegexScanner):
+    paths = sorted([os.path.join(corpusDir, name) for name in os.listdir(corpusDir)])
+    numTokens = 0
+    t = time.time()
+    for path in paths:
+        numTokens += len(Scanner(path, useRegex=useRegexScanner).tokenize())
+    result = {'seconds': time.time() - t,
+              'files': len(paths),
+              'tokens': numTokens,
+              }
+    result['peak_rss_kb'] = peak_rss()
+    return result, None
+
+def preprocess_stage(corpusDir, srcFiles, workDir, useRegexScanner):
+    Preprocessor.clearTokenCache()
+    pp = Preprocessor(sysIncDirs=[], appIncDirs=[corpusDir], useRegexScanner=useRegexScanner,
+                      logLevel=DEFAULT_LOG_LEVEL, logPath=os.path.join(workDir, 'preprocessor.log'))
+    proj = {'predefined': pp.preprocess_predef()}
+    t = time.time()
+    for srcFile in srcFiles:
+        proj[srcFile] = pp.preprocess(srcFile)
+    result = {'seconds': time.time() - t,
+              'tus': len(srcFiles),
+              'tokens': sum([count_tokens(proj[srcFile]) for srcFile in srcFiles]),
+              }
+    result['peak_rss_kb'] = peak_rss()
+    return result, proj
+
+def parse_stage(proj, srcFiles, workDir, declarationsOnly, numTokens):
+    parser = Parser(logLevel=DEFAULT_LOG_LEVEL, logPath=os.path.join(workDir, 'parser.log'), declarationsOnly=declarationsOnly)
+    t = time.time()
+    for srcFile in srcFiles:
+        parser.parse(proj[srcFile])
+    result = {'seconds': time.time() - t,
+              'tus': len(srcFiles),
+              'tokens': numTokens,
+              'backtracks': parser.backtracks,
+              'skipped_bodies': parser.skippedBodies,
+              }
+    result['peak_rss_kb'] = peak_rss()
+    return result, proj
+
+def database_stage(proj, workDir):
+    dbPath = os.path.join(workDir, 'benchmark.sqlite')
+    if os.path.exists(dbPath):
+        os.remove(dbPath)
+    db = DatabaseManager()
+    db.createDB(dbPath)
+    t = time.time()
+    db.addData(proj)
+    db.finalizeDB()
+    seconds = time.time() - t
+    numRows = sum([db.cursor.execute('SELECT count(*) FROM %s' % tableName).fetchone()[0]
+                   for tableName, in db.getTableList()])
+    db.closeDB()
+    result = {'seconds': seconds,
+              'rows': numRows,
+              }
+    result['peak_rss_kb'] = peak_rss()
+    return result, None
+
+def run_once(corpusDir, srcFiles, workDir, useRegexScanner, declarationsOnly=False):
+    '''
+    time every stage once over the corpus and return the per stage results
+    '''
+    stages = {}
+    stages['scanner'], _ = run_in_child(scan_stage, corpusDir, useRegexScanner)
+    stages['preprocessor'], proj = run_in_child(preprocess_stage, corpusDir, srcFiles, workDir, useRegexScanner)
+    stages['parser'], proj = run_in_child(parse_stage, proj, srcFiles, workDir, declarationsOnly, stages['preprocessor']['tokens'])
+    stages['database'], _ = run_in_child(database_stage, proj, workDir)
+    return stages
+
+def benchmark(corpusDir, srcFiles, repeat, useRegexScanner, declarationsOnly=False):
+    '''
+    run the stages repeat times and keep the best time of each
+    '''
+    workDir = tempfile.mkdtemp(prefix='pycodeanalyzer-bench-')
+    try:
+        best = {}
+        for i in range(repeat):
+            for stage, result in run_in_child(run_once, corpusDir, srcFiles, workDir, useRegexScanner, declarationsOnly).items():
+                if stage not in best or result['seconds'] < best[stage]['seconds']:
+                    best[stage] = result
+    finally:
+        shutil.rmtree(workDir, True)
+
+    for stage, result in best.items():
+        seconds = max(result['seconds'], 1e-9)
+        for count in ('tokens', 'tus', 'rows'):
+            if count in result:
+                result['%s_per_sec' % count] = result[count] / seconds
+    return best
+
+def git_revision():
+    try:
+        p = subprocess.Popen(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        out = p.communicate()[0].strip()
+        return out if p.returncode == 0 else None
+    except OSError:
+        return None
+
+def print_results(results, base=None):
+    print '%-14s %10s %10s %14s %12s %12s' % ('stage', 'seconds', 'count', 'rate', 'peak RSS', 'vs base')
+    for stage in ('scanner', 'preprocessor', 'parser', 'database'):
+        result = results['stages'][stage]
+        count = 'rows' if stage == 'database' else 'tokens'
+        ratio = ''
+        if base and base['stages'].has_key(stage) and base['stages'][stage].get('%s_per_sec' % count):
+            ratio = '%.2fx' % (result['%s_per_sec' % count] / base['stages'][stage]['%s_per_sec' % count])
+        print '%-14s %10.3f %10d %10.0f/s %9d KB %12s' % (stage, result['seconds'], result[count],
+                                                        result['%s_per_sec' % count], result['peak_rss_kb'], ratio)
+
+    if base:
+        if base['corpus'] != results['corpus']:
+            print 'warning: the corpus of %s differs' % base.get('revision')
+        print
+        print 'compared with %s' % base.get('revision')
+        for stage, metric in COMPARED_METRICS:
+            old = base['stages'].get(stage, {}).get(metric)
+            new = results['stages'][stage][metric]
+            if old:
+                print '    %-14s %-16s %12.1f -> %12.1f  %.2fx' % (stage, metric, old, new, new / old)
+
+def main():
+    opt = getOptions()
+
+    corpusDir = opt.corpusDir or tempfile.mkdtemp(prefix='pycodeanalyzer-corpus-')
+    corpus = {'files': opt.numFiles,
+              'include_depth': opt.includeDepth,
+              'macro_density': opt.macroDensity,
+              'function_size': opt.functionSize,
+              'functions': opt.numFunctions,
+              'seed': opt.seed,
+              }
+    try:
+        srcFiles = generate_corpus(corpusDir, opt.numFiles, opt.includeDepth, opt.macroDensity,
+                                   opt.functionSize, opt.numFunctions, opt.seed)
+        corpus['bytes'] = sum([os.path.getsize(os.path.join(corpusDir, name)) for name in os.listdir(corpusDir)])
+
+        stages = benchmark(corpusDir, srcFiles, opt.repeat, opt.useRegexScanner, opt.declarationsOnly)
+    finally:
+        if not opt.corpusDir:
+            shutil.rmtree(corpusDir, True)
+
+    results = {'version': RESULT_VERSION,
+               'revision': git_revision(),
+               'date': datetime.datetime.now().isoformat(),
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'regex_scanner': opt.useRegexScanner,
+               'declarations_only': opt.declarationsOnly,
+               'repeat': opt.repeat,
+               'corpus': corpus,
+               'stages': stages,
+               }
+
+    f = open(opt.output, 'w')
+    json.dump(results, f, indent=2, sort_keys=True)
+    f.close()
+
+    base = None
+    if opt.compare:
+        f = open(opt.compare)
+        base = json.load(f)
+        f.close()
+
+    print_results(results, base)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,104 @@
 import sqlite3
 import os
-from collections import deque
+from collections import deque, defaultdict
+import cPickle
 import sha
 
+from parser import Parser
+from scanner_types import TOK_ROW, TOK_COL
 from parser_types import *
 
 
+#
+# secondary indexes created by createIndexes() once the data is loaded
+#
+INDEXES = (
+    ('File'          , ('path',)),
+    ('File'          , ('isSrc',)),
+    ('Include'       , ('fid', 'path_fid')),
+    ('Include'       , ('root_fid', 'path_fid')),
+    ('Include'       , ('path_fid', 'root_fid')),
+    ('MacroDef'      , ('fid',)),
+    ('MacroUsage'    , ('name',)),
+    ('Typedef'       , ('fid',)),
+    ('Typedef'       , ('funcTypeId',)),
+    ('DataTypeLink'  , ('fieldId',)),
+    ('Function'      , ('name',)),
+    ('Variable'      , ('name',)),
+    ('TypedefUsage'  , ('symId',)),
+    ('DataTypeUsage' , ('symId',)),
+    ('EnumUsage'     , ('symId',)),
+    ('FunctionUsage' , ('symId',)),
+    ('FunctionCall'  , ('symId',)),
+    ('VariableUsage' , ('symId',)),
+    ('FunctionBody'  , ('isParsed',)),
+)
+
+
+#
+# connection settings of bulk load mode. the database is built from scratch, so
+# nothing is journaled or synced until finalizeDB()
+#
+BULK_LOAD_PRAGMAS = (
+    'journal_mode=OFF',
+    'synchronous=OFF',
+    'cache_size=-262144',   # 256MB
+    'temp_store=MEMORY',
+    'mmap_size=268435456',  # 256MB
+)
+
+
+class QueryPlanCursor:
+    '''
+    Cursor wrapper which runs EXPLAIN QUERY PLAN instead of the query and keeps the plans.
+    '''
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.plans = deque()
+
+    def execute(self, sql, params=()):
+        self.cursor.execute('EXPLAIN QUERY PLAN %s' % sql, params)
+        self.plans.append((sql, self.cursor.fetchall()))
+        self.cursor.execute('SELECT NULL WHERE 0')
+        return self.cursor
+
+
 class DatabaseManager:
 
     def __init__(self):
         self.conn = None
         self.cursor = None
         self.dbPath = ''
+        self.bulkLoad = False
+        self.unresolvedCalls = deque()
+        self.unresolvedDataTypes = deque()
+        self.unresolvedUsages = deque()
+        self.presentFids = set()
+        self.ingested = set()
+        self.skippedInserts = 0
+        # parses the bodies of FunctionBody, created on first use unless set
+        self.bodyParser = None
 
-    def createDB(self, dbPath):
+        #
+        # rowids of inserted rows so that lookups do not need a query
+        #
+        self.fidTbl = {}                    # path -> fid
+        self.symIdTbl = defaultdict(dict)   # table name -> {(name, fid, row, col): rowid}
+        self.posIdTbl = defaultdict(dict)   # table name -> {(fid, row, col): rowid}
+        self.funcNameTbl = {}               # name -> Function rowid
+        self.funcDefTbl = {}                # (name, isDef) -> Function rowid
+        self.typedefTbl = {}                # (name, fid) -> Typedef rowid
+        self.dataTypeNameTbl = {}           # name -> rowid of DataType with fields
+        self.builtinTypeTbl = {}            # name -> BuiltinType rowid
+
+    def createDB(self, dbPath, bulkLoad=False):
         self.dbPath = dbPath
+        self.bulkLoad = bulkLoad
+        self.ingested.clear()
+        self.presentFids.clear()
+        self.skippedInserts = 0
+        self.clearIdMaps()
         if os.path.exists(dbPath):
             os.remove(dbPath)
 
@@ -27,6 +111,10 @@ class DatabaseManager:
         self.conn = sqlite3.connect(dbPath)
         self.cursor = self.conn.cursor()
 
+        if bulkLoad:
+            for pragma in BULK_LOAD_PRAGMAS:
+                self.cursor.execute('PRAGMA %s' % pragma)
+
         self.createTable('File',
                          [('path'    , 'VARCHAR(512)', 'NOT NULL'),
                           ('size'    , 'INTEGER', 'NOT NULL'),
@@ -434,6 +522,10 @@ class DatabaseManager:
                           ]
                          )
 
+        self.createAnalysisTimeTable()
+        self.createMetricsTable()
+        self.createFunctionBodyTable()
+
 
     def loadDB(self, dbPath):
         if self.cursor:
@@ -447,9 +539,157 @@ class DatabaseManager:
         self.conn = sqlite3.connect(dbPath)
         self.cursor = self.conn.cursor()
 
+        # databases generated before timings were recorded
+        if not self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='AnalysisTime'").fetchone():
+            self.createAnalysisTimeTable()
+        if not self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Metrics'").fetchone():
+            self.createMetricsTable()
+        if not self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='FunctionBody'").fetchone():
+            self.createFunctionBodyTable()
+
+        self.loadIdMaps()
+
+    def createAnalysisTimeTable(self):
+        self.createTable('AnalysisTime',
+                         [('fid'        , 'INTEGER', 'NOT NULL'),
+                          ('seconds'    , 'REAL', 'NOT NULL'),
+                          ('FOREIGN KEY', '(fid)', 'REFERENCES File(rowid)'),
+                          ]
+                         )
+
+    def createMetricsTable(self):
+        '''
+        fid is NULL for the counters of a whole worker
+        '''
+        self.createTable('Metrics',
+                         [('fid'        , 'INTEGER'),
+                          ('worker'     , 'TEXT', 'NOT NULL'),
+                          ('stage'      , 'TEXT', 'NOT NULL'),
+                          ('name'       , 'TEXT', 'NOT NULL'),
+                          ('value'      , 'REAL', 'NOT NULL'),
+                          ('FOREIGN KEY', '(fid)', 'REFERENCES File(rowid)'),
+                          ]
+                         )
+
+    def createFunctionBodyTable(self):
+        '''
+        token spans of the function bodies a parser skipped in declarations only mode.
+        body holds the tokens until the body is parsed by parseFunctionBodies()
+        '''
+        self.createTable('FunctionBody',
+                         [('funcId'     , 'INTEGER', 'NOT NULL'),
+                          ('fid'        , 'INTEGER', 'NOT NULL'),
+                          ('startRow'   , 'INTEGER', 'NOT NULL'),
+                          ('startCol'   , 'INTEGER', 'NOT NULL'),
+                          ('endRow'     , 'INTEGER', 'NOT NULL'),
+                          ('endCol'     , 'INTEGER', 'NOT NULL'),
+                          ('numTokens'  , 'INTEGER', 'NOT NULL'),
+                          ('isParsed'   , 'INTEGER', 'NOT NULL'),
+                          ('body'       , 'BLOB'),
+                          ('PRIMARY KEY', '(fid, startRow, startCol)'),
+                          ('FOREIGN KEY', '(funcId)', 'REFERENCES Function(rowid)'),
+                          ('FOREIGN KEY', '(fid)', 'REFERENCES File(rowid)'),
+                          ]
+                         )
+
+    def addMetrics(self, fid, rows):
+        '''
+        rows are (worker, stage, name, value)
+        '''
+        self.cursor.executemany('INSERT INTO Metrics VALUES (?,?,?,?,?)',
+                                [(fid, worker, stage, name, value) for worker, stage, name, value in rows])
+
+    def clearWorkerMetrics(self):
+        '''
+        remove the counters of the workers of the previous run
+        '''
+        self.cursor.execute('DELETE FROM Metrics WHERE fid IS NULL')
+
+    def getRowCounts(self):
+        return dict([(tableName, self.cursor.execute('SELECT count(*) FROM %s' % tableName).fetchone()[0])
+                     for tableName, in self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()])
+
+    @staticmethod
+    def loadAnalysisTimes(dbPath):
+        '''
+        returns {path: seconds} of the translation units analyzed by the previous run
+        '''
+        if not os.path.isfile(dbPath):
+            return {}
+
+        conn = sqlite3.connect(dbPath)
+        try:
+            return dict(conn.execute('SELECT f.path, t.seconds FROM AnalysisTime t INNER JOIN File f ON t.fid=f.rowid').fetchall())
+        except sqlite3.OperationalError:
+            # database generated before timings were recorded
+            return {}
+        finally:
+            conn.close()
+
+    def clearIdMaps(self):
+        self.fidTbl.clear()
+        self.symIdTbl.clear()
+        self.posIdTbl.clear()
+        self.funcNameTbl.clear()
+        self.funcDefTbl.clear()
+        self.typedefTbl.clear()
+        self.dataTypeNameTbl.clear()
+        self.builtinTypeTbl.clear()
+
+    def loadIdMaps(self):
+        self.clearIdMaps()
+
+        for rowid, path in self.cursor.execute('SELECT rowid, path FROM File ORDER BY rowid').fetchall():
+            self.fidTbl.setdefault(path, rowid)
+        for tableName in ('Function', 'Variable', 'DataType', 'DataTypeField'):
+            for rowid, name, fid, row, col in self.cursor.execute('SELECT rowid, name, fid, row, col FROM %s ORDER BY rowid' % tableName).fetchall():
+                self.symIdTbl[tableName].setdefault((name, fid, row, col), rowid)
+                self.posIdTbl[tableName].setdefault((fid, row, col), rowid)
+        for rowid, name, isDef in self.cursor.execute('SELECT rowid, name, isDef FROM Function ORDER BY rowid').fetchall():
+            if name is not None:
+                self.funcNameTbl.setdefault(name, rowid)
+                self.funcDefTbl.setdefault((name, bool(isDef)), rowid)
+        for rowid, name, fid in self.cursor.execute('SELECT rowid, name, fid FROM Typedef ORDER BY rowid').fetchall():
+            self.typedefTbl.setdefault((name, fid), rowid)
+        for rowid, name in self.cursor.execute('SELECT rowid, name FROM DataType WHERE hasFields=1 ORDER BY rowid').fetchall():
+            if name is not None:
+                self.dataTypeNameTbl.setdefault(name, rowid)
+        for rowid, name in self.cursor.execute('SELECT rowid, name FROM BuiltinType ORDER BY rowid').fetchall():
+            self.builtinTypeTbl[name] = rowid
+
+    def addId(self, tableName, name, fid, row, col):
+        '''
+        registers the row inserted by the last statement and returns its rowid, or None if it was ignored
+        '''
+        if self.cursor.rowcount != 1:
+            return None
+        rowid = self.cursor.lastrowid
+        self.symIdTbl[tableName].setdefault((name, fid, row, col), rowid)
+        self.posIdTbl[tableName].setdefault((fid, row, col), rowid)
+        return rowid
+
     def saveDB(self):
         self.conn.commit()
 
+    def finalizeDB(self):
+        '''
+        commit and switch a bulk loaded database back to durable settings
+        '''
+        self.conn.commit()
+        if not self.bulkLoad:
+            return
+
+        self.cursor.execute('PRAGMA journal_mode=DELETE')
+        self.cursor.execute('PRAGMA synchronous=FULL')
+        self.bulkLoad = False
+
+        #
+        # nothing was synced while loading
+        #
+        if os.path.isfile(self.dbPath):
+            with open(self.dbPath, 'rb') as f:
+                os.fsync(f.fileno())
+
     def closeDB(self):
         if self.cursor:
             self.cursor.close()
@@ -457,6 +697,82 @@ class DatabaseManager:
         if self.conn:
             self.conn.close()
 
+    def createIndexes(self, analyze=True):
+        '''
+        create secondary indexes and update the query planner statistics
+
+        this is meant to run after the bulk load so that inserts do not maintain the indexes
+        '''
+        for tableName, columns in INDEXES:
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)' % (
+                                tableName, '_'.join(columns), tableName, ', '.join(columns)))
+        if analyze:
+            self.cursor.execute('ANALYZE')
+        self.conn.commit()
+
+    @staticmethod
+    def checkQueryPlans():
+        '''
+        returns (query, plan) of the profile queries which scan a whole table
+
+        the plans are taken from an empty in-memory database without statistics
+        so that they only depend on the schema and INDEXES, not on the data
+        '''
+        db = DatabaseManager()
+        db.createDB(':memory:')
+        db.createIndexes(analyze=False)
+        try:
+            return db._checkQueryPlans(1)
+        finally:
+            db.closeDB()
+
+    def _checkQueryPlans(self, fid):
+        queries = ((self.getSourceFiles, ()),
+                   (self.getHeaderFiles, ()),
+                   (self.getIncludes, (fid,)),
+                   (self.getFilePath, (fid,)),
+                   (self.getMacroDefs, (fid,)),
+                   (self.getMacroUndefs, (fid,)),
+                   (self.getMacroUsage, (fid,)),
+                   (self.getDataTypes, (fid,)),
+                   (self.getTypedefs, (fid,)),
+                   (self.getTypedefUsage, (fid,)),
+                   (self.getDataTypeUsage, (fid,)),
+                   (self.getEnums, (fid,)),
+                   (self.getEnumUsage, (fid,)),
+                   (self.getFunctions, (fid,)),
+                   (self.getMainFile, ()),
+                   (self.getFunctionUsage, (fid,)),
+                   (self.getFunctionCalls, (fid,)),
+                   (self.getGlobalVariables, (fid,)),
+                   (self.getExternVariables, (fid,)),
+                   (self.getLocalVariables, (fid,)),
+                   (self.getVariableUsage, (fid,)),
+                   (self.getFilesIncludingFile, (fid,)),
+                   (self.getFilesUsingMacro, ('', fid)),
+                   (self.getFilesUsingTypedef, (fid,)),
+                   (self.getFilesUsingDataType, (fid,)),
+                   (self.getFilesUsingEnum, (fid,)),
+                   (self.getFilesUsingFunc, ('',)),
+                   (self.getFilesUsingVariable, (fid,)),
+                   )
+
+        cursor = self.cursor
+        self.cursor = QueryPlanCursor(cursor)
+        try:
+            for func, args in queries:
+                try:
+                    func(*args)
+                except TypeError:
+                    # getFilePath() on an empty result
+                    pass
+            plans = self.cursor.plans
+        finally:
+            self.cursor = cursor
+
+        return [(sql, plan) for sql, plan in plans
+                if [p for p in plan if p[-1].startswith('SCAN') and 'INDEX' not in p[-1]]]
+
     def createTable(self, tableName, fields):
         cmd = 'CREATE TABLE %s (%s)' % (tableName, ', '.join([' '.join(field) for field in fields]))
         #print cmd
@@ -465,85 +781,293 @@ class DatabaseManager:
     def addData(self, info):
         self.addFiles(info)
 
-        includes_queue = deque()
-
         for filename in info.keys():
-            root_fid = self.getFid(filename)
-            root_info = info[filename]
-            includes_queue.append((root_fid, 0, root_info['includes']))
-
-            while includes_queue:
-                parent_fid, depth, includes = includes_queue.popleft()
-
-                for include in includes:
-                    child_fid = self.getFid(include[1])
-                    self.addInclude(root_fid, parent_fid, child_fid, include, depth)
-                    child_info = include[-1]
-
-                    if child_info:
-                        self.addMacroDefs(child_fid, child_info['defines'])
-                        self.addMacroUndefs(child_fid, child_info['undefs'])
-                        self.addMacroCalls(child_fid, child_info['macroCalls'])
-
-                        if child_info.has_key('pragmas'):
-                            self.addPragma(child_fid, child_info['pragmas'])
-
-                        if child_info.has_key('data_types'):
-                            self.addDataTypes(child_fid, child_info['data_types'])
-                            self.addTypedefs(child_fid, child_info['typedefs'])
-                            self.addVariables(child_fid, child_info['variables'])
-                            self.addFunctions(child_fid, child_info['function_prototypes'])
-                            self.addFunctions(child_fid, child_info['function_definitions'], isDef=True)
-                            for name, (_,_,_,func_info,_) in child_info['function_definitions'].items():
-                                self.addFunctionDefInfo(child_fid, self.getFuncId(name, isDef=True), func_info)
-
-                        includes_queue.append((child_fid, depth+1, child_info['includes']))
-
-            self.addMacroDefs(root_fid, root_info['defines'])
-            self.addMacroUndefs(root_fid, root_info['undefs'])
-            self.addMacroCalls(root_fid, root_info['macroCalls'])
-
-            if root_info.has_key('pragmas'):
-                self.addPragma(root_fid, root_info['pragmas'])
-
-            if root_info.has_key('data_types'):
-                self.addDataTypes(root_fid, root_info['data_types'])
-                self.addTypedefs(root_fid, root_info['typedefs'])
-                self.addVariables(root_fid, root_info['variables'])
-                self.addFunctions(root_fid, root_info['function_prototypes'])
-                self.addFunctions(root_fid, root_info['function_definitions'], isDef=True)
-                for name, (_,_,_,func_info,_) in root_info['function_definitions'].items():
-                    self.addFunctionDefInfo(root_fid, self.getFuncId(name, isDef=True), func_info)
+            self.addDefinitions(self.getFid(filename), info[filename])
 
         for filename in info.keys():
-            root_fid = self.getFid(filename)
-            root_info = info[filename]
-            includes_queue.append((root_fid, 0, root_info['includes']))
-
-            while includes_queue:
-                parent_fid, depth, includes = includes_queue.popleft()
-
-                for include in includes:
-                    child_fid = self.getFid(include[1])
-                    child_info = include[-1]
-
-                    if child_info:
-                        if child_info.has_key('data_types'):
-                            self.addSymbolUsages(child_fid, child_info['global_symbol_usage'])
-                            for name, (_,_,_,func_info,_) in child_info['function_definitions'].items():
-                                self.addFunctionUsageInfo(child_fid, self.getFuncId(name, isDef=True), func_info)
-
-                        includes_queue.append((child_fid, depth+1, child_info['includes']))
-
-            if root_info.has_key('data_types'):
-                self.addSymbolUsages(root_fid, root_info['global_symbol_usage'])
-                for name, (_,_,_,func_info,_) in root_info['function_definitions'].items():
-                    #print name
-                    #for k, v in func_info.items():
-                    #    print k
-                    #    print v
-                    #print
-                    self.addFunctionUsageInfo(root_fid, self.getFuncId(name, isDef=True), func_info)
+            self.addUsages(self.getFid(filename), info[filename])
+
+        self.unresolvedCalls.clear()
+
+    def addTranslationUnit(self, info):
+        '''
+        add a single preprocessed and parsed file as soon as it is available
+
+        function calls which cannot be resolved yet are kept and resolved
+        by resolveFunctionCalls() once all files are added
+        '''
+        self.addFiles({info['path']: info})
+
+        root_fid = self.getFid(info['path'])
+        self.addDefinitions(root_fid, info)
+        self.addUsages(root_fid, info)
+
+        if info.has_key('time'):
+            self.cursor.execute('INSERT INTO AnalysisTime VALUES (?,?)', (root_fid, info['time']))
+
+    def resolveFunctionCalls(self):
+        while self.unresolvedCalls:
+            name, fid, row, col = self.unresolvedCalls.popleft()
+            self.cursor.execute('UPDATE FunctionCall SET symId=? WHERE fid=? AND row=? AND col=?',
+                                (self.funcNameTbl.get(name), fid, row, col))
+
+    def resolveReferences(self):
+        '''
+        resolve references by name which could not be resolved while files were added or removed
+        '''
+        self.resolveFunctionCalls()
+
+        while self.unresolvedDataTypes:
+            tableName, rowid, name = self.unresolvedDataTypes.popleft()
+            self.cursor.execute('UPDATE %s SET dataTypeId=? WHERE rowid=?' % tableName,
+                                (self.dataTypeNameTbl.get(name), rowid))
+
+        while self.unresolvedUsages:
+            usageTable, fid, row, col, tableName, name, sym_fid, idx = self.unresolvedUsages.popleft()
+            symId = self.cursor.execute('SELECT rowid FROM %s WHERE fid=? AND name IS ? ORDER BY rowid LIMIT 1 OFFSET ?' % tableName,
+                                        (sym_fid, name, idx)).fetchone()
+            self.cursor.execute('UPDATE %s SET symId=? WHERE fid=? AND row=? AND col=?' % usageTable,
+                                (symId[0] if symId else None, fid, row, col))
+
+    def updateFiles(self, srcFiles):
+        '''
+        compare the files of an existing database against the files on disk
+
+        rows of changed files, of files which include them and of files no longer
+        reachable from srcFiles are removed. returns the source files which have
+        to be analyzed again
+        '''
+        #
+        # files whose content changed
+        #
+        changed = set()
+        for fid, path, size, numLn, sha1 in self.cursor.execute('SELECT rowid, path, size, numLines, SHA1 FROM File').fetchall():
+            fileInfo = self.getFileInfo(path)
+            if fileInfo != (size, numLn, sha1):
+                changed.add(fid)
+                self.cursor.execute('UPDATE File SET size=?, numLines=?, SHA1=? WHERE rowid=?', fileInfo + (fid,))
+
+        #
+        # files which include a changed file directly or indirectly
+        #
+        includedBy = defaultdict(set)
+        for parent_fid, child_fid in self.cursor.execute('SELECT DISTINCT fid, path_fid FROM Include').fetchall():
+            includedBy[child_fid].add(parent_fid)
+
+        dirty = set(changed)
+        stack = deque(changed)
+        while stack:
+            for parent_fid in includedBy[stack.pop()]:
+                if parent_fid not in dirty:
+                    dirty.add(parent_fid)
+                    stack.append(parent_fid)
+
+        #
+        # files which are no longer reachable from any of the source files
+        #
+        removed = self.getUnreachableFiles(srcFiles)
+
+        self.cursor.executemany('DELETE FROM File WHERE rowid=?', [(fid,) for fid in removed])
+        self.removeFiles(dirty | removed)
+
+        self.presentFids = set(self.fidTbl.values()) - dirty
+
+        return [path for path in srcFiles if self.fidTbl.get(path) not in self.presentFids]
+
+    def getUnreachableFiles(self, srcFiles):
+        '''
+        returns the fids of the files which no source file includes in the Include table
+        '''
+        srcFids = set([self.fidTbl[path] for path in srcFiles if self.fidTbl.has_key(path)])
+        reachable = set(srcFids)
+        reachable.add(self.fidTbl.get('predefined'))
+        for root_fid, path_fid in self.cursor.execute('SELECT DISTINCT root_fid, path_fid FROM Include').fetchall():
+            if root_fid in srcFids:
+                reachable.add(path_fid)
+        return set(self.fidTbl.values()) - reachable
+
+    def removeUnreachableFiles(self, srcFiles):
+        '''
+        delete the files which the source files analyzed again no longer include
+
+        updateFiles() only knows the includes of the previous run, so this runs
+        once the changed files are added
+        '''
+        removed = self.getUnreachableFiles(srcFiles)
+        self.cursor.executemany('DELETE FROM File WHERE rowid=?', [(fid,) for fid in removed])
+        self.removeFiles(removed)
+        return removed
+
+    def removeFiles(self, fids):
+        '''
+        delete every row which belongs to the files, except their File rows
+        '''
+        if not fids:
+            return
+
+        self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS RemovedFile (fid INTEGER PRIMARY KEY)')
+        self.cursor.execute('DELETE FROM RemovedFile')
+        self.cursor.executemany('INSERT INTO RemovedFile VALUES (?)', [(fid,) for fid in fids])
+
+        #
+        # other files refer to functions and data types by name
+        #
+        self.unresolvedCalls.extend(self.cursor.execute('''
+                SELECT F.name, C.fid, C.row, C.col
+                FROM FunctionCall C INNER JOIN Function F ON C.symId=F.rowid
+                WHERE F.fid IN RemovedFile AND NOT C.fid IN RemovedFile
+                ''').fetchall())
+        for tableName in ('Typedef', 'Variable'):
+            self.unresolvedDataTypes.extend([(tableName, rowid, name) for rowid, name in self.cursor.execute('''
+                    SELECT T.rowid, D.name
+                    FROM %s T INNER JOIN DataType D ON T.dataTypeId=D.rowid
+                    WHERE D.fid IN RemovedFile AND NOT T.fid IN RemovedFile
+                    ''' % tableName).fetchall()])
+
+        #
+        # usages in other files refer to symbols by rowid. a symbol is found again
+        # by its name, its file and its index among the rows of that name and file
+        #
+        for usageTable, tableName in (('TypedefUsage', 'Typedef'), ('VariableUsage', 'Variable'),
+                                      ('DataTypeUsage', 'DataType'), ('EnumUsage', 'DataTypeField'),
+                                      ('FunctionUsage', 'Function')):
+            symRowids = {}
+            for fid, row, col, symId, name, sym_fid in self.cursor.execute('''
+                    SELECT U.fid, U.row, U.col, S.rowid, S.name, S.fid
+                    FROM %s U INNER JOIN %s S ON U.symId=S.rowid
+                    WHERE S.fid IN RemovedFile AND NOT U.fid IN RemovedFile
+                    ''' % (usageTable, tableName)).fetchall():
+                if not symRowids.has_key((name, sym_fid)):
+                    symRowids[(name, sym_fid)] = [rowid for (rowid,) in self.cursor.execute(
+                            'SELECT rowid FROM %s WHERE fid=? AND name IS ? ORDER BY rowid' % tableName, (sym_fid, name)).fetchall()]
+                self.unresolvedUsages.append((usageTable, fid, row, col, tableName, name, sym_fid,
+                                              symRowids[(name, sym_fid)].index(symId)))
+
+        self.cursor.execute('DELETE FROM BlockLink WHERE blockId IN (SELECT rowid FROM Block WHERE fid IN RemovedFile)')
+        self.cursor.execute('DELETE FROM ControlStatementLink WHERE ctrlId IN (SELECT rowid FROM ControlStatement WHERE fid IN RemovedFile)')
+        self.cursor.execute('''
+                DELETE FROM IfElseLink
+                WHERE ifId IN (SELECT rowid FROM ControlStatement WHERE fid IN RemovedFile)
+                   OR elseId IN (SELECT rowid FROM ControlStatement WHERE fid IN RemovedFile)
+                ''')
+        self.cursor.execute('DELETE FROM SwitchCaseLink WHERE switchId IN (SELECT rowid FROM ControlStatement WHERE fid IN RemovedFile)')
+        self.cursor.execute('DELETE FROM DataTypeLink WHERE dataTypeId IN (SELECT rowid FROM DataType WHERE fid IN RemovedFile)')
+        self.cursor.execute('DELETE FROM FuncParamLink WHERE funcId IN (SELECT rowid FROM Function WHERE fid IN RemovedFile)')
+        self.cursor.execute('DELETE FROM Include WHERE root_fid IN RemovedFile')
+
+        for tableName in ('MacroDef', 'MacroUndef', 'MacroUsage', 'Pragma', 'DataType', 'DataTypeField',
+                          'DataTypeUsage', 'EnumUsage', 'Function', 'FunctionParam', 'FunctionUsage',
+                          'FunctionCall', 'Typedef', 'TypedefUsage', 'Variable', 'VariableUsage',
+                          'BuiltinTypeUsage', 'Block', 'Label', 'Jump', 'ControlStatement', 'AnalysisTime',
+                          'Metrics', 'FunctionBody'):
+            self.cursor.execute('DELETE FROM %s WHERE fid IN RemovedFile' % tableName)
+
+        self.loadIdMaps()
+
+    def addDefinitions(self, root_fid, root_info):
+        includes_queue = deque([(root_fid, 0, root_info['includes'])])
+
+        while includes_queue:
+            parent_fid, depth, includes = includes_queue.popleft()
+
+            for include in includes:
+                child_fid = self.getFid(include[1])
+                self.addInclude(root_fid, parent_fid, child_fid, include, depth)
+                child_info = include[-1]
+
+                if child_info:
+                    if self.isIngested('definitions', child_fid, child_info):
+                        self.skippedInserts += self.countDefinitions(child_info)
+                    else:
+                        self.addFileDefinitions(child_fid, child_info)
+                    includes_queue.append((child_fid, depth+1, child_info['includes']))
+
+        self.addFileDefinitions(root_fid, root_info)
+
+    def addFileDefinitions(self, fid, info):
+        self.addMacroDefs(fid, info['defines'])
+        self.addMacroUndefs(fid, info['undefs'])
+        self.addMacroCalls(fid, info['macroCalls'])
+
+        if info.has_key('pragmas'):
+            self.addPragma(fid, info['pragmas'])
+
+        if info.has_key('data_types'):
+            self.addDataTypes(fid, info['data_types'])
+            self.addTypedefs(fid, info['typedefs'])
+            self.addVariables(fid, info['variables'])
+            self.addFunctions(fid, info['function_prototypes'])
+            self.addFunctions(fid, info['function_definitions'], isDef=True)
+            for name, (_,_,_,func_info,_) in info['function_definitions'].items():
+                self.addFunctionDefInfo(fid, self.getFuncId(name, isDef=True), func_info)
+                if func_info.has_key('body'):
+                    self.addFunctionBody(fid, self.getFuncId(name, isDef=True), func_info['body'])
+
+    def addUsages(self, root_fid, root_info):
+        includes_queue = deque([(root_fid, 0, root_info['includes'])])
+
+        while includes_queue:
+            parent_fid, depth, includes = includes_queue.popleft()
+
+            for include in includes:
+                child_fid = self.getFid(include[1])
+                child_info = include[-1]
+
+                if child_info:
+                    if self.isIngested('usages', child_fid, child_info):
+                        self.skippedInserts += self.countUsages(child_info)
+                    else:
+                        self.addFileUsages(child_fid, child_info)
+                    includes_queue.append((child_fid, depth+1, child_info['includes']))
+
+        self.addFileUsages(root_fid, root_info)
+
+    def getFingerprint(self, info):
+        '''
+        returns a key which differs when a header is preprocessed under a different configuration
+        '''
+        fingerprint = [tuple([d[-1] for d in info['defines']]),
+                       tuple([u[-1] for u in info['undefs']]),
+                       tuple([m[-1] for m in info['macroCalls']]),
+                       tuple([(i[1], i[2]) for i in info['includes']]),
+                       ]
+        if info.has_key('data_types'):
+            for key in ('data_types', 'typedefs', 'variables', 'function_prototypes', 'function_definitions'):
+                fingerprint.append(tuple(sorted(info[key].keys())))
+        return hash(tuple(fingerprint))
+
+    def isIngested(self, phase, fid, info):
+        '''
+        returns True if the header was already added under the same configuration, otherwise marks it as added
+        '''
+        if fid in self.presentFids:
+            return True
+
+        key = (phase, fid, self.getFingerprint(info))
+        if key in self.ingested:
+            return True
+        self.ingested.add(key)
+        return False
+
+    def countDefinitions(self, info):
+        count = len(info['defines']) + len(info['undefs']) + len(info['macroCalls'])
+        if info.has_key('pragmas'):
+            count += len(info['pragmas'])
+        if info.has_key('data_types'):
+            for key in ('data_types', 'typedefs', 'variables', 'function_prototypes', 'function_definitions'):
+                count += len(info[key])
+        return count
+
+    def countUsages(self, info):
+        if not info.has_key('data_types'):
+            return 0
+        return sum([len(v) for v in info['global_symbol_usage'].values()]) + len(info['function_definitions'])
+
+    def addFileUsages(self, fid, info):
+        if info.has_key('data_types'):
+            self.addSymbolUsages(fid, info['global_symbol_usage'])
+            for name, (_,_,_,func_info,_) in info['function_definitions'].items():
+                self.addFunctionUsageInfo(fid, self.getFuncId(name, isDef=True), func_info)
 
     def addFunctionDefInfo(self, fid, funcId, funcInfo, blockId=None, numBlocks=0, numIterNest=0, numSelNest=0, ifId=None, ctrlId=None):
         if funcInfo.has_key('block'):
@@ -648,6 +1172,45 @@ class DatabaseManager:
             for expr, info, pos in funcInfo['do']:
                 if info: self.addFunctionUsageInfo(fid, funcId, info, blockId)
 
+    def addFunctionBody(self, fid, funcId, body):
+        tokens = body[0]
+        self.cursor.execute('INSERT OR IGNORE INTO FunctionBody VALUES (?,?,?,?,?,?,?,0,?)',
+                (funcId,
+                 fid,
+                 tokens[0][TOK_ROW],
+                 tokens[0][TOK_COL],
+                 tokens[-1][TOK_ROW],
+                 tokens[-1][TOK_COL],
+                 len(tokens),
+                 sqlite3.Binary(cPickle.dumps(body, cPickle.HIGHEST_PROTOCOL)),
+                 ))
+
+    def parseFunctionBodies(self, fid=None):
+        '''
+        parse the function bodies of the file, or of all files if fid is None, which were
+        skipped in declarations only mode and add what they contain like a full analysis does
+
+        the queries of what is inside function bodies call this first
+        '''
+        if fid is None:
+            rows = self.cursor.execute('SELECT rowid, funcId, fid, body FROM FunctionBody WHERE isParsed=0').fetchall()
+        else:
+            rows = self.cursor.execute('SELECT rowid, funcId, fid, body FROM FunctionBody WHERE fid=? AND isParsed=0', (fid,)).fetchall()
+        if not rows:
+            return
+
+        if not self.bodyParser:
+            self.bodyParser = Parser(logPath=os.path.splitext(self.dbPath)[0] + '.parser.log')
+
+        for rowid, funcId, _fid, body in rows:
+            funcInfo = self.bodyParser.parse_function_body(cPickle.loads(str(body)), self.getFilePath(_fid))
+            self.addFunctionDefInfo(_fid, funcId, funcInfo)
+            self.addFunctionUsageInfo(_fid, funcId, funcInfo)
+            self.cursor.execute('UPDATE FunctionBody SET isParsed=1, body=NULL WHERE rowid=?', (rowid,))
+
+        self.resolveReferences()
+        self.conn.commit()
+
     def addBlock(self, fid, funcId, ctrlId, block, parentBlockId, depth):
         self.cursor.execute('INSERT INTO Block VALUES (?,?,?,?,?,?,?,?)',
                 (fid,
@@ -838,22 +1401,25 @@ class DatabaseManager:
                         stack.append(inc[-1]['includes'])
                         files.add(inc[-1]['path'])
 
-        fileInfos = deque()
         for path in sorted(files):
-            if os.path.isfile(path):
-                with open(path) as f:
-                    data = f.read()
-                    fileInfos.append((path, len(data), data.count('\n')+1, sha.new(data).hexdigest()))
-            else:
-                fileInfos.append((path, 0, 0, ''))
+            if self.fidTbl.has_key(path):
+                continue
+            size, numLn, sha1 = self.getFileInfo(path)
 
-        self.insertMany('File',
-                        '?,?,?,?,?',
-                        [(path,
-                          size,
-                          numLn,
-                          path.endswith('.c'),
-                          sha1) for path, size, numLn, sha1 in fileInfos])
+            self.cursor.execute('INSERT INTO File VALUES (?,?,?,?,?)',
+                                (path, size, numLn, path.endswith('.c'), sha1))
+            self.fidTbl[path] = self.cursor.lastrowid
+
+    def getFileInfo(self, path):
+        '''
+        returns (size, numLines, SHA1) of the file as stored in the File table
+        '''
+        if not os.path.isfile(path):
+            return 0, 0, ''
+
+        with open(path) as f:
+            data = f.read()
+        return len(data), data.count('\n')+1, sha.new(data).hexdigest()
 
     def addMacroDefs(self, fid, macros):
         self.insertMany('MacroDef',
@@ -935,15 +1501,13 @@ class DatabaseManager:
         #
         # check if the datatype already exists
         #
-        self.cursor.execute('SELECT rowid FROM DataType WHERE fid=? AND row=? AND col=?',
-                            (fid, loc[0], loc[1]))
-        ret = self.cursor.fetchone()
+        ret = self.posIdTbl['DataType'].get((fid, loc[0], loc[1]))
 
         if ret:
             #
             # exist
             #
-            return ret[0]
+            return ret
 
         #
         # add data type
@@ -951,8 +1515,9 @@ class DatabaseManager:
         self.cursor.execute('INSERT INTO DataType VALUES (?,?,?,?,?,?)',
                             (type, name, fields is not None, fid, loc[0], loc[1]))
 
-        self.cursor.execute('SELECT last_insert_rowid()')
-        dataTypeId = self.cursor.fetchone()[0]
+        dataTypeId = self.addId('DataType', name, fid, loc[0], loc[1])
+        if fields is not None and name is not None:
+            self.dataTypeNameTbl.setdefault(name, dataTypeId)
 
         #
         # if there are fields, add them into DataTypeField table
@@ -984,6 +1549,7 @@ class DatabaseManager:
                              field[7][0], # row
                              field[7][1], # col
                              ))
+                    self.addId('DataTypeField', field[4], fid, field[7][0], field[7][1])
                 else:
                     self.cursor.execute('INSERT OR IGNORE INTO DataTypeField VALUES (?,NULL,NULL,?,?,?,?,?,?,?)',
                             (field[0],    # type
@@ -995,6 +1561,7 @@ class DatabaseManager:
                              field[7][0], # row
                              field[7][1], # col
                              ))
+                    self.addId('DataTypeField', field[4], fid, field[7][0], field[7][1])
             #
             # else if the field is function poitner
             #
@@ -1013,6 +1580,7 @@ class DatabaseManager:
                          field[7][0], # row
                          field[7][1], # col
                          ))
+                self.addId('DataTypeField', field[4], fid, field[7][0], field[7][1])
             else:
                 self.cursor.execute('INSERT OR IGNORE INTO DataTypeField VALUES (?,NULL,NULL,?,?,?,?,?,?,?)',
                         (field[0],    # type
@@ -1024,6 +1592,7 @@ class DatabaseManager:
                          field[7][0], # row
                          field[7][1], # col
                          ))
+                self.addId('DataTypeField', field[4], fid, field[7][0], field[7][1])
             #
             # link DataTYpe and DataTypeField
             #
@@ -1047,37 +1616,29 @@ class DatabaseManager:
             for name, defs in functions.items():
                 while defs:
                     storageSpec, funcSpec, funcType, pos = defs.popleft()
-                    self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                            (fid, pos[0], pos[1]))
-                    if self.cursor.fetchall():
+                    if self.posIdTbl['Function'].has_key((fid, pos[0], pos[1])):
                         # exists
                         continue
                     self.addFunction(storageSpec, funcSpec, funcType, name, pos, fid, isDef)
         elif not isDef:
             for name, (storageSpec, funcSpec, funcType, pos) in functions.items():
-                self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                        (fid, pos[0], pos[1]))
-                if self.cursor.fetchall():
+                if self.posIdTbl['Function'].has_key((fid, pos[0], pos[1])):
                     # exists
                     continue
                 self.addFunction(storageSpec, funcSpec, funcType, name, pos, fid, isDef)
         else:
             for name, (storageSpec, funcSpec, funcType, funcInfo, pos) in functions.items():
-                self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                        (fid, pos[0], pos[1]))
-                if self.cursor.fetchall():
+                if self.posIdTbl['Function'].has_key((fid, pos[0], pos[1])):
                     # exists
                     continue
                 self.addFunction(storageSpec, funcSpec, funcType, name, pos, fid, isDef)
 
     def addFunction(self, storageSpec, funcSpec, funcType, name, pos, fid, isDef=False):
         retType, retRefType, params, _pos = funcType
-        self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                (fid, pos[0], pos[1]))
-        ret = self.cursor.fetchall()
+        ret = self.posIdTbl['Function'].get((fid, pos[0], pos[1]))
         if ret:
             # exists
-            return ret[0][0]
+            return ret
 
         #print storageSpec, retType, retRefType, name, params, pos, _pos, fid
         if isinstance(retType, str):
@@ -1097,8 +1658,10 @@ class DatabaseManager:
                  pos[0],     # row
                  pos[1],     # col
                  ))
-        self.cursor.execute('SELECT last_insert_rowid()')
-        funcId = self.cursor.fetchone()[0]
+        funcId = self.addId('Function', name, fid, pos[0], pos[1])
+        if name is not None:
+            self.funcNameTbl.setdefault(name, funcId)
+            self.funcDefTbl.setdefault((name, bool(isDef)), funcId)
         while params:
             typeSpec, structUnionInfo, funcType, ref, name, dim, pos = params.popleft()
             if pos is None:
@@ -1130,75 +1693,69 @@ class DatabaseManager:
         return funcId
 
     def addSymbolUsages(self, fid, usage, funcId=None, blockId=None):
+        rows = defaultdict(list)
         for (name, sym_type, sym_path, sym_pos), values in usage.items():
             if sym_type == BUILTIN:
                 self.cursor.execute('INSERT OR IGNORE INTO BuiltinType VALUES (?)', (name,))
-                self.cursor.execute('SELECT last_insert_rowid()')
+                if self.cursor.rowcount == 1:
+                    self.builtinTypeTbl[name] = self.cursor.lastrowid
                 tableName = 'BuiltinTypeUsage'
+                symId = self.builtinTypeTbl.get(name)
             else:
                 if sym_path:
-                    self.cursor.execute('SELECT rowid FROM File WHERE path=?', (sym_path,))
-                    sym_fid = self.cursor.fetchone()[0]
+                    sym_fid = self.fidTbl[sym_path]
                 else:
                     sym_fid = fid
 
                 if sym_type == VARIABLE:
                     tableName = 'VariableUsage'
-                    self.cursor.execute('SELECT rowid FROM Variable WHERE name=? AND fid=? AND row=? AND col=?',
-                                        (name, sym_fid, sym_pos[0], sym_pos[1]))
+                    symId = self.symIdTbl['Variable'].get((name, sym_fid, sym_pos[0], sym_pos[1]))
                 elif sym_type == FUNCTION:
                     tableName = 'FunctionUsage'
-                    self.cursor.execute('SELECT rowid FROM Function WHERE name=? AND fid=? AND row=? AND col=?',
-                                        (name, sym_fid, sym_pos[0], sym_pos[1]))
+                    symId = self.symIdTbl['Function'].get((name, sym_fid, sym_pos[0], sym_pos[1]))
                 elif sym_type == TYPEDEF:
                     tableName = 'TypedefUsage'
-                    self.cursor.execute('SELECT rowid FROM Typedef WHERE name=? AND fid=?',
-                                        (name, sym_fid))
+                    symId = self.typedefTbl.get((name, sym_fid))
                 elif sym_type == DATA_TYPE:
                     tableName = 'DataTypeUsage'
-                    self.cursor.execute('SELECT rowid FROM DataType WHERE name=? AND fid=? AND row=? AND col=?',
-                                        (name, sym_fid, sym_pos[0], sym_pos[1]))
+                    symId = self.symIdTbl['DataType'].get((name, sym_fid, sym_pos[0], sym_pos[1]))
                 else: # ENUM_TYPE
                     tableName = 'EnumUsage'
-                    self.cursor.execute('SELECT rowid FROM DataTypeField WHERE name=? AND fid=? AND row=? AND col=?',
-                                        (name, sym_fid, sym_pos[0], sym_pos[1]))
-
-            ret = self.cursor.fetchone()
-            self.cursor.executemany('INSERT OR IGNORE INTO %s VALUES (?,?,?,?,?,?,?)' % tableName,
-                    [(None if not ret else ret[0], # symid
-                      expr,        # expression
-                      fid,         # fid
-                      funcId,      # funcId
-                      blockId,     # blockId
-                      pos[0],      # row
-                      pos[1],      # col
-                      ) for expr, pos in values])
+                    symId = self.symIdTbl['DataTypeField'].get((name, sym_fid, sym_pos[0], sym_pos[1]))
+
+            rows[tableName].extend([(symId,      # symid
+                                     expr,       # expression
+                                     fid,        # fid
+                                     funcId,     # funcId
+                                     blockId,    # blockId
+                                     pos[0],     # row
+                                     pos[1],     # col
+                                     ) for expr, pos in values])
+
+        for tableName, valueList in rows.items():
+            self.cursor.executemany('INSERT OR IGNORE INTO %s VALUES (?,?,?,?,?,?,?)' % tableName, valueList)
 
     def addFunctionCalls(self, fid, funcId, blockId, func_calls):
+        rows = []
         for (name, sym_path, sym_pos), values in func_calls.items():
             if sym_path:
-                self.cursor.execute('SELECT rowid FROM File WHERE path=?', (sym_path,))
-                sym_fid = self.cursor.fetchone()[0]
-                self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                                    (sym_fid, sym_pos[0], sym_pos[1]))
-                ret = self.cursor.fetchone()
+                symId = self.posIdTbl['Function'].get((self.fidTbl[sym_path], sym_pos[0], sym_pos[1]))
             elif sym_pos:
-                self.cursor.execute('SELECT rowid FROM Function WHERE fid=? AND row=? AND col=?',
-                                    (fid, sym_pos[0], sym_pos[1]))
-                ret = self.cursor.fetchone()
+                symId = self.posIdTbl['Function'].get((fid, sym_pos[0], sym_pos[1]))
             else:
-                self.cursor.execute('SELECT rowid FROM Function WHERE name=?',
-                                    (name,))
-                ret = self.cursor.fetchone()
-            self.cursor.executemany('INSERT OR IGNORE INTO FunctionCall VALUES (?,?,?,?,?,?,?)',
-                    [(None if not ret else ret[0],   # symId
-                      expr,   # expression
-                      fid,    # file ID
-                      funcId, # function ID
-                      blockId,# block ID
-                      pos[0], # row
-                      pos[1], # col
-                      ) for expr, pos in values])
+                symId = self.funcNameTbl.get(name)
+                if not symId:
+                    self.unresolvedCalls.extend([(name, fid, pos[0], pos[1]) for expr, pos in values])
+            rows.extend([(symId,   # symId
+                          expr,    # expression
+                          fid,     # file ID
+                          funcId,  # function ID
+                          blockId, # block ID
+                          pos[0],  # row
+                          pos[1],  # col
+                          ) for expr, pos in values])
+
+        self.cursor.executemany('INSERT OR IGNORE INTO FunctionCall VALUES (?,?,?,?,?,?,?)', rows)
 
     def addTypedefs(self, fid, typedefs):
         for name, val in typedefs.items():
@@ -1216,8 +1773,7 @@ class DatabaseManager:
                     # if there is ident
                     #
                     if dataType[1]:
-                        self.cursor.execute("SELECT rowid FROM DataType WHERE name=? AND hasFields=1", (dataType[1],))
-                        dataTypeId = self.cursor.fetchone()[0]
+                        dataTypeId = self.dataTypeNameTbl[dataType[1]]
                     else:
                         dataTypeId = self.addDataType(fid, dataType[0], dataType[1], dataType[2], dataType[3])
                     self.cursor.execute('INSERT OR IGNORE INTO Typedef VALUES (?,?,NULL,?,?,?,?,?,?)',
@@ -1230,6 +1786,8 @@ class DatabaseManager:
                              val[-1][0], # row
                              val[-1][1], # col
                              ))
+                    if self.cursor.rowcount == 1:
+                        self.typedefTbl.setdefault((name, fid), self.cursor.lastrowid)
                 else:
                     self.cursor.execute('INSERT OR IGNORE INTO Typedef VALUES (?,NULL,NULL,?,?,?,?,?,?)',
                             (val[0], # type
@@ -1240,6 +1798,8 @@ class DatabaseManager:
                              val[-1][0], # row
                              val[-1][1], # col
                              ))
+                    if self.cursor.rowcount == 1:
+                        self.typedefTbl.setdefault((name, fid), self.cursor.lastrowid)
             #
             # else if typedef of function pointer
             #
@@ -1259,6 +1819,8 @@ class DatabaseManager:
                          val[-1][0], # row
                          val[-1][1], # col
                          ))
+                if self.cursor.rowcount == 1:
+                    self.typedefTbl.setdefault((name, fid), self.cursor.lastrowid)
             else:
                 self.cursor.execute('INSERT OR IGNORE INTO Typedef VALUES (?,NULL,NULL,?,?,?,?,?,?)',
                         (val[0],     # type
@@ -1269,13 +1831,13 @@ class DatabaseManager:
                          val[-1][0], # row
                          val[-1][1], # col
                          ))
+                if self.cursor.rowcount == 1:
+                    self.typedefTbl.setdefault((name, fid), self.cursor.lastrowid)
 
     def addVariables(self, fid, variables, funcId=None, blockId=None):
         for name, vals in variables.items():
             for val in vals:
-                self.cursor.execute("SELECT rowid FROM Variable WHERE fid=? AND row=? AND col=?",
-                                    (fid, val[-1][0], val[-1][1]))
-                if self.cursor.fetchall():
+                if self.posIdTbl['Variable'].has_key((fid, val[-1][0], val[-1][1])):
                     continue
                 if val[2]:
                     ## struct/union/enum
@@ -1288,8 +1850,7 @@ class DatabaseManager:
                         # if there is ident
                         #
                         if dataType[1]:
-                            self.cursor.execute("SELECT rowid FROM DataType WHERE name=? AND hasFields=1", (dataType[1],))
-                            dataTypeId = self.cursor.fetchone()[0]
+                            dataTypeId = self.dataTypeNameTbl[dataType[1]]
                         else:
                             dataTypeId = self.addDataType(fid, dataType[0], dataType[1], dataType[2], dataType[3])
                         self.cursor.execute('INSERT OR IGNORE INTO Variable VALUES (?,?,?,NULL,?,?,?,?,?,?,?,?,?)',
@@ -1306,6 +1867,7 @@ class DatabaseManager:
                                  val[-1][0], # row
                                  val[-1][1], # col
                                  ))
+                        self.addId('Variable', name, fid, val[-1][0], val[-1][1])
                     else:
                         self.cursor.execute('INSERT OR IGNORE INTO Variable VALUES (?,?,NULL,NULL,?,?,?,?,?,?,?,?,?)',
                                 (val[0],     # storage class
@@ -1320,6 +1882,7 @@ class DatabaseManager:
                                  val[-1][0], # row
                                  val[-1][1], # col
                                  ))
+                        self.addId('Variable', name, fid, val[-1][0], val[-1][1])
                 elif val[3]:
                     #
                     # store function prototype
@@ -1340,6 +1903,7 @@ class DatabaseManager:
                              val[-1][0], # row
                              val[-1][1], # col
                              ))
+                    self.addId('Variable', name, fid, val[-1][0], val[-1][1])
                 else:
                     self.cursor.execute('INSERT INTO Variable VALUES (?,?,NULL,NULL,?,?,?,?,?,?,?,?,?)',
                             (val[0],     # storage class
@@ -1354,6 +1918,7 @@ class DatabaseManager:
                              val[-1][0], # row
                              val[-1][1], # col
                              ))
+                    self.addId('Variable', name, fid, val[-1][0], val[-1][1])
 
     def addReturns(self, fid, funcId, blockId, returns):
         self.cursor.executemany('INSERT INTO Jump VALUES (?,NULL,?,?,?,?,?,?)',
@@ -1367,14 +1932,10 @@ class DatabaseManager:
                   ) for r in returns])
 
     def getFid(self, path):
-        self.cursor.execute('SELECT rowid FROM File WHERE path=?', (path,))
-        ret = self.cursor.fetchone()
-        return None if not ret else ret[0]
+        return self.fidTbl.get(path)
 
     def getFuncId(self, func_name, isDef=False):
-        self.cursor.execute('SELECT rowid FROM Function WHERE name=? AND isDef=?', (func_name,isDef))
-        ret = self.cursor.fetchone()
-        return None if not ret else ret[0]
+        return self.funcDefTbl.get((func_name, bool(isDef)))
 
     def getMacros(self):
         self.cursor.execute('SELECT * FROM MacroDef')
@@ -1513,6 +2074,7 @@ class DatabaseManager:
         return self.cursor.execute('SELECT rowid,type,name FROM Typedef WHERE fid=?', (fid,)).fetchall()
 
     def getTypedefUsage(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT TU.symId,TU.usage,T.fid
@@ -1521,6 +2083,7 @@ class DatabaseManager:
                 ''', (fid,)).fetchall()
 
     def getDataTypeUsage(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT DU.symId,DU.usage,D.fid
@@ -1538,6 +2101,7 @@ class DatabaseManager:
                 ''', (fid,)).fetchall()
 
     def getEnumUsage(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT E.symId,E.usage,D.fid
@@ -1562,6 +2126,7 @@ class DatabaseManager:
         return None if ret is None else ret[0]
 
     def getFunctionUsage(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT FU.symId,FU.expression,F1.fid
@@ -1570,6 +2135,7 @@ class DatabaseManager:
                 ''', (fid,)).fetchall()
 
     def getFunctionCalls(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT FU.symId,FU.expression,F.fid
@@ -1589,9 +2155,11 @@ class DatabaseManager:
                 ''', (fid,)).fetchall()
 
     def getLocalVariables(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute('SELECT storageClass,name FROM Variable WHERE fid=? and funcId is not NULL', (fid,)).fetchall()
 
     def getVariableUsage(self, fid):
+        self.parseFunctionBodies(fid)
         return self.cursor.execute(
                 '''
                 SELECT VU.symId,VU.usage,V1.fid
@@ -1616,6 +2184,7 @@ class DatabaseManager:
                 ''', (name,)).fetchall()
 
     def getFilesUsingTypedef(self, id):
+        self.parseFunctionBodies()
         return self.cursor.execute(
                 '''
                 SELECT DISTINCT(TU.fid)
@@ -1624,6 +2193,7 @@ class DatabaseManager:
                 ''', (id,)).fetchall()
 
     def getFilesUsingDataType(self, id):
+        self.parseFunctionBodies()
         return self.cursor.execute(
                 '''
                 SELECT DISTINCT(DU.fid)
@@ -1632,6 +2202,7 @@ class DatabaseManager:
                 ''', (id,)).fetchall()
 
     def getFilesUsingEnum(self, id):
+        self.parseFunctionBodies()
         return self.cursor.execute(
                 '''
                 SELECT DISTINCT(U.fid)
@@ -1639,6 +2210,7 @@ class DatabaseManager:
                 WHERE F.rowid=?
                 ''', (id,)).fetchall()
     def getFilesUsingFunc(self, name):
+        self.parseFunctionBodies()
         return self.cursor.execute(
                 '''
                 SELECT DISTINCT(FU.fid)
@@ -1647,6 +2219,7 @@ class DatabaseManager:
                 ''', (name,)).fetchall()
 
     def getFilesUsingVariable(self, id):
+        self.parseFunctionBodies()
         return self.cursor.execute(
                 '''
                 SELECT DISTINCT(VU.fid)
@@ -1,13 +1,10 @@
 import os
 from xml.dom import minidom
-from multiprocessing import Process, Pipe, Queue
-import datetime
+from multiprocessing import Process, Pipe
 
 import wx
 
-from preprocessor import Preprocessor
-from parser import Parser
-from db_manager import DatabaseManager
+from analysis import analyze
 
 import project_pane
 import preprocessor_pane
@@ -25,6 +22,15 @@ class MainFrame(wx.Frame):
         self.analyzerOutDir = ''
         self.projInfo = {}
         self.dbname = ''
+        self.useRegexScanner = optionParser.useRegexScanner
+        self.tokenCacheDir = optionParser.tokenCacheDir
+        self.tokenCacheSize = optionParser.tokenCacheSize * 1024 * 1024
+        self.predefSnapshotDir = optionParser.predefSnapshotDir
+        self.saveCompressed = optionParser.saveCompressed
+        self.bulkLoad = optionParser.bulkLoad
+        self.incremental = optionParser.incremental
+        self.declarationsOnly = optionParser.declarationsOnly
+        self.treeFormat = optionParser.treeFormat
 
         self._initWigets()
 
@@ -242,11 +248,18 @@ class MainFrame(wx.Frame):
     def getPpCfg(self):
         cfg = self.ppPane.getValue()
         cfg.update(self.exePane.getPpLogValue())
+        cfg['useRegexScanner'] = self.useRegexScanner
+        cfg['tokenCacheDir'] = self.tokenCacheDir
+        cfg['tokenCacheSize'] = self.tokenCacheSize
+        cfg['predefSnapshotDir'] = self.predefSnapshotDir
+        cfg['saveCompressed'] = self.saveCompressed
         return cfg
 
     def getParserCfg(self):
         cfg = self.parserPane.getValue()
         cfg.update(self.exePane.getParserLogValue())
+        cfg['declarationsOnly'] = self.declarationsOnly
+        cfg['treeFormat'] = self.treeFormat
         return cfg
 
     def onExeBtn(self, event):
@@ -278,6 +291,8 @@ class MainFrame(wx.Frame):
                           self.exePane.numProcSc.GetValue(),
                           self.exePane.numPpProcSc.GetValue(),
                           self.exePane.numParserProcSc.GetValue(),
+                          self.bulkLoad,
+                          self.incremental,
                           ))
         p.start()
         dlg = wx.ProgressDialog('Executing',
@@ -309,123 +324,3 @@ class MainFrame(wx.Frame):
         self.exePane.dbPathTc.SetValue(os.path.join(self.analyzerOutDir, self.dbname))
 
         os.chdir(oldcwd)
-
-
-
-def analyze(snd_pipe, db_path, pp_cfg, parser_cfg, srcFiles, use_pipeline=False, analyzer_process=1, pp_process=1, parser_process=1):
-    db = DatabaseManager()
-    pp_list = [Preprocessor(**pp_cfg) for i in range(pp_process if use_pipeline else analyzer_process)]
-    parser_list = [Parser(**parser_cfg) for i in range(parser_process if use_pipeline else analyzer_process)]
-    numFiles = len(srcFiles)
-    use_pipeline = use_pipeline
-
-    t_0 = datetime.datetime.now()
-
-    projInfo = {}
-    projInfo['predefined'] = pp_list[0].preprocess_predef()
-
-    task_queue = Queue()
-    done_queue = Queue()
-
-    for i, srcFile in enumerate(srcFiles):
-        task_queue.put(srcFile)
-    for i in range(len(pp_list)):
-        task_queue.put('STOP')
-
-    if not use_pipeline:
-        analyzer_p_list = [Process(target=analyzer_worker, args=(pp, parser, task_queue, done_queue)) for pp, parser in zip(pp_list, parser_list)]
-        for analyzer_p in analyzer_p_list:
-            analyzer_p.start()
-
-        for i, srcFile in enumerate(srcFiles):
-            #print 'analyze: [%d/%d]' % (i,numFiles), srcFile
-            projInfo[srcFile] = done_queue.get()
-            snd_pipe.send((i, numFiles, srcFile))
-            if snd_pipe.poll():
-                for analyzer_p in analyzer_p_list:
-                    analyzer_p.terminate()
-                for analyzer_p in analyzer_p_list:
-                    analyzer_p.join()
-                Preprocessor.clearTokenCache()
-                snd_pipe.send('STOPPED')
-                print 'analyze: canceled'
-                return
-        for analyzer_p in analyzer_p_list:
-            analyzer_p.join()
-    else:
-        pp_queue = Queue()
-
-        pp_p_list = [Process(target=preprocessor_worker, args=(pp, task_queue, pp_queue)) for pp in pp_list]
-        for pp_p in pp_p_list:
-            pp_p.start()
-
-        parser_p_list = [Process(target=parser_worker, args=(parser, pp_queue, done_queue)) for parser in parser_list]
-        for parser_p in parser_p_list:
-            parser_p.start()
-
-        for i, srcFile in enumerate(srcFiles):
-            #print 'analyze: [%d/%d]' % (i,numFiles), srcFile
-            projInfo[srcFile] = done_queue.get()
-            snd_pipe.send((i, numFiles, srcFile))
-            if snd_pipe.poll():
-                for pp_p in pp_p_list:
-                    pp_p.terminate()
-                for parser_p in parser_p_list:
-                    parser_p.terminate()
-                for pp_p in pp_p_list:
-                    pp_p.join()
-                for parser_p in parser_p_list:
-                    parser_p.join()
-                Preprocessor.clearTokenCache()
-                snd_pipe.send('STOPPED')
-                print 'analyze: canceled'
-                return
-
-        for i in range(len(parser_p_list)):
-            pp_queue.put('STOP')
-        for pp_p in pp_p_list:
-            pp_p.join()
-        for parser_p in parser_p_list:
-            parser_p.join()
-
-    t_1 = datetime.datetime.now()
-
-    db.createDB(db_path)
-    db.addData(projInfo)
-    db.saveDB()
-
-    db.closeDB()
-
-    print 'analyze: done', t_1 - t_0
-    snd_pipe.send((numFiles, numFiles, 'Generating Database ... done'))
-
-def analyzer_worker(pp, parser, input_queue, output_queue):
-    t_0 = datetime.datetime.now()
-    counter = 0
-    for srcFile in iter(input_queue.get, 'STOP'):
-        #print 'analyzer_worker:', srcFile, counter
-        output_queue.put(parser.parse(pp.preprocess(srcFile)))
-        counter += 1
-    t_1 = datetime.datetime.now()
-    print 'analyzer_worker: done', t_1 - t_0
-
-def preprocessor_worker(pp, input_queue, output_queue):
-    t_0 = datetime.datetime.now()
-    counter = 0
-    for srcFile in iter(input_queue.get, 'STOP'):
-        #print 'preprocessor_worker:', srcFile, counter
-        output_queue.put(pp.preprocess(srcFile))
-        counter += 1
-    t_1 = datetime.datetime.now()
-    print 'preprocessor_worker: done', t_1 - t_0
-
-def parser_worker(parser, input_queue, output_queue):
-    t_0 = datetime.datetime.now()
-    counter = 0
-    for ppInfo in iter(input_queue.get, 'STOP'):
-        #print 'parsre_worker:', ppInfo if ppInfo == 'STOP' else ppInfo['path'], counter
-        output_queue.put(parser.parse(ppInfo))
-        counter += 1
-    t_1 = datetime.datetime.now()
-    print 'parser_worker: done', t_1 - t_0
-
@@ -23,7 +23,7 @@ class PpPane(base_pane.BasePane):
         self.processSysIncCb = wx.CheckBox(self, -1, u"Process #include <...> files")
         self.processSysIncCb.SetBackgroundColour((100,100,100))
 
-        sysIncDirs, appIncDirs = Preprocessor.getDefaultIncDirs()
+        sysIncDirs, appIncDirs = Preprocessor.getIncDirs(self.root.predefSnapshotDir)
         self._createSysIncWidgets(sysIncDirs)
         self._createAppIncWidgets(appIncDirs)
         self._createPredefMacroWidgets()
@@ -68,7 +68,7 @@ class PpPane(base_pane.BasePane):
         f = self.predefMacroLc.GetFont()
         f.SetFaceName("Monospace")
         self.predefMacroLc.SetFont(f)
-        for name, val in sorted(Preprocessor.getPredefMacros().items(), key=lambda i: i[0]):
+        for name, val in sorted(Preprocessor.getSnapshotPredefMacros(self.root.predefSnapshotDir).items(), key=lambda i: i[0]):
             idx = self.predefMacroLc.InsertStringItem(sys.maxint, name)
             self.predefMacroLc.SetStringItem(idx, 1, val)
             self.predefMacroLc.SetItemTextColour(idx, (255, 255, 255))
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+import cPickle
+import sha
+
+
+# number of parsed header variants kept by each parser
+DEFAULT_HEADER_CACHE_SIZE = 1024
+
+# parser state which decides how a header is parsed and which the header extends
+STATE_ATTRS = ('types', 'struct_union_enum_set', 'globals_set', 'globals')
+
+
+class RecordingSet:
+    '''
+    Set proxy which records membership tests answered by the state before the
+    header was parsed and the names added while it is parsed
+    '''
+
+    def __init__(self, target, attr, writes):
+        self.target = target
+        self.attr = attr
+        self.writes = writes
+        self.reads = {}
+        self.written = set()
+
+    def __contains__(self, name):
+        ret = name in self.target
+        if name not in self.written and not self.reads.has_key(name):
+            self.reads[name] = ret
+        return ret
+
+    def add(self, name):
+        self.target.add(name)
+        self.written.add(name)
+        self.writes.append((self.attr, name, None))
+
+    def __str__(self):
+        return str(self.target)
+
+
+class RecordingDict(RecordingSet):
+    '''
+    Mapping proxy of the globals table, see RecordingSet
+    '''
+
+    def __getitem__(self, name):
+        ret = self.target[name]
+        if name not in self.written and not self.reads.has_key(name):
+            self.reads[name] = ret
+        return ret
+
+    def __setitem__(self, name, value):
+        self.target[name] = value
+        self.written.add(name)
+        self.writes.append((self.attr, name, value))
+
+
+class HeaderCache:
+    '''
+    Parse results of headers, reused across translation units.
+
+    A header is keyed by its path and the digest of its preprocessed tokens,
+    which already reflect the macro state it was included with. How it parses
+    also depends on the typedef names and globals declared before it, so an
+    entry keeps every lookup of the parser state the header made and is only
+    reused while those lookups give the same answers. A hit replays the
+    additions to the parser state and restores the extracted information
+    without running the parser.
+    '''
+
+    def __init__(self, maxSize=DEFAULT_HEADER_CACHE_SIZE):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def getKey(self, info):
+        tokens = info['tokens']
+        digest = sha.new()
+        for column in (tokens.types, tokens.rows, tokens.cols):
+            digest.update(column.tostring())
+        digest.update('\0'.join(map(tokens.values.__getitem__, tokens.valueIds)))
+        return info['path'], digest.hexdigest()
+
+    def apply(self, key, parser, info):
+        '''
+        returns True if the header was restored from the cache
+        '''
+        entry = self.entries.get(key)
+        if entry is None or not self._isValid(entry[0], parser):
+            self.misses += 1
+            return False
+
+        reads, writes, data = entry
+        for attr, name, value in writes:
+            if attr == 'globals':
+                parser.globals[name] = value
+            else:
+                getattr(parser, attr).add(name)
+        info.update(cPickle.loads(data))
+
+        del self.entries[key]
+        self.entries[key] = entry
+        self.hits += 1
+        return True
+
+    def record(self, parser):
+        '''
+        let the parser state record what the header reads and adds
+        '''
+        writes = []
+        for attr in STATE_ATTRS:
+            recorder = RecordingDict if attr == 'globals' else RecordingSet
+            setattr(parser, attr, recorder(getattr(parser, attr), attr, writes))
+
+    def restore(self, parser):
+        '''
+        give the parser its state back. returns what the header read and added
+        '''
+        reads = []
+        for attr in STATE_ATTRS:
+            recorder = getattr(parser, attr)
+            setattr(parser, attr, recorder.target)
+            reads.append((attr, recorder.reads))
+        return reads, recorder.writes
+
+    def put(self, key, reads, writes, info, keys):
+        data = cPickle.dumps(dict([(k, info[k]) for k in keys]), cPickle.HIGHEST_PROTOCOL)
+        self.entries[key] = (reads, writes, data)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def _isValid(self, reads, parser):
+        for attr, attrReads in reads:
+            target = getattr(parser, attr)
+            if attr == 'globals':
+                for name, value in attrReads.iteritems():
+                    if target.get(name, ()) != value:
+                        return False
+            else:
+                for name, ret in attrReads.iteritems():
+                    if (name in target) != ret:
+                        return False
+        return True
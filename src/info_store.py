@@ -0,0 +1,70 @@
+from collections import deque
+import os
+import cPickle
+import sha
+import tempfile
+
+
+class InfoStore:
+    '''
+    Content addressed store of ppInfo and parse results shared by the
+    processes of an analysis.
+
+    put() pickles every node of the include tree on its own, without its
+    children, and writes it to a file named after the SHA1 of the bytes.
+    It returns a handle of nested (key, children) tuples which is all that
+    has to cross a queue. Headers which come out the same in many
+    translation units are written once and referenced by their key.
+
+    get() rebuilds the tree from a handle. The file of the root node is
+    removed as every translation unit is received once; header nodes are
+    kept until the store directory is removed.
+    '''
+
+    def __init__(self, storeDir):
+        self.storeDir = storeDir
+        self.keys = set()
+
+        if not os.path.exists(self.storeDir):
+            os.makedirs(self.storeDir)
+
+    def put(self, info):
+        includes = info['includes']
+        children = tuple([self.put(include[-1]) if include[-1] else None for include in includes])
+
+        node = dict(info)
+        node['includes'] = deque([include[:-1] for include in includes])
+        data = cPickle.dumps(node, cPickle.HIGHEST_PROTOCOL)
+        key = sha.new(data).hexdigest()
+
+        if key not in self.keys and not os.path.exists(os.path.join(self.storeDir, key)):
+            #
+            # write to a temporary file first so that other processes never see a partial node
+            #
+            fd, tmpPath = tempfile.mkstemp(dir=self.storeDir, prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmpPath, os.path.join(self.storeDir, key))
+        self.keys.add(key)
+
+        return key, children
+
+    def get(self, handle):
+        info = self._get(handle)
+
+        try:
+            os.remove(os.path.join(self.storeDir, handle[0]))
+        except OSError:
+            pass
+        self.keys.discard(handle[0])
+
+        return info
+
+    def _get(self, handle):
+        key, children = handle
+        with open(os.path.join(self.storeDir, key), 'rb') as f:
+            info = cPickle.loads(f.read())
+
+        info['includes'] = deque([include + (None if child is None else self._get(child),)
+                                  for include, child in zip(info['includes'], children)])
+        return info
@@ -0,0 +1,46 @@
+import os
+import json
+import logging
+
+
+class JsonTraceFormatter(logging.Formatter):
+    '''
+    Formats a log record as a JSON object per line.
+
+    Trace messages of the preprocessor and the parser start with the indent
+    of their recursion depth. It is turned back into a depth so that a trace
+    can be filtered and aggregated per grammar rule without parsing text.
+    '''
+
+    def __init__(self, indent):
+        logging.Formatter.__init__(self)
+        self.indent = indent
+
+    def format(self, record):
+        msg = record.getMessage()
+        text = msg.lstrip(' ')
+        return json.dumps({'logger': record.name,
+                           'level': record.levelname,
+                           'process': record.process,
+                           'func': record.funcName,
+                           'line': record.lineno,
+                           'depth': (len(msg) - len(text)) // len(self.indent),
+                           'msg': text,
+                           })
+
+
+def add_json_trace(logger, tracePath, indent):
+    '''
+    write every record of the logger, down to DEBUG, as JSON lines to tracePath
+    '''
+    logger.setLevel(logging.DEBUG)
+
+    for handler in logger.handlers:
+        if isinstance(handler.formatter, JsonTraceFormatter) and handler.baseFilename == os.path.abspath(tracePath):
+            return handler
+
+    handler = logging.FileHandler(tracePath, 'w')
+    handler.setFormatter(JsonTraceFormatter(indent))
+    handler.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return handler
@@ -0,0 +1,142 @@
+from collections import defaultdict
+import json
+import time
+
+
+# number of most expensive files listed per stage in the summary
+SUMMARY_TOP_FILES = 10
+
+# (cache, stage, hits, misses) of the caches reported with a hit rate
+CACHES = (('search_file', 'preprocess', 'search_hits', 'search_misses'),
+          ('token_cache', 'preprocess', 'token_cache_hits', 'token_cache_misses'),
+          ('header_cache', 'parse', 'header_cache_hits', 'header_cache_misses'),
+          )
+
+
+class Metrics:
+    '''
+    Counters and durations of a worker process, summed per (stage, name).
+
+    A worker keeps its own instance and sends it to the main process through
+    the stats queue when it is done. The main process merges them, so nothing
+    is shared or locked while files are analyzed.
+    '''
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.values = defaultdict(float)
+
+    def add(self, stage, name, value=1):
+        self.values[(stage, name)] += value
+
+    def update(self, other):
+        for key, value in other.values.iteritems():
+            self.values[key] += value
+
+    def rows(self):
+        '''
+        returns (worker, stage, name, value) rows of the Metrics table
+        '''
+        return [(self.worker, stage, name, value) for (stage, name), value in sorted(self.values.items())]
+
+    def addPreprocessor(self, pp):
+        '''
+        record the cache counters of a preprocessor at the end of a worker
+        '''
+        self.add('preprocess', 'search_hits', pp.searchHits)
+        self.add('preprocess', 'search_misses', pp.searchMisses)
+        if pp.tokenCache:
+            self.add('preprocess', 'token_cache_hits', pp.tokenCache.hits)
+            self.add('preprocess', 'token_cache_misses', pp.tokenCache.misses)
+
+    def addParser(self, parser):
+        '''
+        record the cache, backtracking and skipped body counters of a parser at the end of a worker
+        '''
+        self.add('parse', 'backtracks', parser.backtracks)
+        self.add('parse', 'skipped_bodies', parser.skippedBodies)
+        if parser.headerCache:
+            self.add('parse', 'header_cache_hits', parser.headerCache.hits)
+            self.add('parse', 'header_cache_misses', parser.headerCache.misses)
+
+
+def timed_get(get, sentinel, metrics, stage):
+    '''
+    iterate over get() until sentinel and add the time spent waiting to metrics
+    '''
+    while True:
+        t = time.time()
+        item = get()
+        metrics.add(stage, 'queue_wait_seconds', time.time() - t)
+        if item == sentinel:
+            return
+        yield item
+
+def tu_metrics(worker, ppInfo, seconds):
+    '''
+    returns the (worker, stage, name, value) rows of a preprocessed translation unit
+    '''
+    tokens = includes = macroCalls = 0
+    stack = [ppInfo]
+    while stack:
+        info = stack.pop()
+        tokens += len(info['tokens'])
+        macroCalls += len(info['macroCalls'])
+        for include in info['includes']:
+            includes += 1
+            if include[-1]:
+                stack.append(include[-1])
+
+    return [(worker, 'preprocess', 'seconds', seconds),
+            (worker, 'preprocess', 'tokens', tokens),
+            (worker, 'preprocess', 'includes', includes),
+            (worker, 'preprocess', 'macro_expansions', macroCalls),
+            ]
+
+def write_summary(summaryPath, dbPath, wallSeconds, workerMetrics, fileMetrics, tableRows, skippedInserts):
+    '''
+    write the JSON summary of a run
+
+    workerMetrics is a list of Metrics, fileMetrics {path: [(worker, stage, name, value)]}
+    '''
+    stages = defaultdict(lambda: defaultdict(float))
+    for rows in fileMetrics.itervalues():
+        for worker, stage, name, value in rows:
+            stages[stage][name] += value
+    total = Metrics('total')
+    for metrics in workerMetrics:
+        total.update(metrics)
+    for (stage, name), value in total.values.iteritems():
+        stages[stage][name] += value
+
+    caches = {}
+    for cache, stage, hits, misses in CACHES:
+        if stages[stage].has_key(hits):
+            lookups = stages[stage][hits] + stages[stage][misses]
+            caches[cache] = {'hits': stages[stage][hits],
+                             'misses': stages[stage][misses],
+                             'hit_rate': stages[stage][hits] / lookups if lookups else None,
+                             }
+
+    costliest = {}
+    for stage in ('preprocess', 'parse', 'database'):
+        seconds = [(sum([v for w, s, n, v in rows if s == stage and n == 'seconds']), srcFile)
+                   for srcFile, rows in fileMetrics.iteritems()]
+        costliest[stage] = [{'path': srcFile, 'seconds': t} for t, srcFile in sorted(seconds, reverse=True)[:SUMMARY_TOP_FILES]]
+
+    summary = {'database': dbPath,
+               'wall_seconds': wallSeconds,
+               'files': len(fileMetrics),
+               'stages': dict([(stage, dict(values)) for stage, values in stages.iteritems()]),
+               'workers': dict([(metrics.worker, dict([('%s.%s' % key, value) for key, value in metrics.values.iteritems()]))
+                                for metrics in workerMetrics]),
+               'caches': caches,
+               'db_rows': tableRows,
+               'db_skipped_inserts': skippedInserts,
+               'costliest_files': costliest,
+               }
+
+    f = open(summaryPath, 'w')
+    json.dump(summary, f, indent=2, sort_keys=True)
+    f.close()
+    return summary
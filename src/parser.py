@@ -1,9 +1,11 @@
 from collections import deque, defaultdict
 import os
-from xml.dom import minidom
 import logging
 
-from token_iter import TokenIterator
+from token_iter import BufferedTokenIterator
+from header_cache import HeaderCache, DEFAULT_HEADER_CACHE_SIZE
+from tree_writer import TREE_WRITERS
+from json_trace import add_json_trace
 from scanner_types import *
 from parser_types import *
 
@@ -19,6 +21,89 @@ logger.addHandler(ch)
 
 INDENT = '   '
 
+# trace calls in the grammar rules are guarded by this rather than left to the
+# logger, so that nothing is formatted or called unless DEBUG is enabled
+DEBUG = logger.isEnabledFor(logging.DEBUG)
+
+# tokens which may start a postfix_expression_suffix after an operand
+POSTFIX_SUFFIX_START = frozenset(['->', '.', '++', '--', '[', '('])
+
+# tokens which may follow a whole assignment_expression
+ASSIGNMENT_EXPRESSION_END = frozenset([',', ')', ';', ']', '}'])
+
+# nodes on top of the tree which the expression rules take as their first operand
+OPERAND_NODES = frozenset([NODE_CAST, NODE_POSTFIX_EXPRESSION, NODE_UNARY_EXPRESSION])
+
+#
+# FIRST-set dispatch tables
+#
+# A table maps the key of the next token to the rules whose FIRST set contains it, in the
+# order they are tried. The key is the value of an operator, KEY_TYPE_NAME for an identifier
+# which is a type, KEY_LABEL for an identifier followed by ':' (only in statement) or else
+# the token type. see first_key()
+#
+KEY_TYPE_NAME = -1
+KEY_LABEL     = -2
+
+STORAGE_CLASS_KEYS   = range(TOK_TYPEDEF, TOK_REGISTER+1)
+TYPE_QUALIFIER_KEYS  = range(TOK_CONST, TOK_VOLATILE+1)
+TYPE_SPECIFIER_KEYS  = range(TOK_VOID, TOK_ENUM+1) + [KEY_TYPE_NAME]
+DECLARATION_KEYS     = STORAGE_CLASS_KEYS + [TOK_INLINE] + TYPE_QUALIFIER_KEYS + TYPE_SPECIFIER_KEYS
+EXPRESSION_KEYS      = [TOK_IDENTIFIER, KEY_TYPE_NAME, TOK_NUMBER, TOK_CHARACTER, TOK_STRING, TOK_SIZEOF,
+                        '(', '&', '*', '+', '-', '~', '!', '++', '--']
+STATEMENT_KEYS       = [KEY_LABEL] + range(TOK_CASE, TOK_RETURN+1) + ['{', ';'] + EXPRESSION_KEYS
+
+# type specifiers which are the token on its own
+TYPE_SPECIFIER_TOKENS = frozenset(range(TOK_VOID, TOK_IMAGINARY+1) + [KEY_TYPE_NAME])
+
+def first_key(token, types):
+    '''
+    returns the key of the token in the FIRST-set dispatch tables
+    '''
+    if token[TOK_TYPE] == TOK_OPERATOR:
+        return token[TOK_VALUE]
+    elif token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in types:
+        return KEY_TYPE_NAME
+    return token[TOK_TYPE]
+
+def dispatch_table(*alternatives):
+    '''
+    returns {key: (rule, ...)} of (rule, keys) alternatives
+
+    The rules are named here and replaced by the functions of Parser once it is defined.
+    '''
+    table = {}
+    for rule, keys in alternatives:
+        for key in keys:
+            table[key] = table.get(key, ()) + (rule,)
+    return table
+
+BLOCK_ITEM_RULES = dispatch_table(
+    ('declaration'            , DECLARATION_KEYS),
+    ('statement'              , [k for k in STATEMENT_KEYS if k != KEY_LABEL]),
+    )
+
+STATEMENT_RULES = dispatch_table(
+    ('labeled_statement'      , [KEY_LABEL, TOK_CASE, TOK_DEFAULT]),
+    ('selection_statement'    , [TOK_SWITCH, TOK_IF]),
+    ('iteration_statement'    , [TOK_FOR, TOK_DO, TOK_WHILE]),
+    ('jump_statement'         , [TOK_GOTO, TOK_CONTINUE, TOK_BREAK, TOK_RETURN]),
+    ('compound_statement'     , ['{']),
+    ('expression_statement'   , EXPRESSION_KEYS + [';']),
+    )
+
+DECLARATION_SPECIFIER_RULES = dispatch_table(
+    ('storage_class_specifier', STORAGE_CLASS_KEYS),
+    ('function_specifier'     , [TOK_INLINE]),
+    ('type_qualifier'         , TYPE_QUALIFIER_KEYS),
+    ('type_specifier'         , TYPE_SPECIFIER_KEYS),
+    )
+
+TYPE_SPECIFIER_RULES = dispatch_table(
+    ('struct_or_union_specifier', [TOK_STRUCT, TOK_UNION]),
+    ('enum_specifier'         , [TOK_ENUM]),
+    )
+
 
 class Parser():
     global logger
@@ -30,7 +115,7 @@ class Parser():
                 ])
         return builtin_types
 
-    def __init__(self, builtinTypes=None, outDir=None, logLevel=None, logPath="/var/log/parser.log", externalLogger=None):
+    def __init__(self, builtinTypes=None, outDir=None, logLevel=None, logPath="/var/log/parser.log", externalLogger=None, headerCacheSize=DEFAULT_HEADER_CACHE_SIZE, tracePath=None, declarationsOnly=False, treeFormat='xml'):
         self.types                 = set()
         self.struct_union_enum_set = set()
         self.locals                = defaultdict(tuple)
@@ -40,6 +125,15 @@ class Parser():
         self.symbols_used          = set()
         self.builtin_types         = set(builtinTypes) if builtinTypes is not None else self.__class__.getBuiltinTypes()
         self.outDir                = outDir
+        # parse trees in outDir are written by this, see tree_writer
+        self.treeWriter            = TREE_WRITERS[treeFormat]
+        # parse trees are saved per file, so headers are parsed every time then
+        self.headerCache           = HeaderCache(headerCacheSize) if headerCacheSize and not outDir else None
+        # rules which were tried from a dispatch table and failed, see dispatch()
+        self.backtracks            = 0
+        # function bodies are kept as tokens and parsed on demand, see function_body()
+        self.declarationsOnly      = declarationsOnly
+        self.skippedBodies         = 0
 
         if externalLogger:
             externalLogger.setLevel(logging.INFO)
@@ -49,6 +143,12 @@ class Parser():
         if logLevel:
             logger.setLevel(eval('logging.%s' % logLevel))
 
+        if tracePath:
+            add_json_trace(logger, tracePath, INDENT)
+
+        global DEBUG
+        DEBUG = logger.isEnabledFor(logging.DEBUG)
+
         if os.path.exists(logPath):
             os.remove(logPath)
 
@@ -62,7 +162,7 @@ class Parser():
         logger.addHandler(fh)
 
     def parse(self, ppInfo):
-        logger.info('parse %s' % ppInfo['path'])
+        logger.info('parse %s', ppInfo['path'])
 
         self.types.clear()
         self.types.update(self.builtin_types)
@@ -75,17 +175,36 @@ class Parser():
 
         return ppInfo
 
-    def _parse(self, info, indent=''):
+    def _parse(self, info, depth=0, isHeader=False):
         for include in info['includes']:
             if include[-1]:
-                self._parse(include[-1], '%s%s'%(indent,INDENT))
+                self._parse(include[-1], depth+1, True)
 
-        logger.info('%s_parse %s' % (indent, info['path']))
+        logger.info('%s_parse %s', INDENT * depth, info['path'])
 
         if not info['tokens']:
             del info['tokens']
             return
 
+        if not isHeader or not self.headerCache:
+            self._parse_tokens(info, depth)
+            return
+
+        key = self.headerCache.getKey(info)
+        if self.headerCache.apply(key, self, info):
+            logger.info('%sreuse %s', INDENT * depth, info['path'])
+            del info['tokens']
+            return
+
+        keys = set(info)
+        self.headerCache.record(self)
+        try:
+            self._parse_tokens(info, depth)
+        finally:
+            reads, writes = self.headerCache.restore(self)
+        self.headerCache.put(key, reads, writes, info, set(info) - keys)
+
+    def _parse_tokens(self, info, depth=0):
         info['typedefs'] = defaultdict(tuple)
         info['data_types'] = defaultdict(deque)
         info['function_prototypes'] = defaultdict(deque)
@@ -94,45 +213,32 @@ class Parser():
         info['global_symbol_usage'] = defaultdict(deque)
 
         tree = deque()
-        tokIter = TokenIterator(info['tokens'])
+        tokIter = BufferedTokenIterator(info['tokens'])
 
         if self.outDir:
-            doc = minidom.Document()
-            rootElem = doc.createElement('PARSE_TREE')
+            writer = self.treeWriter('%s/%s.%s' % (self.outDir, info['path'].replace(os.path.sep, '_').strip('_'), self.treeWriter.extension))
 
         while tokIter.lookaheadToken(1):
             assert self.external_declaration(tokIter, tree, info), 'failed to parse @ %s' % info['path']
             node = tree.pop()
-            if self.outDir: self.save_parse_tree(doc, rootElem, node)
+            if self.outDir: writer.write(node)
             #self.print_parse_tree(node)
             self.extract_info(node, info)
             #raw_input()
             #print
 
         if self.outDir:
-            doc.appendChild(rootElem)
-            f = open('%s/%s.xml' % (self.outDir, info['path'].replace(os.path.sep, '_').strip('_')), 'w')
-            f.write(doc.toprettyxml(indent='    '))
-            f.close()
+            writer.close()
 
         del info['tokens']
 
-    def print_parse_tree(self, tree, indent=''):
+    def print_parse_tree(self, tree, depth=0):
         if len(tree) == 4:
-            logger.debug('%s%s' % (indent, str(tree)))
+            if DEBUG: logger.debug('%s%s', '|  ' * depth, tree)
         else:
-            logger.debug('%s%s' % (indent, node_type_to_str[tree[NODE_TYPE]]))
+            if DEBUG: logger.debug('%s%s', '|  ' * depth, node_type_to_str[tree[NODE_TYPE]])
             for node in tree[NODE_VALUE]:
-                self.print_parse_tree(node, '%s|%s'%(indent,'  '))
-
-    def save_parse_tree(self, doc, parentElem, node):
-        if len(node) == 4:
-            parentElem.appendChild(doc.createTextNode(node[TOK_VALUE]))
-        else:
-            elem = doc.createElement(node_type_to_str[node[NODE_TYPE]])
-            for n in node[NODE_VALUE]:
-                self.save_parse_tree(doc, elem, n)
-            parentElem.appendChild(elem)
+                self.print_parse_tree(node, depth+1)
 
     def get_node(self, node, node_type):
         '''
@@ -153,21 +259,21 @@ class Parser():
         '''
         return node[TOK_VALUE] if len(node) == 4 else ' '.join([self.extract_string(n) for n in node[NODE_VALUE] if n])
 
-    def extract_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'extract_info'))
+    def extract_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'extract_info')
         n = node[NODE_VALUE].popleft()
         if n[NODE_TYPE] == NODE_DECLARATION:
-            self.declaration_info(n, info, indent='%s%s'%(indent,INDENT))
+            self.declaration_info(n, info, depth=depth+1)
         elif n[NODE_TYPE] == NODE_FUNCTION_DEFINITION:
-            self.function_definition_info(n, info, indent='%s%s'%(indent,INDENT))
+            self.function_definition_info(n, info, depth=depth+1)
 
-    def declaration_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'declaration_info'))
+    def declaration_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration_info')
 
         self.extract_symbol_usage(node, self.extract_string(node), info)
 
         nodes = node[NODE_VALUE]
-        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nodes.popleft(), info, indent='%s%s'%(indent,INDENT))
+        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nodes.popleft(), info, depth=depth+1)
 
         if len(nodes) == 1:
             #
@@ -198,14 +304,14 @@ class Parser():
 
         for init_declarator_node in [n for n in init_declarator_list[NODE_VALUE] if n[NODE_TYPE] == NODE_INIT_DECLARATOR]:
             init_declarator_value = init_declarator_node[NODE_VALUE]
-            funcType, ref, nameTok, dim = self.declarator_info(init_declarator_value.popleft(), type_spec, info, indent='%s%s'%(indent,INDENT))
+            funcType, ref, nameTok, dim = self.declarator_info(init_declarator_value.popleft(), type_spec, info, depth=depth+1)
 
             init_val = None if not init_declarator_value else self.extract_string(init_declarator_value[1])
 
             if storage_spec and storage_spec[TOK_TYPE] == TOK_TYPEDEF:
                 self.types.add(nameTok[TOK_VALUE])
                 self.globals[nameTok[TOK_VALUE]] = (TYPEDEF, info['path'], nameTok[TOK_ROW:])
-                logger.debug('types: %s' % (str(self.types)))
+                if DEBUG: logger.debug('types: %s' % (str(self.types)))
 
                 info['typedefs'][nameTok[TOK_VALUE]] = (
                         type_spec,
@@ -240,8 +346,8 @@ class Parser():
                         nameTok[TOK_ROW:],
                         ))
 
-    def declaration_specifiers_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'declaration_specifiers_info'))
+    def declaration_specifiers_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration_specifiers_info')
         storage_spec = None
         func_spec = None
         type_spec = ''
@@ -262,9 +368,9 @@ class Parser():
                 n = n[NODE_VALUE][0]
                 if n[NODE_TYPE] == NODE_STRUCT_OR_UNION_SPECIFIER or n[NODE_TYPE] == NODE_ENUM_SPECIFIER:
                     if n[NODE_TYPE] == NODE_STRUCT_OR_UNION_SPECIFIER:
-                        type, ident, decl_list, fields = self.struct_or_union_specifier_info(n, info, indent='%s%s'%(indent,INDENT))
+                        type, ident, decl_list, fields = self.struct_or_union_specifier_info(n, info, depth=depth+1)
                     else:
-                        type, ident, decl_list, fields = self.enum_specifier_info(n, info, indent='%s%s'%(indent,INDENT))
+                        type, ident, decl_list, fields = self.enum_specifier_info(n, info, depth=depth+1)
 
                     if ident:
                         type_spec = '%s %s' % (type[TOK_VALUE], ident[TOK_VALUE]) if not type_spec else \
@@ -293,29 +399,29 @@ class Parser():
 
         return storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos
 
-    def struct_or_union_specifier_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'struct_or_union_specifier_info'))
+    def struct_or_union_specifier_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_or_union_specifier_info')
         nv = node[NODE_VALUE]
         type = nv.popleft()
         ident = None if nv[0][TOK_TYPE] != TOK_IDENTIFIER else nv.popleft()
         decl_list = None if not nv or nv[1][NODE_TYPE] != NODE_STRUCT_DECLARATION_LIST else nv[1]
 
-        return type, ident, decl_list, None if not decl_list else self.struct_declaration_list_info(decl_list, info, indent='%s%s'%(indent,INDENT))
+        return type, ident, decl_list, None if not decl_list else self.struct_declaration_list_info(decl_list, info, depth=depth+1)
 
-    def enum_specifier_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'enum_specifier_info'))
+    def enum_specifier_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'enum_specifier_info')
         nv = node[NODE_VALUE]
         type = nv.popleft()
         ident = None if nv[0][TOK_TYPE] != TOK_IDENTIFIER else nv.popleft()
         decl_list = None if not nv or nv[1][NODE_TYPE] != NODE_ENUMERATOR_LIST else nv[1]
 
-        return type, ident, decl_list, None if not decl_list else self.enumerator_list_info(decl_list, info, indent='%s%s'%(indent,INDENT))
+        return type, ident, decl_list, None if not decl_list else self.enumerator_list_info(decl_list, info, depth=depth+1)
 
-    def declarator_info(self, node, type_spec, info, indent=''):
-        logger.debug('%s%s' % (indent, 'declarator_info'))
+    def declarator_info(self, node, type_spec, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declarator_info')
         stack = deque()
 
-        self._declarator_info(node, stack, info, indent='%s%s'%(indent,INDENT))
+        self._declarator_info(node, stack, info, depth=depth+1)
 
         if len(stack) > 1:
             _, _, nameTok, _, _ = stack.pop()
@@ -349,14 +455,14 @@ class Parser():
             ptr[0] = type_spec
         return type, ref, nameTok, dim
 
-    def _declarator_info(self, node, stack, info, pos=None, indent=''):
-        logger.debug('%s%s' % (indent, '_declarator_info'))
+    def _declarator_info(self, node, stack, info, pos=None, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, '_declarator_info')
         nv = node[NODE_VALUE]
 
         ref = None if nv[0][NODE_TYPE] != NODE_POINTER else self.extract_string(nv.popleft())
 
         if nv and nv[0][NODE_TYPE] == NODE_DIRECT_DECLARATOR:
-            self.direct_declarator_info(nv.popleft(), stack, info, indent='%s%s'%(indent,INDENT))
+            self.direct_declarator_info(nv.popleft(), stack, info, depth=depth+1)
 
         suffix_node = None if not nv or nv[0][NODE_TYPE] != NODE_DIRECT_DECLARATOR_SUFFIX else nv.popleft()
 
@@ -370,7 +476,7 @@ class Parser():
         elif suffix_node[NODE_VALUE][0][NODE_TYPE] == NODE_PARAMETER_SPECIFIER:
             parameter_specifier_value = suffix_node[NODE_VALUE][0][NODE_VALUE]
             stack.appendleft((ref,
-                              deque() if len(parameter_specifier_value) != 3 else self.parameter_list_info(parameter_specifier_value[1], info, indent='%s%s'%(indent,INDENT)),
+                              deque() if len(parameter_specifier_value) != 3 else self.parameter_list_info(parameter_specifier_value[1], info, depth=depth+1),
                               None,
                               None,
                               pos
@@ -383,18 +489,18 @@ class Parser():
                               pos
                               ))
 
-    def direct_declarator_info(self, node, stack, info, indent=''):
-        logger.debug('%s%s' % (indent, 'direct_declarator_info'))
+    def direct_declarator_info(self, node, stack, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'direct_declarator_info')
         nv = node[NODE_VALUE]
         tok = nv.popleft()
 
         if tok[TOK_TYPE] == TOK_IDENTIFIER:
             stack.appendleft((None, None, tok, None, None))
         elif tok[TOK_TYPE] & TOK_OPERATOR:
-            self._declarator_info(nv.popleft(), stack, info, pos=tok[TOK_ROW:], indent='%s%s'%(indent,INDENT))
+            self._declarator_info(nv.popleft(), stack, info, pos=tok[TOK_ROW:], depth=depth+1)
 
-    def parameter_list_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'parameter_list_info'))
+    def parameter_list_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'parameter_list_info')
         params = deque()
         for parameter_declaration_node in [n for n in node[NODE_VALUE] if n[NODE_TYPE] == NODE_PARAMETER_DECLARATION or n[NODE_TYPE] == TOK_ELLIPSIS]:
             if parameter_declaration_node[TOK_TYPE] == TOK_ELLIPSIS:
@@ -409,7 +515,7 @@ class Parser():
                 break
 
             parameter_declaration_value = parameter_declaration_node[NODE_VALUE]
-            _, _, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(parameter_declaration_value.popleft(), info, indent='%s%s'%(indent,INDENT))
+            _, _, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(parameter_declaration_value.popleft(), info, depth=depth+1)
 
             if not parameter_declaration_value:
                 params.append((type_spec,
@@ -424,7 +530,7 @@ class Parser():
 
             declarator_node = parameter_declaration_value.popleft()
             if declarator_node[NODE_TYPE] == NODE_DECLARATOR:
-                funcType, ref, nameTok, dim = self.declarator_info(declarator_node, type_spec, info, indent='%s%s'%(indent,INDENT))
+                funcType, ref, nameTok, dim = self.declarator_info(declarator_node, type_spec, info, depth=depth+1)
 
                 params.append((type_spec,
                                struct_union_enum_type,
@@ -440,11 +546,11 @@ class Parser():
 
         return params
 
-    def struct_declaration_list_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'struct_declaration_list_info'))
+    def struct_declaration_list_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_declaration_list_info')
         fields = deque()
         for struct_declaration_node in node[NODE_VALUE]:
-            _, _, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(struct_declaration_node[NODE_VALUE].popleft(), info, indent='%s%s'%(indent,INDENT))
+            _, _, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(struct_declaration_node[NODE_VALUE].popleft(), info, depth=depth+1)
 
             if len(struct_declaration_node[NODE_VALUE]) == 1:
                 fields.append((type_spec,
@@ -462,7 +568,7 @@ class Parser():
 
             for struct_declarator_node in [n for n in struct_declarator_list_node[NODE_VALUE] if n[NODE_TYPE] == NODE_STRUCT_DECLARATOR]:
                 nv = struct_declarator_node[NODE_VALUE]
-                funcType, ref, nameTok, dim = (None, None, None, None) if nv[0][NODE_TYPE] != NODE_DECLARATOR else self.declarator_info(nv.popleft(), type_spec, info, indent='%s%s'%(indent,INDENT))
+                funcType, ref, nameTok, dim = (None, None, None, None) if nv[0][NODE_TYPE] != NODE_DECLARATOR else self.declarator_info(nv.popleft(), type_spec, info, depth=depth+1)
 
                 fields.append((type_spec,
                                struct_union_enum_type,
@@ -475,8 +581,8 @@ class Parser():
                                ))
         return fields
 
-    def enumerator_list_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'enumerator_list_info'))
+    def enumerator_list_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'enumerator_list_info')
         fields = deque()
         for enum in node[NODE_VALUE]:
             if not (enum[TOK_TYPE] & TOK_OPERATOR):
@@ -495,20 +601,20 @@ class Parser():
                 self.globals[nameTok[TOK_VALUE]] = (ENUM_TYPE, info['path'], nameTok[TOK_ROW:])
         return fields
 
-    def function_definition_info(self, node, info, indent=''):
-        logger.debug('%s%s' % (indent, 'function_definition_info'))
+    def function_definition_info(self, node, info, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'function_definition_info')
 
         self.locals.clear()
         self.locals_set.clear()
 
         nv = node[NODE_VALUE]
-        compound_statement_node = nv.pop()
+        body_node = nv.pop()
 
         self.extract_symbol_usage(node, self.extract_string(node), info)
 
-        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nv.popleft(), info, indent='%s%s'%(indent,INDENT))
+        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nv.popleft(), info, depth=depth+1)
 
-        funcType, ref, nameTok, dim = self.declarator_info(nv.popleft(), type_spec, info, indent='%s%s'%(indent,INDENT))
+        funcType, ref, nameTok, dim = self.declarator_info(nv.popleft(), type_spec, info, depth=depth+1)
         #print 'decl:', funcType, ref, nameTok, dim
 
         if nv and nv[0][NODE_TYPE] == NODE_DECLARATION_LIST:
@@ -519,32 +625,14 @@ class Parser():
         self.globals_set.add(nameTok[TOK_VALUE])
         self.globals[nameTok[TOK_VALUE]] = (FUNCTION, info['path'], nameTok[TOK_ROW:])
 
-        funcInfo = defaultdict(deque)
-        funcInfo['variables'] = defaultdict(deque)
-        funcInfo['function_calls'] = defaultdict(deque)
-        funcInfo['global_symbol_usage'] = defaultdict(deque)
-        funcInfo['local_symbol_usage'] = defaultdict(deque)
-
-        if funcType:
-            #
-            # add parameters to local variables of this function
-            #
-            for param in funcType[2]:
-                if param[4]:
-                    self.locals[param[4]] = (VARIABLE, param[-1])
-                    self.locals_set.add(param[4])
-                    funcInfo['variables'][param[4]].append((
-                            None,
-                            param[0],
-                            param[1],
-                            param[2],
-                            param[3],
-                            param[5],
-                            None,
-                            param[-1],
-                            ))
-
-        self.compound_statement_info(compound_statement_node, funcInfo, indent='%s%s'%(indent,INDENT))
+        params = tuple(funcType[2]) if funcType else ()
+        if body_node[NODE_TYPE] == NODE_FUNCTION_BODY:
+            # the database takes the parameters out of funcType, so the body keeps its own list
+            funcInfo = self.function_info(())
+            funcInfo['body'] = (body_node[NODE_VALUE], params, self.body_scope(body_node[NODE_VALUE]))
+        else:
+            funcInfo = self.function_info(params)
+            self.compound_statement_info(body_node, funcInfo, depth=depth+1)
 
         info['function_definitions'][nameTok[TOK_VALUE]] = (
             storage_spec if storage_spec is None else storage_spec[TOK_VALUE],
@@ -554,8 +642,80 @@ class Parser():
             nameTok[TOK_ROW:],
         )
 
-    def compound_statement_info(self, node, funcInfo, indent=''):
-        logger.debug('%s%s' % (indent, 'compound_statement_info'))
+    def function_info(self, params):
+        '''
+        returns empty function info with the parameters as local variables
+        '''
+        funcInfo = defaultdict(deque)
+        funcInfo['variables'] = defaultdict(deque)
+        funcInfo['function_calls'] = defaultdict(deque)
+        funcInfo['global_symbol_usage'] = defaultdict(deque)
+        funcInfo['local_symbol_usage'] = defaultdict(deque)
+
+        #
+        # add parameters to local variables of this function
+        #
+        for param in params:
+            if param[4]:
+                self.locals[param[4]] = (VARIABLE, param[-1])
+                self.locals_set.add(param[4])
+                funcInfo['variables'][param[4]].append((
+                        None,
+                        param[0],
+                        param[1],
+                        param[2],
+                        param[3],
+                        param[5],
+                        None,
+                        param[-1],
+                        ))
+        return funcInfo
+
+    def body_scope(self, tokens):
+        '''
+        returns (name, isType, isTag, isGlobal, globals entry) of every identifier in the tokens
+
+        This is all of the parser state a function body can look up, so parse_function_body()
+        gives the same function info from it as parsing the body in place.
+        '''
+        scope = []
+        for name in set([t[TOK_VALUE] for t in tokens if t[TOK_TYPE] == TOK_IDENTIFIER]):
+            isType = name in self.types
+            isTag = name in self.struct_union_enum_set
+            isGlobal = name in self.globals_set
+            scope.append((name, isType, isTag, isGlobal, self.globals[name] if isType or isTag or isGlobal else None))
+        return scope
+
+    def parse_function_body(self, body, path):
+        '''
+        parse a function body skipped in declarations only mode
+
+        body is the 'body' entry of the function info and path the file of the function.
+        returns the function info of the function as if it was parsed in place.
+        '''
+        logger.info('parse_function_body %s', path)
+        tokens, params, scope = body
+
+        self.types.clear()
+        self.types.update([name for name, isType, isTag, isGlobal, value in scope if isType])
+        self.struct_union_enum_set.clear()
+        self.struct_union_enum_set.update([name for name, isType, isTag, isGlobal, value in scope if isTag])
+        self.globals_set.clear()
+        self.globals_set.update([name for name, isType, isTag, isGlobal, value in scope if isGlobal])
+        self.globals.clear()
+        self.globals.update([(name, value) for name, isType, isTag, isGlobal, value in scope if value is not None])
+        self.locals.clear()
+        self.locals_set.clear()
+
+        funcInfo = self.function_info(params)
+
+        tree = deque()
+        assert self.compound_statement(BufferedTokenIterator(tokens), tree, {'path': path}), 'failed to parse @ %s' % path
+        self.compound_statement_info(tree.pop(), funcInfo)
+        return funcInfo
+
+    def compound_statement_info(self, node, funcInfo, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'compound_statement_info')
         funcInfo['block'] = (node[NODE_VALUE][0][TOK_ROW:], node[NODE_VALUE][-1][TOK_ROW:])
 
         if node[NODE_VALUE][1][NODE_TYPE] != NODE_BLOCK_ITEM_LIST:
@@ -565,35 +725,35 @@ class Parser():
             n = block_item_node[NODE_VALUE].popleft()
 
             if n[NODE_TYPE] == NODE_DECLARATION:
-                self.local_declaration_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+                self.local_declaration_info(n, funcInfo, depth=depth+1)
             else:
-                self.statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+                self.statement_info(n, funcInfo, depth=depth+1)
 
-    def statement_info(self, node, funcInfo, indent=''):
-        logger.debug('%s%s' % (indent, 'statement_info'))
+    def statement_info(self, node, funcInfo, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'statement_info')
         n = node[NODE_VALUE].popleft()
         if n[NODE_TYPE] == NODE_COMPOUND_STATEMENT:
             temp = self.locals.copy()
-            self.compound_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.compound_statement_info(n, funcInfo, depth=depth+1)
             self.locals = temp
             self.locals_set = set(self.locals)
         elif n[NODE_TYPE] == NODE_EXPRESSION_STATEMENT:
-            self.expression_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.expression_statement_info(n, funcInfo, depth=depth+1)
         elif n[NODE_TYPE] == NODE_SELECTION_STATEMENT:
-            self.selection_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.selection_statement_info(n, funcInfo, depth=depth+1)
         elif n[NODE_TYPE] == NODE_ITERATION_STATEMENT:
-            self.iteration_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.iteration_statement_info(n, funcInfo, depth=depth+1)
         elif n[NODE_TYPE] == NODE_LABELED_STATEMENT:
-            self.labeled_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.labeled_statement_info(n, funcInfo, depth=depth+1)
         else:
-            self.jump_statement_info(n, funcInfo, indent='%s%s'%(indent,INDENT))
+            self.jump_statement_info(n, funcInfo, depth=depth+1)
 
-    def local_declaration_info(self, node, funcInfo, indent=''):
-        logger.debug('%s%s' % (indent, 'local_declaration_info'))
+    def local_declaration_info(self, node, funcInfo, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'local_declaration_info')
         self.extract_symbol_usage(node, self.extract_string(node), funcInfo)
 
         nodes = node[NODE_VALUE]
-        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nodes.popleft(), funcInfo, indent='%s%s'%(indent,INDENT))
+        storage_spec, func_spec, type_spec, struct_union_enum_type, type_pos = self.declaration_specifiers_info(nodes.popleft(), funcInfo, depth=depth+1)
 
         if len(nodes) == 1:
             #
@@ -619,7 +779,7 @@ class Parser():
 
         for init_declarator_node in [n for n in init_declarator_list[NODE_VALUE] if n[NODE_TYPE] == NODE_INIT_DECLARATOR]:
             init_declarator_value = init_declarator_node[NODE_VALUE]
-            funcType, ref, nameTok, dim = self.declarator_info(init_declarator_value.popleft(), type_spec, funcInfo, indent='%s%s'%(indent,INDENT))
+            funcType, ref, nameTok, dim = self.declarator_info(init_declarator_value.popleft(), type_spec, funcInfo, depth=depth+1)
 
             if init_declarator_value:
                 initializer_node = init_declarator_value[1]
@@ -723,24 +883,24 @@ class Parser():
             funcInfo['global_symbol_usage'][(ident[TOK_VALUE], type, path, loc)].append(usage)
             #print 'struct/union/enum symbol:', ident, usage
 
-    def expression_statement_info(self, statement, funcInfo, indent=''):
+    def expression_statement_info(self, statement, funcInfo, depth=0):
         '''
         extract expression_statement info
         : (expression)? ';'
         '''
-        logger.debug('%s%s' % (indent, 'expression_statement_info'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'expression_statement_info')
         if len(statement[NODE_VALUE]) == 1:
             return
         node = statement[NODE_VALUE].popleft()
         self.extract_symbol_usage(node, self.extract_string(node), funcInfo)
 
-    def selection_statement_info(self, statement, funcInfo, indent=''):
+    def selection_statement_info(self, statement, funcInfo, depth=0):
         '''
         extract selection_statement info
         : IF '(' expression ')' statement (ELSE statement)?
         | SWITCH '(' expression ')' statement
         '''
-        logger.debug('%s%s' % (indent, 'selection_statement_info'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'selection_statement_info')
         info = defaultdict(deque)
         info['variables'] = defaultdict(deque)
         info['function_calls'] = defaultdict(deque)
@@ -757,35 +917,35 @@ class Parser():
                 elseTok = nodes.pop()
                 stmt_node = nodes.pop()
                 self.extract_symbol_usage(nodes[2], self.extract_string(statement), funcInfo)
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
 
                 else_info = defaultdict(deque)
                 else_info['variables'] = defaultdict(deque)
                 else_info['function_calls'] = defaultdict(deque)
                 else_info['global_symbol_usage'] = defaultdict(deque)
                 else_info['local_symbol_usage'] = defaultdict(deque)
-                self.statement_info(else_stmt_node, else_info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(else_stmt_node, else_info, depth=depth+1)
             else:
                 elseTok = None
                 stmt_node = nodes.pop()
                 self.extract_symbol_usage(nodes[2], self.extract_string(statement), funcInfo)
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
                 else_info = None
 
             funcInfo['if'].append((exp_str, info, tok[TOK_ROW:], else_info, None if not elseTok else elseTok[TOK_ROW:]))
         else:
             stmt_node = nodes.pop()
-            self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+            self.statement_info(stmt_node, info, depth=depth+1)
             funcInfo['switch'].append((exp_str, info, tok[TOK_ROW:]))
 
-    def iteration_statement_info(self, statement, funcInfo, indent=''):
+    def iteration_statement_info(self, statement, funcInfo, depth=0):
         '''
         extract iteration_statement info
         : WHILE '(' expression ')' statement
         | DO statement WHILE '(' expression ')' ';'
         | FOR '(' (expression_statement | declaration) expression_statement (expression)? ')' statement
         '''
-        logger.debug('%s%s' % (indent, 'iteration_statement_info'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'iteration_statement_info')
         info = defaultdict(deque)
         info['variables'] = defaultdict(deque)
         info['function_calls'] = defaultdict(deque)
@@ -798,10 +958,10 @@ class Parser():
             stmt_node = nodes.pop()
             exp_str = self.extract_string(nodes[2])
             self.extract_symbol_usage(nodes[2], self.extract_string(statement), funcInfo)
-            self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+            self.statement_info(stmt_node, info, depth=depth+1)
             funcInfo['while'].append((exp_str, info, tok[TOK_ROW:]))
         elif tok[TOK_TYPE] == TOK_DO:
-            self.statement_info(nodes[1], info, indent='%s%s'%(indent,INDENT))
+            self.statement_info(nodes[1], info, depth=depth+1)
             nodes.popleft()
             nodes.popleft()
             exp_str = self.extract_string(nodes[2])
@@ -812,20 +972,20 @@ class Parser():
             exp_str1 = self.extract_string(nodes[2]).rstrip(';')
 
             if nodes[2][NODE_TYPE] == NODE_EXPRESSION_STATEMENT:
-                self.expression_statement_info(nodes[2], funcInfo, indent='%s%s'%(indent,INDENT))
+                self.expression_statement_info(nodes[2], funcInfo, depth=depth+1)
             else:
-                self.local_declaration_info(nodes[2], funcInfo, indent='%s%s'%(indent,INDENT))
+                self.local_declaration_info(nodes[2], funcInfo, depth=depth+1)
 
             exp_str2 = self.extract_string(nodes[3]).rstrip(';')
-            self.expression_statement_info(nodes[3], funcInfo, indent='%s%s'%(indent,INDENT))
+            self.expression_statement_info(nodes[3], funcInfo, depth=depth+1)
 
             if nodes[4][NODE_TYPE] == NODE_EXPRESSION:
                 exp_str3 = self.extract_string(nodes[4])
                 self.extract_symbol_usage(nodes[4], self.extract_string(statement), funcInfo)
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
             else:
                 exp_str3 = None
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
 
             funcInfo['for'].append((None if not exp_str1 else exp_str1,
                                     None if not exp_str2 else exp_str2,
@@ -833,13 +993,13 @@ class Parser():
                                     info,
                                     tok[TOK_ROW:]))
 
-    def labeled_statement_info(self, statement, funcInfo, indent=''):
+    def labeled_statement_info(self, statement, funcInfo, depth=0):
         '''
         extract labeled_statement info
         : (IDENTIFIER|DEFAULT) ':' statement
         | CASE constant_expression ('...' constant_expression)? ':' statement # C extension (Case Range)
         '''
-        logger.debug('%s%s' % (indent, 'labeled_statement_info'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'labeled_statement_info')
         info = defaultdict(deque)
         info['variables'] = defaultdict(deque)
         info['function_calls'] = defaultdict(deque)
@@ -855,26 +1015,26 @@ class Parser():
             if nodes[2][TOK_TYPE] == TOK_ELLIPSIS:
                 exp_str2 = self.extract_string(nodes[3])
                 self.extract_symbol_usage(nodes[3], self.extract_string(statement), funcInfo)
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
             else:
                 exp_str2 = None
-                self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+                self.statement_info(stmt_node, info, depth=depth+1)
             funcInfo['case'].append((exp_str1, exp_str2, info, tok[TOK_ROW:]))
         elif tok[TOK_TYPE] == TOK_DEFAULT:
-            self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+            self.statement_info(stmt_node, info, depth=depth+1)
             funcInfo['default'].append((info, tok[TOK_ROW:]))
         else:
-            self.statement_info(stmt_node, info, indent='%s%s'%(indent,INDENT))
+            self.statement_info(stmt_node, info, depth=depth+1)
             funcInfo['label'].append((tok[TOK_VALUE], info, tok[TOK_ROW:]))
 
-    def jump_statement_info(self, statement, funcInfo, indent=''):
+    def jump_statement_info(self, statement, funcInfo, depth=0):
         '''
         extract jump_statement info
         : GOTO IDENTIFIER ';'
         | (CONTINUE|BREAK) ';'
         | RETURN (expression)? ';'
         '''
-        logger.debug('%s%s' % (indent, 'jump_statement_info'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'jump_statement_info')
         nodes = statement[NODE_VALUE]
         tok = nodes[0]
         if tok[TOK_TYPE] == TOK_GOTO:
@@ -892,7 +1052,20 @@ class Parser():
         else:
             funcInfo[tok[TOK_VALUE]].append(tok[TOK_ROW:])
 
-    def external_declaration(self, tokIter, tree, info, indent=''):
+    def dispatch(self, table, key, tokIter, tree, info, depth=0):
+        '''
+        try the rules of the key in the FIRST-set dispatch table until one of them succeeds
+
+        Usually there is at most one rule per key. Every rule which fails is counted in
+        self.backtracks.
+        '''
+        for rule in table.get(key, ()):
+            if rule(self, tokIter, tree, info, depth+1):
+                return True
+            self.backtracks += 1
+        return False
+
+    def external_declaration(self, tokIter, tree, info, depth=0):
         '''
         : declaration
         | function_definition
@@ -903,53 +1076,53 @@ class Parser():
         function_definition
         : declaration_specifiers declarator ((declartion)+)? '{' (block_item_list)? '}'
         '''
-        logger.debug('%s%s' % (indent, 'external_declaration'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'external_declaration')
         nodes = deque()
 
-        assert self.declaration_specifiers(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse external_declaration @ %s' % info['path']
+        assert self.declaration_specifiers(tokIter, tree, info, depth+1), 'failed to parse external_declaration @ %s' % info['path']
 
         token = tokIter.lookaheadToken(1)
         
         if token[TOK_VALUE] == ';':
-            assert self.declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse external_declaration @ %s' % info['path']
+            assert self.declaration(tokIter, tree, info, depth+1), 'failed to parse external_declaration @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_EXTERNAL_DECLARATION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
 
-        assert self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse external_declaration @ %s' % info['path']
+        assert self.declarator(tokIter, tree, info, depth+1), 'failed to parse external_declaration @ %s' % info['path']
 
         token = tokIter.lookaheadToken(1)
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         if token[TOK_VALUE] == '=' or token[TOK_VALUE] == ',' or token[TOK_VALUE] == ';':
-            assert self.declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse external_declaration @ %s' % info['path']
+            assert self.declaration(tokIter, tree, info, depth+1), 'failed to parse external_declaration @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_EXTERNAL_DECLARATION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif self.function_definition(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.function_definition(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             tree.append((NODE_EXTERNAL_DECLARATION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
 
-        logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, False)
         return False
 
-    def declaration(self, tokIter, tree, info, indent=''):
+    def declaration(self, tokIter, tree, info, depth=0):
         '''
         : declaration_specifiers (init_declarator_list)? ';'
         '''
-        logger.debug('%s%s' % (indent, 'declaration'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration')
         if tree and tree[0][NODE_TYPE] == NODE_DECLARATION_SPECIFIERS:
             decl_spec = tree.popleft()
-        elif self.declaration_specifiers(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.declaration_specifiers(tokIter, tree, info, depth+1):
             decl_spec = tree.pop()
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-        init_decl_list = None if not self.init_declarator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)) else tree.pop()
+        init_decl_list = None if not self.init_declarator_list(tokIter, tree, info, depth+1) else tree.pop()
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == ';':
@@ -959,86 +1132,108 @@ class Parser():
                 nodes.append(init_decl_list)
             nodes.append(tokIter.getToken())
             tree.append((NODE_DECLARATION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
             tree.append(decl_spec)
             if init_decl_list:
                 tree.append(init_decl_list)
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def function_definition(self, tokIter, tree, info, indent=''):
+    def function_definition(self, tokIter, tree, info, depth=0):
         '''
         : declaration_specifiers declarator (declaration_list)? compound_statement
         '''
-        logger.debug('%s%s' % (indent, 'function_definition'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'function_definition')
         nodes = deque()
         if tree and tree[0][NODE_TYPE] == NODE_DECLARATION_SPECIFIERS:
             nodes.append(tree.popleft())
-        elif not self.declaration_specifiers(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif not self.declaration_specifiers(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         if tree and tree[0][NODE_TYPE] == NODE_DECLARATOR:
             nodes.append(tree.popleft())
-        elif self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-        if self.declaration_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.declaration_list(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
-        if not self.compound_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if self.declarationsOnly:
+            parsed = self.function_body(tokIter, tree, info, depth+1)
+        else:
+            parsed = self.compound_statement(tokIter, tree, info, depth+1)
+        if not parsed:
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes.append(tree.pop())
         tree.append((NODE_FUNCTION_DEFINITION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def declaration_specifiers(self, tokIter, tree, info, indent=''):
+    def function_body(self, tokIter, tree, info, depth=0):
+        '''
+        : '{' ... '}'
+
+        compound_statement of a function definition in declarations only mode. The tokens
+        up to the matching '}' are taken by brace matching without parsing them.
+
+        First Set:
+        '{'
+        '''
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'function_body')
+        token = tokIter.lookaheadToken(1)
+        if token[TOK_VALUE] != '{':
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
+            return False
+
+        tokens = [tokIter.getToken()]
+        level = 1
+        while level:
+            token = tokIter.getToken()
+            assert token, "expected '}' but got EOF @ %s" % info['path']
+            if token[TOK_VALUE] == '{':
+                level += 1
+            elif token[TOK_VALUE] == '}':
+                level -= 1
+            tokens.append(token)
+
+        self.skippedBodies += 1
+        tree.append((NODE_FUNCTION_BODY, tokens))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
+        return True
+
+    def declaration_specifiers(self, tokIter, tree, info, depth=0):
         '''
         : (storage_class_specifier | type_specifier | type_qualifier | function_specifier)+
         '''
-        logger.debug('%s%s' % (indent, 'declaration_specifiers'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration_specifiers')
         nodes = deque()
         while True:
-            token = tokIter.lookaheadToken(1)
-            if token[TOK_TYPE] & TOK_STORAGE_CLASS and \
-                    self.storage_class_specifier(tokIter, nodes, info, '%s%s'%(indent,INDENT)): 
-                pass
-            elif token[TOK_TYPE] == TOK_INLINE and \
-                    self.function_specifier(tokIter, nodes, info, '%s%s'%(indent,INDENT)):
-                pass
-            elif token[TOK_TYPE] & TOK_TYPE_QUAL and \
-                    self.type_qualifier(tokIter, nodes, info, '%s%s'%(indent,INDENT)):
-                pass
-            elif (token[TOK_TYPE] & TOK_TYPE_SPEC or \
-                    (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types and \
-                        (not nodes or nodes[-1][NODE_TYPE] != NODE_TYPE_SPECIFIER))) and \
-                 self.type_specifier(tokIter, nodes, info, '%s%s'%(indent,INDENT)):
-                pass
-            else:
-                #if token[TOK_TYPE] == TOK_IDENTIFIER:
-                #    print token
-                #    print self.types.keys()
+            key = first_key(tokIter.lookaheadToken(1), self.types)
+            # a type name after a type specifier is the declarator, e.g. 'foo_t foo_t;'
+            if key == KEY_TYPE_NAME and nodes and nodes[-1][NODE_TYPE] == NODE_TYPE_SPECIFIER:
+                break
+            if not self.dispatch(DECLARATION_SPECIFIER_RULES, key, tokIter, nodes, info, depth):
                 break
 
         if nodes:
             tree.append((NODE_DECLARATION_SPECIFIERS, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def parameter_list(self, tokIter, tree, info, indent=''):
+    def parameter_list(self, tokIter, tree, info, depth=0):
         '''
         : parameter_declaration (',' parameter_declaration)* (',' ELLIPSIS)?
 
@@ -1050,10 +1245,10 @@ class Parser():
         STRUCT, UNION, ENUM 
         IDENTIFIER (TYPE_NAME)
         '''
-        logger.debug('%s%s' % (indent, 'parameter_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'parameter_list')
         nodes = deque()
-        if not self.parameter_declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if not self.parameter_declaration(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes.append(tree.pop())
@@ -1062,7 +1257,7 @@ class Parser():
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
             if token[TOK_TYPE] != TOK_ELLIPSIS:
-                assert self.parameter_declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse parameter_list @ %s' % info['path']
+                assert self.parameter_declaration(tokIter, tree, info, depth+1), 'failed to parse parameter_list @ %s' % info['path']
                 nodes.append(tree.pop())
                 token = tokIter.lookaheadToken(1)
             else:
@@ -1070,10 +1265,10 @@ class Parser():
                 break
 
         tree.append((NODE_PARAMETER_LIST, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def parameter_declaration(self, tokIter, tree, info, indent=''):
+    def parameter_declaration(self, tokIter, tree, info, depth=0):
         '''
         : declaration_specifiers (declarator | abstract_declarator)?
 
@@ -1085,22 +1280,22 @@ class Parser():
         STRUCT, UNION, ENUM 
         IDENTIFIER (TYPE_NAME)
         '''
-        logger.debug('%s%s' % (indent, 'parameter_declaration'))
-        if not self.declaration_specifiers(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'parameter_declaration')
+        if not self.declaration_specifiers(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
         nodes.append(tree.pop())
-        if self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
-        elif self.abstract_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.abstract_declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         tree.append((NODE_PARAMETER_DECLARATION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def abstract_declarator(self, tokIter, tree, info, indent=''):
+    def abstract_declarator(self, tokIter, tree, info, depth=0):
         '''
         : pointer (direct_abstract_declarator (direct_abstract_declarator_suffix)?)?
         | direct_abstract_declarator (direct_abstract_declarator_suffix)?
@@ -1108,33 +1303,33 @@ class Parser():
         First Set:
         '*', '[', '('
         '''
-        logger.debug('%s%s' % (indent, 'abstract_declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'abstract_declarator')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
-        if token[TOK_VALUE] == '*' and self.pointer(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if token[TOK_VALUE] == '*' and self.pointer(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
-            if self.direct_abstract_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.direct_abstract_declarator(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
-                if self.direct_abstract_declarator_suffix(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                if self.direct_abstract_declarator_suffix(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
 
             tree.append((NODE_ABSTRACT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif self.direct_abstract_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.direct_abstract_declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
-            if token[TOK_VALUE] in '[(' and self.direct_abstract_declarator_suffix(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_VALUE] in '[(' and self.direct_abstract_declarator_suffix(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
             tree.append((NODE_ABSTRACT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def direct_abstract_declarator(self, tokIter, tree, info, indent=''):
+    def direct_abstract_declarator(self, tokIter, tree, info, depth=0):
         '''
 	    : '[' ']'",
 	    | '[' '*' ']'",
@@ -1146,7 +1341,7 @@ class Parser():
         First Set:
         '[', '('
         '''
-        logger.debug('%s%s' % (indent, 'direct_abstract_declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'direct_abstract_declarator')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '[':
@@ -1159,41 +1354,41 @@ class Parser():
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-            elif self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.assignment_expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
             else:
-                logger.debug('%s%s' % (indent, False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
         elif token[TOK_VALUE] == '(':
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] == ')':
                 nodes.append(tokIter.getToken())
-            elif self.parameter_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.parameter_list(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-            elif self.abstract_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.abstract_declarator(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
             else:
-                logger.debug('%s%s' % (indent, False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         tree.append((NODE_DIRECT_ABSTRACT_DECLARATOR, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def direct_abstract_declarator_suffix(self, tokIter, tree, info, indent=''):
+    def direct_abstract_declarator_suffix(self, tokIter, tree, info, depth=0):
         '''
 	    : ( '[' ']'",
 	      | '[' assignment_expression ']'",
@@ -1204,7 +1399,7 @@ class Parser():
         First Set:
         '[', '('
         '''
-        logger.debug('%s%s' % (indent, 'direct_abstract_declarator_suffix'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'direct_abstract_declarator_suffix')
         nodes = deque()
         while True:
             token = tokIter.lookaheadToken(1)
@@ -1218,7 +1413,7 @@ class Parser():
                     token = tokIter.getToken()
                     assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                     nodes.append(token)
-                elif self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                elif self.assignment_expression(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
                     token = tokIter.getToken()
                     assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
@@ -1230,7 +1425,7 @@ class Parser():
                 token = tokIter.lookaheadToken(1)
                 if token[TOK_VALUE] == ')':
                     nodes.append(tokIter.getToken())
-                elif self.parameter_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                elif self.parameter_list(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
                     token = tokIter.getToken()
                     assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
@@ -1242,61 +1437,85 @@ class Parser():
 
         if nodes:
             tree.append((NODE_DIRECT_ABSTRACT_DECLARATOR_SUFFIX, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def pointer(self, tokIter, tree, info, indent=''):
+    def pointer(self, tokIter, tree, info, depth=0):
         '''
         : ('*' (type_qualifier_list)?)+
 
         First Set:
         '*'
         '''
-        logger.debug('%s%s' % (indent, 'pointer'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'pointer')
         nodes = deque()
         while True:
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] != '*':
                 break
 
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
 
-            if self.type_qualifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.type_qualifier_list(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_POINTER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def type_qualifier_list(self, tokIter, tree, info, indent=''):
+    def type_qualifier_list(self, tokIter, tree, info, depth=0):
         '''
         : (type_qualifier)+
 
         First Set:
         CONST, RESTRICT, VOLATILE
         '''
-        logger.debug('%s%s' % (indent, 'type_qualifier_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'type_qualifier_list')
         nodes = deque()
-        while self.type_qualifier(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.type_qualifier(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_TYPE_QUALIFIER_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def constant_expression(self, tokIter, tree, info, indent=''):
+    def _simple_operand(self, tokIter, tree):
+        '''
+        returns the next token, without taking it, if it is a NUMBER, a CHARACTER or an
+        IDENTIFIER which is not a type and no postfix_expression_suffix follows it
+
+        Such an operand is a postfix_expression on its own, so the expression rules build its
+        nodes directly instead of going down cast, unary_expression and postfix_expression.
+        The rules trace every step, so this is not used while DEBUG is enabled.
+        '''
+        if DEBUG or (tree and tree[-1][NODE_TYPE] in OPERAND_NODES):
+            return None
+
+        token = tokIter.lookaheadToken(1)
+        if token[TOK_TYPE] == TOK_IDENTIFIER:
+            if token[TOK_VALUE] in self.types:
+                return None
+        elif token[TOK_TYPE] != TOK_NUMBER and token[TOK_TYPE] != TOK_CHARACTER:
+            return None
+
+        token2 = tokIter.lookaheadToken(2)
+        if token2 and token2[TOK_VALUE] in POSTFIX_SUFFIX_START:
+            return None
+        return token
+
+    def constant_expression(self, tokIter, tree, info, depth=0):
         '''
         : binary_expression ('?' expression ':' constant_expression)?
 
@@ -1305,9 +1524,9 @@ class Parser():
         OPERATOR, SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'constant_expression'))
-        if not self.binary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'constant_expression')
+        if not self.binary_expression(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -1316,21 +1535,21 @@ class Parser():
         if token[TOK_VALUE] == '?':
             nodes.append(tokIter.getToken())
 
-            assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse constant_expression @ %s' % info['path']
+            assert self.expression(tokIter, tree, info, depth+1), 'failed to parse constant_expression @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ':', "expected ':' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse constant_expression @ %s' % info['path']
+            assert self.constant_expression(tokIter, tree, info, depth+1), 'failed to parse constant_expression @ %s' % info['path']
             nodes.append(tree.pop())
 
         tree.append((NODE_CONSTANT_EXPRESSION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def binary_expression(self, tokIter, tree, info, indent=''):
+    def binary_expression(self, tokIter, tree, info, depth=0):
         '''
         : cast_expression (('||'|'&&'|'|'|'^'|'&'|'=='|'!='|'<'|'>'|'<='|'>='|'<<'|'>>'|'+'|'-'|'*'|'/'|'%') cast_expression)*
 
@@ -1339,9 +1558,9 @@ class Parser():
         OPERATOR, SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'binary_expression'))
-        if not self.cast_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'binary_expression')
+        if not self.cast_expression(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -1350,16 +1569,16 @@ class Parser():
         while token[TOK_TYPE] == TOK_OPERATOR and token[TOK_VALUE] in '||&&^!==<=>=<<>>+-*/%':
             nodes.append(tokIter.getToken())
 
-            assert self.cast_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse binary_expression @ %s' % info['path']
+            assert self.cast_expression(tokIter, tree, info, depth+1), 'failed to parse binary_expression @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_BINARY_EXPRESSION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def cast_expression(self, tokIter, tree, info, indent=''):
+    def cast_expression(self, tokIter, tree, info, depth=0):
         '''
         : (cast)* unary_expression
 
@@ -1368,39 +1587,43 @@ class Parser():
         OPERATOR, SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'cast_expression'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'cast_expression')
         nodes = deque()
 
         #print tree
         if tree and tree[-1][NODE_TYPE] == NODE_UNARY_EXPRESSION:
             nodes.append(tree.pop())
             tree.append((NODE_CAST_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
 
         if tree and tree[-1][NODE_TYPE] == NODE_CAST:
             nodes.append(tree.pop())
+        elif self._simple_operand(tokIter, tree):
+            nodes.append((NODE_UNARY_EXPRESSION, deque([(NODE_POSTFIX_EXPRESSION, deque([tokIter.getToken()]))])))
+            tree.append((NODE_CAST_EXPRESSION, nodes))
+            return True
 
-        while self.cast(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.cast(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
-        if self.unary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.unary_expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             tree.append((NODE_CAST_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def cast(self, tokIter, tree, info, indent=''):
+    def cast(self, tokIter, tree, info, depth=0):
         '''
         : '(' type_name ')'
 
         First Set:
         '(', 
         '''
-        logger.debug('%s%s' % (indent, 'cast'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'cast')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
@@ -1408,22 +1631,22 @@ class Parser():
             token = tokIter.lookaheadToken(2)
             if token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types):
                 nodes.append(tokIter.getToken())
-                assert self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse cast_expression @ %s' % info['path']
+                assert self.type_name(tokIter, tree, info, depth+1), 'failed to parse cast_expression @ %s' % info['path']
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
                 tree.append((NODE_CAST, nodes))
-                logger.debug('%s%s' % (indent, True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
             else:
-                logger.debug('%s%s' % (indent, False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def unary_expression(self, tokIter, tree, info, indent=''):
+    def unary_expression(self, tokIter, tree, info, depth=0):
         '''
         : ('&'|'*'|'+'|'-'|'~'|'!') cast_expression
         : ('++'|'--') unary_expression
@@ -1436,72 +1659,77 @@ class Parser():
         SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'unary_expression'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'unary_expression')
         nodes = deque()
 
         if tree and tree[-1][NODE_TYPE] == NODE_POSTFIX_EXPRESSION:
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
-            if token[TOK_VALUE] in '.++-->[(' and self.postfix_expression_suffix(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_VALUE] in '.++-->[(' and self.postfix_expression_suffix(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             tree.append((NODE_UNARY_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
+            return True
+
+        if self._simple_operand(tokIter, tree):
+            nodes.append((NODE_POSTFIX_EXPRESSION, deque([tokIter.getToken()])))
+            tree.append((NODE_UNARY_EXPRESSION, nodes))
             return True
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] in '&*+-~!':
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
-            assert self.cast_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse unary_expression @ %s' % info['path']
+            assert self.cast_expression(tokIter, tree, info, depth+1), 'failed to parse unary_expression @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_UNARY_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_VALUE] in '++--':
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
-            assert self.unary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse unary_expression @ %s' % info['path']
+            assert self.unary_expression(tokIter, tree, info, depth+1), 'failed to parse unary_expression @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_UNARY_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_SIZEOF:
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
             token2 = tokIter.lookaheadToken(2)
             if token[TOK_VALUE] == '(' and \
                     (token2[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token2[TOK_TYPE] == TOK_IDENTIFIER and token2[TOK_VALUE] in self.types)):
                 nodes.append(tokIter.getToken())
-                assert self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse unary_expression @ %s' % info['path']
+                assert self.type_name(tokIter, tree, info, depth+1), 'failed to parse unary_expression @ %s' % info['path']
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
                 tree.append((NODE_UNARY_EXPRESSION, nodes))
-                logger.debug('%s%s' % (indent,True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
-            elif self.unary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.unary_expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 tree.append((NODE_UNARY_EXPRESSION, nodes))
-                logger.debug('%s%s' % (indent,True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
             else:
                 raise Exception("failed to parse unary_expression @ %s" % info['path'])
         elif (tree or token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC|TOK_CONSTANT|TOK_IDENTIFIER) or token[TOK_VALUE] == '(') and \
-                self.postfix_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                self.postfix_expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
-            if token[TOK_VALUE] in '.++-->[(' and self.postfix_expression_suffix(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_VALUE] in '.++-->[(' and self.postfix_expression_suffix(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             tree.append((NODE_UNARY_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def type_name(self, tokIter, tree, info, indent=''):
+    def type_name(self, tokIter, tree, info, depth=0):
         '''
         : specifier_qualifier_list (abstract_declarator)?
 
@@ -1514,27 +1742,27 @@ class Parser():
 
         CONST <= token <= TOK_ENUM, IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'type_name'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'type_name')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC|TOK_IDENTIFIER) and \
-                self.specifier_qualifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                self.specifier_qualifier_list(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] in '*[(' and \
-                    self.abstract_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.abstract_declarator(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
             tree.append((NODE_TYPE_NAME, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def postfix_expression(self, tokIter, tree, info, indent=''):
+    def postfix_expression(self, tokIter, tree, info, depth=0):
         '''
         : NUMBER
         | CHARACTER
@@ -1547,65 +1775,65 @@ class Parser():
         First Set:
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'postfix_expression'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'postfix_expression')
         nodes = deque()
         if tree and tree[-1][NODE_TYPE] == NODE_CAST:
             nodes.append(tree.pop())
 
-            assert self.initializer_block(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse postfix_expression @ %s' % info['path']
+            assert self.initializer_block(tokIter, tree, info, depth+1), 'failed to parse postfix_expression @ %s' % info['path']
             nodes.append(tree.pop())
 
             tree.append((NODE_POSTFIX_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
 
         token = tokIter.lookaheadToken(1)
         if (token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types)) and \
-                self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                self.type_name(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         elif token[TOK_TYPE] == TOK_STRING:
             while token[TOK_TYPE] == TOK_STRING:
-                logger.debug('%s%s' % (indent,str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
                 nodes.append(tokIter.getToken())
                 token = tokIter.lookaheadToken(1)
         elif token[TOK_TYPE] & (TOK_CONSTANT|TOK_IDENTIFIER):
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
         elif token[TOK_VALUE] == '(':
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
             if (token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types)) and \
-                    self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.type_name(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
 
-                if self.initializer_block(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                if self.initializer_block(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
                 else:
                     tree.append((NODE_CAST, nodes))
-                    logger.debug('%s%s' % (indent,False))
+                    if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                     return False
-            elif self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
             else:
-                logger.debug('%s%s' % (indent,False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         tree.append((NODE_POSTFIX_EXPRESSION, nodes))
-        logger.debug('%s%s' % (indent,True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def initializer_block(self, tokIter, tree, info, indent=''):
+    def initializer_block(self, tokIter, tree, info, depth=0):
         '''
         : '{' initializer_list (',')? '}'
 
@@ -1614,13 +1842,13 @@ class Parser():
         '''
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] != '{':
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
         nodes.append(tokIter.getToken())
 
-        assert self.initializer_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse initializer_block @ %s' % info['path']
+        assert self.initializer_list(tokIter, tree, info, depth+1), 'failed to parse initializer_block @ %s' % info['path']
         nodes.append(tree.pop())
 
         token = tokIter.getToken()
@@ -1631,10 +1859,10 @@ class Parser():
         nodes.append(token)
 
         tree.append((NODE_INITIALIZER_BLOCK, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def postfix_expression_suffix(self, tokIter, tree, info, indent=''):
+    def postfix_expression_suffix(self, tokIter, tree, info, depth=0):
         '''
         : '->' IDENTIFIER
         | '.' IDENTIFIER
@@ -1646,7 +1874,7 @@ class Parser():
         First Set:
         '->', '.', '++', '--', '[', '('
         '''
-        logger.debug('%s%s' % (indent, 'postfix_expression_suffix'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'postfix_expression_suffix')
 
         nodes = deque()
         while True:
@@ -1658,14 +1886,14 @@ class Parser():
                 nodes.append(token)
             elif token[TOK_VALUE] == '[':
                 nodes.append(tokIter.getToken())
-                assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse postfix_expression_suffix @ %s" % info['path']
+                assert self.expression(tokIter, tree, info, depth+1), "failed to parse postfix_expression_suffix @ %s" % info['path']
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
             elif token[TOK_VALUE] == '(':
                 nodes.append(tokIter.getToken())
-                if self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                if self.expression(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
@@ -1677,13 +1905,13 @@ class Parser():
 
         if nodes:
             tree.append((NODE_POSTFIX_EXPRESSION_SUFFIX, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def expression(self, tokIter, tree, info, indent=''):
+    def expression(self, tokIter, tree, info, depth=0):
         '''
         : assignment_expression (',' assignment_expression)*
         | compound_statement	# C extension
@@ -1693,33 +1921,33 @@ class Parser():
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '{'
         '''
-        logger.debug('%s%s' % (indent, 'expression'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'expression')
         token = tokIter.lookaheadToken(1)
-        if token[TOK_VALUE] == '{' and self.compound_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if token[TOK_VALUE] == '{' and self.compound_statement(tokIter, tree, info, depth+1):
             nodes = deque()
             nodes.append(tree.pop())
             tree.append((NODE_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif not self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        elif not self.assignment_expression(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
         nodes.append(tree.pop())
         token = tokIter.lookaheadToken(1)
         while token[TOK_VALUE] == ',':
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
-            assert self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse expression @ %s" % info['path']
+            assert self.assignment_expression(tokIter, tree, info, depth+1), "failed to parse expression @ %s" % info['path']
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_EXPRESSION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def assignment_expression(self, tokIter, tree, info, indent=''):
+    def assignment_expression(self, tokIter, tree, info, depth=0):
         '''
         : (unary_expression ASSIGN_OP)* constant_expression
 
@@ -1747,14 +1975,24 @@ class Parser():
         : cast_expression (('||'|'&&'|'|'|'^'|'&'|'=='|'!='|'<'|'>'|'<='|'>='|'<<'|'>>'|'+'|'-'|'*'|'/'|'%') cast_expression)*
         : (cast)* unary_expression
         '''
-        logger.debug('%s%s' % (indent, 'assignment_expression'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'assignment_expression')
         nodes = deque()
+
+        #
+        # an operand on its own, e.g. a function argument or an array index
+        #
+        if self._simple_operand(tokIter, tree) and tokIter.lookaheadToken(2)[TOK_VALUE] in ASSIGNMENT_EXPRESSION_END:
+            nodes.append((NODE_CONSTANT_EXPRESSION, deque([(NODE_BINARY_EXPRESSION, deque([(NODE_CAST_EXPRESSION, deque([
+                (NODE_UNARY_EXPRESSION, deque([(NODE_POSTFIX_EXPRESSION, deque([tokIter.getToken()]))]))]))]))])))
+            tree.append((NODE_ASSIGNMENT_EXPRESSION, nodes))
+            return True
+
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '(':
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
             if (token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types)) and \
-                    self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.type_name(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
@@ -1765,12 +2003,12 @@ class Parser():
                 nodes = deque()
                 token = tokIter.lookaheadToken(1)
                 if token[TOK_VALUE] != '{':
-                    assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse assignment_expression @ %s" % info['path']
+                    assert self.constant_expression(tokIter, tree, info, depth+1), "failed to parse assignment_expression @ %s" % info['path']
                     nodes.append(tree.pop())
                     tree.append((NODE_ASSIGNMENT_EXPRESSION, nodes))
-                    logger.debug('%s%s' % (indent, True))
+                    if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                     return True
-            elif self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
@@ -1780,25 +2018,25 @@ class Parser():
             else:
                 raise Exception('failed to parse assignment_expression @ %s' % info['path'])
 
-        while self.unary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.unary_expression(tokIter, tree, info, depth+1):
             token = tokIter.lookaheadToken(1)
             if token[TOK_TYPE] == TOK_ASSIGN_OP:
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
                 nodes.append(tree.pop())
                 nodes.append(tokIter.getToken())
             else:
                 break
 
-        if self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.constant_expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             tree.append((NODE_ASSIGNMENT_EXPRESSION, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def init_declarator_list(self, tokIter, tree, info, indent=''):
+    def init_declarator_list(self, tokIter, tree, info, depth=0):
         '''
         : init_declarator (',' init_declarator)*
 
@@ -1808,9 +2046,9 @@ class Parser():
         Follow Set:
         ';'
         '''
-        logger.debug('%s%s' % (indent, 'init_declarator_list'))
-        if not self.init_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'init_declarator_list')
+        if not self.init_declarator(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -1818,43 +2056,43 @@ class Parser():
         token = tokIter.lookaheadToken(1)
         while token[TOK_VALUE] == ',':
             nodes.append(tokIter.getToken())
-            assert self.init_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse init_declarator_list @ %s" % info['path']
+            assert self.init_declarator(tokIter, tree, info, depth+1), "failed to parse init_declarator_list @ %s" % info['path']
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_INIT_DECLARATOR_LIST, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def init_declarator(self, tokIter, tree, info, indent=''):
+    def init_declarator(self, tokIter, tree, info, depth=0):
         '''
         : declarator ('=' initializer)?
 
         First Set:
         '*', IDENTIFIER, '('
         '''
-        logger.debug('%s%s' % (indent, 'init_declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'init_declarator')
         nodes = deque()
 
         if tree and tree[0][NODE_TYPE] == NODE_DECLARATOR:
             nodes.append(tree.popleft())
-        elif self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '=':
             nodes.append(tokIter.getToken())
-            assert self.initializer(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse init_declarator @ %s" % info['path']
+            assert self.initializer(tokIter, tree, info, depth+1), "failed to parse init_declarator @ %s" % info['path']
             nodes.append(tree.pop())
 
         tree.append((NODE_INIT_DECLARATOR, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def initializer(self, tokIter, tree, info, indent=''):
+    def initializer(self, tokIter, tree, info, depth=0):
         '''
         : '{' initializer_list '}'
         | assignment_expression
@@ -1864,13 +2102,13 @@ class Parser():
         OPERATOR, SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'initializer'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'initializer')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '{':
             nodes.append(tokIter.getToken())
 
-            assert self.initializer_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse initializer @ %s' % info['path']
+            assert self.initializer_list(tokIter, tree, info, depth+1), 'failed to parse initializer @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -1878,18 +2116,18 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_INITIALIZER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.assignment_expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             tree.append((NODE_INITIALIZER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def initializer_list(self, tokIter, tree, info, indent=''):
+    def initializer_list(self, tokIter, tree, info, depth=0):
         '''
         : (designation)? initializer (',' (designation)? initializer)* (',')?
 
@@ -1899,13 +2137,13 @@ class Parser():
         OPERATOR, SIZEOF, 
         IDENTIFIER, CHARACTER, NUMBER, STRING, '('
         '''
-        logger.debug('%s%s' % (indent, 'initializer_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'initializer_list')
         nodes = deque()
-        if self.designation(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.designation(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
-        if not self.initializer(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if not self.initializer(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes.append(tree.pop())
@@ -1914,21 +2152,21 @@ class Parser():
             nodes.append(tokIter.getToken())
 
             token = tokIter.lookaheadToken(1)
-            if token[TOK_VALUE] in '[.' and self.designation(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_VALUE] in '[.' and self.designation(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             elif token[TOK_VALUE] == '}':
                 break
 
-            assert self.initializer(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse initializer_list @ %s' % info['path']
+            assert self.initializer(tokIter, tree, info, depth+1), 'failed to parse initializer_list @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_INITIALIZER_LIST, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def labeled_statement(self, tokIter, tree, info, indent=''):
+    def labeled_statement(self, tokIter, tree, info, depth=0):
         '''
         : (IDENTIFIER|DEFAULT) ':' statement
         | CASE constant_expression ('...' constant_expression)? ':' statement # C extension (Case Range)
@@ -1936,7 +2174,7 @@ class Parser():
         First Set:
         IDENTIFIER, DEFAULT, CASE
         '''
-        logger.debug('%s%s' % (indent, 'labeled_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'labeled_statement')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] == TOK_IDENTIFIER or token[TOK_TYPE] == TOK_DEFAULT:
@@ -1945,67 +2183,67 @@ class Parser():
                 nodes.append(tokIter.getToken())
                 nodes.append(tokIter.getToken())
 
-                assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse labeled_statement @ %s" % info['path']
+                assert self.statement(tokIter, tree, info, depth+1), "failed to parse labeled_statement @ %s" % info['path']
                 nodes.append(tree.pop())
 
                 tree.append((NODE_LABELED_STATEMENT, nodes))
-                logger.debug('%s%s' % (indent, True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
         elif token[TOK_TYPE] == TOK_CASE:
             nodes.append(tokIter.getToken())
 
-            assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse labeled_statement @ %s" % info['path']
+            assert self.constant_expression(tokIter, tree, info, depth+1), "failed to parse labeled_statement @ %s" % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             if token[TOK_TYPE] == TOK_ELLIPSIS:
                 nodes.append(token)
-                assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse labeled_statement @ %s" % info['path']
+                assert self.constant_expression(tokIter, tree, info, depth+1), "failed to parse labeled_statement @ %s" % info['path']
                 token = tokIter.getToken()
 
             assert token[TOK_VALUE] == ':', "expected ':' or '...' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), "failed to parse labeled_statement @ %s" % info['path']
+            assert self.statement(tokIter, tree, info, depth+1), "failed to parse labeled_statement @ %s" % info['path']
             nodes.append(tree.pop())
 
             tree.append((NODE_LABELED_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def compound_statement(self, tokIter, tree, info, indent=''):
+    def compound_statement(self, tokIter, tree, info, depth=0):
         '''
         : '{' (block_item_list)? '}'
 
         First Set:
         '{'
         '''
-        logger.debug('%s%s' % (indent, 'compound_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'compound_statement')
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] != '{':
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         nodes = deque()
         nodes.append(tokIter.getToken())
 
-        if self.block_item_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.block_item_list(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
         token = tokIter.getToken()
         assert token[TOK_VALUE] == '}', "expected '}' but got %s @ %s" % (str(token), info['path'])
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         nodes.append(token)
 
         tree.append((NODE_COMPOUND_STATEMENT, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def block_item_list(self, tokIter, tree, info, indent=''):
+    def block_item_list(self, tokIter, tree, info, depth=0):
         '''
         : (block_item)+
 
@@ -2024,21 +2262,21 @@ class Parser():
         WHILE, DO, FOR
         GOTO, CONTINUE, BREAK, RETURN
         '''
-        logger.debug('%s%s' % (indent, 'block_item_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'block_item_list')
         nodes = deque()
-        while self.block_item(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            #logger.debug('%s%s' % (indent, node))
+        while self.block_item(tokIter, tree, info, depth+1):
+            #logger.debug('%s%s', INDENT * depth, node)
             nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_BLOCK_ITEM_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def block_item(self, tokIter, tree, info, indent=''):
+    def block_item(self, tokIter, tree, info, depth=0):
         '''
         : declaration
         | statement
@@ -2058,28 +2296,20 @@ class Parser():
         WHILE, DO, FOR
         GOTO, CONTINUE, BREAK, RETURN
         '''
-        logger.debug('%s%s' % (indent, 'block_item'))
-        nodes = deque()
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'block_item')
         tok = tokIter.lookaheadToken(1)
-        logger.debug('%s%s' % (indent, str(tok)))
-        if (tok[TOK_TYPE] & (TOK_STORAGE_CLASS|TOK_FUNC_SPEC|TOK_TYPE_QUAL|TOK_TYPE_SPEC) or \
-                (tok[TOK_TYPE] == TOK_IDENTIFIER and tok[TOK_VALUE] in self.types)) and \
-                self.declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            tree.append((NODE_BLOCK_ITEM, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif (tok[TOK_TYPE] & (TOK_CONSTANT|TOK_IDENTIFIER|TOK_STATEMENT|TOK_SIZEOF) or (tok[TOK_TYPE] == TOK_OPERATOR and tok[TOK_VALUE] in '{(;&*~!++--')) and \
-                self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, tok)
+        if self.dispatch(BLOCK_ITEM_RULES, first_key(tok, self.types), tokIter, tree, info, depth):
+            nodes = deque()
             nodes.append(tree.pop())
             tree.append((NODE_BLOCK_ITEM, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def statement(self, tokIter, tree, info, indent=''):
+    def statement(self, tokIter, tree, info, depth=0):
         '''
         : labeled_statement
         | compound_statement
@@ -2097,56 +2327,24 @@ class Parser():
         WHILE, DO, FOR
         GOTO, CONTINUE, BREAK, RETURN
         '''
-        logger.debug('%s%s' % (indent, 'statement'))
-        nodes = deque()
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'statement')
         tok = tokIter.lookaheadToken(1)
-        if (tok[TOK_TYPE] == TOK_IDENTIFIER or TOK_CASE <= tok[TOK_TYPE] <= TOK_DEFAULT) and \
-                self.labeled_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
-            tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif TOK_SWITCH <= tok[TOK_TYPE] <= TOK_IF and \
-                self.selection_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
-            tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif TOK_FOR <= tok[TOK_TYPE] <= TOK_WHILE and \
-                self.iteration_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
-            tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif TOK_GOTO <= tok[TOK_TYPE] <= TOK_RETURN and \
-                self.jump_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
-            tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif tok[TOK_VALUE] == '{' and \
-                self.compound_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
-            tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif (tok[TOK_TYPE] & (TOK_CONSTANT|TOK_IDENTIFIER|TOK_SIZEOF) or (tok[TOK_TYPE] == TOK_OPERATOR and tok[TOK_VALUE] in '(&*~!++--;')) and \
-                self.expression_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if tok[TOK_TYPE] == TOK_IDENTIFIER and tokIter.lookaheadToken(2)[TOK_VALUE] == ':':
+            key = KEY_LABEL
+        else:
+            key = first_key(tok, self.types)
+
+        if self.dispatch(STATEMENT_RULES, key, tokIter, tree, info, depth):
+            nodes = deque()
             nodes.append(tree.pop())
-            #logger.debug('%s%s' % (indent, st))
             tree.append((NODE_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def expression_statement(self, tokIter, tree, info, indent=''):
+    def expression_statement(self, tokIter, tree, info, depth=0):
         '''
         : (expression)? ';'
 
@@ -2155,31 +2353,31 @@ class Parser():
         NUMBER, CHARACTER, STRING, IDENTIFIER
         '(', ';'
         '''
-        logger.debug('%s%s' % (indent, 'expression_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'expression_statement')
         nodes = deque()
-        if self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] == ';':
                 nodes.append(tokIter.getToken())
                 tree.append((NODE_EXPRESSION_STATEMENT, nodes))
-                logger.debug('%s%s' % (indent, True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
             else:
-                logger.debug('%s%s' % (indent, False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
         else:
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] == ';':
                 nodes.append(tokIter.getToken())
                 tree.append((NODE_EXPRESSION_STATEMENT, nodes))
-                logger.debug('%s%s' % (indent, True))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, True)
                 return True
             else:
-                logger.debug('%s%s' % (indent, False))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, False)
                 return False
 
-    def selection_statement(self, tokIter, tree, info, indent=''):
+    def selection_statement(self, tokIter, tree, info, depth=0):
         '''
         : IF '(' expression ')' statement (ELSE statement)?
         | SWITCH '(' expression ')' statement
@@ -2187,39 +2385,39 @@ class Parser():
         First Set:
         IF, SWITCH
         '''
-        logger.debug('%s%s' % (indent, 'selection_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'selection_statement')
         token = tokIter.lookaheadToken(1)
         nodes = deque()
 
         if token[TOK_TYPE] == TOK_IF:
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
 
             token = tokIter.getToken()
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse selection_statement @ %s' % info['path']
+            assert self.expression(tokIter, tree, info, depth+1), 'failed to parse selection_statement @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(token)
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse selection_statement @ %s' % info['path']
+            assert self.statement(tokIter, tree, info, depth+1), 'failed to parse selection_statement @ %s' % info['path']
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
 
             if token[TOK_TYPE] == TOK_ELSE:
                 nodes.append(tokIter.getToken())
 
-                assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse selection_statement @ %s' % info['path']
+                assert self.statement(tokIter, tree, info, depth+1), 'failed to parse selection_statement @ %s' % info['path']
                 nodes.append(tree.pop())
 
             tree.append((NODE_SELECTION_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_SWITCH:
             nodes.append(tokIter.getToken())
@@ -2228,23 +2426,23 @@ class Parser():
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse selection_statement @ %s' % info['path']
+            assert self.expression(tokIter, tree, info, depth+1), 'failed to parse selection_statement @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse selection_statement @ %s' % info['path']
+            assert self.statement(tokIter, tree, info, depth+1), 'failed to parse selection_statement @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_SELECTION_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def iteration_statement(self, tokIter, tree, info, indent=''):
+    def iteration_statement(self, tokIter, tree, info, depth=0):
         '''
         : WHILE '(' expression ')' statement
         | DO statement WHILE '(' expression ')' ';'
@@ -2253,7 +2451,7 @@ class Parser():
         First Set:
         WHILE, DO, FOR
         '''
-        logger.debug('%s%s' % (indent, 'iteration_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'iteration_statement')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] == TOK_WHILE:
@@ -2263,22 +2461,22 @@ class Parser():
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.expression(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.statement(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
             tree.append((NODE_ITERATION_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_DO:
             nodes.append(tokIter.getToken())
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.statement(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -2289,7 +2487,7 @@ class Parser():
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.expression(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -2301,7 +2499,7 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_ITERATION_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_FOR:
             nodes.append(tokIter.getToken())
@@ -2310,34 +2508,34 @@ class Parser():
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            if self.expression_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.expression_statement(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
-            elif self.declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.declaration(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             else:
                 raise Exception('failed to parse iteration_statement @ %s' % info['path'])
 
-            assert self.expression_statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.expression_statement(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
 
-            if self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
-            assert self.statement(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse iteration_statement @ %s' % info['path'] 
+            assert self.statement(tokIter, tree, info, depth+1), 'failed to parse iteration_statement @ %s' % info['path'] 
             nodes.append(tree.pop())
 
             tree.append((NODE_ITERATION_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def jump_statement(self, tokIter, tree, info, indent=''):
+    def jump_statement(self, tokIter, tree, info, depth=0):
         '''
         : GOTO IDENTIFIER ';'
         | (CONTINUE|BREAK) ';'
@@ -2346,13 +2544,13 @@ class Parser():
         First Set:
         GOTO, CONTINUE, BREAK, RETURN
         '''
-        logger.debug('%s%s' % (indent, 'jump_statement'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'jump_statement')
         token = tokIter.lookaheadToken(1)
         nodes = deque()
 
         if token[TOK_TYPE] == TOK_GOTO:
             nodes.append(tokIter.getToken())
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
 
             token = tokIter.getToken()
             assert token[TOK_TYPE] == TOK_IDENTIFIER, "expected IDENTIFIER but got %s @ %s" % (str(token), info['path'])
@@ -2363,23 +2561,23 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_JUMP_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_CONTINUE or token[TOK_TYPE] == TOK_BREAK:
             nodes.append(tokIter.getToken())
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ';', "expected ';' but got %s @ %s" % (str(token), info['path'])
 
             tree.append((NODE_JUMP_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_TYPE] == TOK_RETURN:
             nodes.append(tokIter.getToken())
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
 
-            if self.expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -2387,13 +2585,13 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_JUMP_STATEMENT, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def declaration_list(self, tokIter, tree, info, indent=''):
+    def declaration_list(self, tokIter, tree, info, depth=0):
         '''
         : (declartion)+
         
@@ -2408,21 +2606,21 @@ class Parser():
         Follow Set:
         '{'
         '''
-        logger.debug('%s%s' % (indent, 'declaration_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration_list')
         nodes = deque()
 
-        while self.declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.declaration(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_DECLARATION_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def declartion(self, tokIter, tree, info, indent=''):
+    def declartion(self, tokIter, tree, info, depth=0):
         '''
         : declaration_specifiers (init_declarator_list)? ';'
 
@@ -2434,15 +2632,15 @@ class Parser():
         STRUCT, UNION, ENUM 
         IDENTIFIER (TYPE_NAME)
         '''
-        logger.debug('%s%s' % (indent, 'declaration'))
-        if not self.declaration_specifiers(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declaration')
+        if not self.declaration_specifiers(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
         nodes.append(tree.pop())
 
-        if self.init_declarator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.init_declarator_list(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
         token = tokIter.getToken()
@@ -2450,30 +2648,30 @@ class Parser():
         nodes.append(token)
 
         tree.append((NODE_DECLARATION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def function_specifier(self, tokIter, tree, info, indent=''):
+    def function_specifier(self, tokIter, tree, info, depth=0):
         '''
         : INLINE
 
         First Set:
         INLINE
         '''
-        logger.debug('%s%s' % (indent, 'function_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'function_specifier')
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_TYPE] == TOK_INLINE:
             nodes = deque()
             nodes.append(tokIter.getToken())
             tree.append((NODE_FUNCTION_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def storage_class_specifier(self, tokIter, tree, info, indent=''):
+    def storage_class_specifier(self, tokIter, tree, info, depth=0):
         '''
         : TYPEDEF
         | EXTERN
@@ -2484,21 +2682,21 @@ class Parser():
         First Set:
         TYPEDEF, EXTERN, STATIC, AUTO, REGISTER
         '''
-        logger.debug('%s%s' % (indent, 'storage_class_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'storage_class_specifier')
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_TYPE] & TOK_STORAGE_CLASS:
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes = deque()
             nodes.append(tokIter.getToken())
             tree.append((NODE_STORAGE_CLASS_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def type_specifier(self, tokIter, tree, info, indent=''):
+    def type_specifier(self, tokIter, tree, info, depth=0):
         '''
         : VOID
         | CHAR
@@ -2523,28 +2721,18 @@ class Parser():
         ENUM 
         IDENTIFIER (TYPE_NAME)
         '''
-        logger.debug('%s%s' % (indent, 'type_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'type_specifier')
         token = tokIter.lookaheadToken(1)
-        logger.debug('%s%s' % (indent,str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         nodes = deque()
 
-        if TOK_VOID <= token[TOK_TYPE] <= TOK_IMAGINARY:
+        key = first_key(token, self.types)
+        if key in TYPE_SPECIFIER_TOKENS:
             nodes.append(tokIter.getToken())
             tree.append((NODE_TYPE_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif TOK_STRUCT <= token[TOK_TYPE] <= TOK_UNION and \
-                self.struct_or_union_specifier(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            tree.append((NODE_TYPE_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
-            return True
-        elif token[TOK_TYPE] == TOK_ENUM and self.enum_specifier(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            nodes.append(tree.pop())
-            tree.append((NODE_TYPE_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif token[TOK_TYPE] == TOK_TYPEOF:
+        elif key == TOK_TYPEOF:
             nodes.append(tokIter.getToken())
 
             token = tokIter.getToken()
@@ -2552,9 +2740,9 @@ class Parser():
             nodes.append(token)
 
             if (token[TOK_TYPE] & (TOK_TYPE_QUAL|TOK_TYPE_SPEC) or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types)) and \
-                    self.type_name(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.type_name(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
-            elif self.unary_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.unary_expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             else:
                 raise Exception('failed to parse type_specifier @ %s' % info['path'])
@@ -2564,18 +2752,18 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_TYPE_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types:
-            nodes.append(tokIter.getToken())
+        elif self.dispatch(TYPE_SPECIFIER_RULES, key, tokIter, tree, info, depth):
+            nodes.append(tree.pop())
             tree.append((NODE_TYPE_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def struct_or_union_specifier(self, tokIter, tree, info, indent=''):
+    def struct_or_union_specifier(self, tokIter, tree, info, depth=0):
         '''
         : (STRUCT|UNION) IDENTIFIER ('{' (struct_declaration_list)? '}')?   # C extension (empty decl list)
         | (STRUCT|UNION) '{' (struct_declaration_list)? '}'                 # C extension (empty decl list)
@@ -2583,11 +2771,11 @@ class Parser():
         First Set:
         STRUCT, UNION
         '''
-        logger.debug('%s%s' % (indent, 'struct_or_union_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_or_union_specifier')
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_TYPE] != TOK_STRUCT and token[TOK_TYPE] != TOK_UNION:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -2595,25 +2783,25 @@ class Parser():
         token = tokIter.getToken()
 
         if token[TOK_TYPE] == TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(token)
 
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] == '{':
                 nodes.append(tokIter.getToken())
 
-                if self.struct_declaration_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                if self.struct_declaration_list(tokIter, tree, info, depth+1):
                     nodes.append(tree.pop())
 
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == '}', "expected '}' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
         else:
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             assert token[TOK_VALUE] == '{', "expected '{' but oot %s @ %s" % (token, info['path'])
             nodes.append(token)
 
-            assert self.struct_declaration_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse struct_or_union_specifier @ %s' % info['path']
+            assert self.struct_declaration_list(tokIter, tree, info, depth+1), 'failed to parse struct_or_union_specifier @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -2621,10 +2809,10 @@ class Parser():
             nodes.append(token)
 
         tree.append((NODE_STRUCT_OR_UNION_SPECIFIER, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def struct_declaration_list(self, tokIter, tree, info, indent=''):
+    def struct_declaration_list(self, tokIter, tree, info, depth=0):
         '''
         : (struct_declaration)+
 
@@ -2635,21 +2823,21 @@ class Parser():
         IDENTIFIER (TYPE_NAME)
         CONST, RESTRICT, VOLATILE
         '''
-        logger.debug('%s%s' % (indent, 'struct_declaration_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_declaration_list')
         nodes = deque()
 
-        while self.struct_declaration(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.struct_declaration(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_STRUCT_DECLARATION_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def struct_declaration(self, tokIter, tree, info, indent=''):
+    def struct_declaration(self, tokIter, tree, info, depth=0):
         '''
         : specifier_qualifier_list (struct_declarator_list)? ';'
 
@@ -2662,10 +2850,10 @@ class Parser():
 
         CONST <= token <= TOK_ENUM, IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'struct_declaration'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_declaration')
 
-        if not self.specifier_qualifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if not self.specifier_qualifier_list(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -2675,7 +2863,7 @@ class Parser():
         if token[TOK_VALUE] == ';':
             nodes.append(tokIter.getToken())
         else:
-            assert self.struct_declarator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse struct_declaration @ %s' % info['path']
+            assert self.struct_declarator_list(tokIter, tree, info, depth+1), 'failed to parse struct_declaration @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -2683,10 +2871,10 @@ class Parser():
             nodes.append(token)
 
         tree.append((NODE_STRUCT_DECLARATION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def specifier_qualifier_list(self, tokIter, tree, info, indent=''):
+    def specifier_qualifier_list(self, tokIter, tree, info, depth=0):
         '''
         : (type_specifier|type_qualifier)+
 
@@ -2699,17 +2887,17 @@ class Parser():
 
         CONST <= token <= TOK_ENUM, IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'specifier_qualifier_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'specifier_qualifier_list')
         nodes = deque()
 
         while True:
             token = tokIter.lookaheadToken(1)
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             if (token[TOK_TYPE] & TOK_TYPE_SPEC or (token[TOK_TYPE] == TOK_IDENTIFIER and token[TOK_VALUE] in self.types)) and \
-                    self.type_specifier(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.type_specifier(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             elif token[TOK_TYPE] & TOK_TYPE_QUAL  and \
-                    self.type_qualifier(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                    self.type_qualifier(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             else:
                 #if token[TOK_TYPE] == TOK_IDENTIFIER:
@@ -2720,13 +2908,13 @@ class Parser():
 
         if nodes:
             tree.append((NODE_SPECIFIER_QUALIFIER_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def struct_declarator_list(self, tokIter, tree, info, indent=''):
+    def struct_declarator_list(self, tokIter, tree, info, depth=0):
         '''
         : struct_declarator (',' struct_declarator)*
 
@@ -2734,10 +2922,10 @@ class Parser():
         ':',
         '*', IDENTIFIER, '('
         '''
-        logger.debug('%s%s' % (indent, 'struct_declarator_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_declarator_list')
 
-        if not self.struct_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent,False))
+        if not self.struct_declarator(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -2748,16 +2936,16 @@ class Parser():
         while token[TOK_VALUE] == ',':
             nodes.append(tokIter.getToken())
 
-            assert self.struct_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse struct_declaration_list @ %s' % info['path']
+            assert self.struct_declarator(tokIter, tree, info, depth+1), 'failed to parse struct_declaration_list @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_STRUCT_DECLARATOR_LIST, nodes))
-        logger.debug('%s%s' % (indent,True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def struct_declarator(self, tokIter, tree, info, indent=''):
+    def struct_declarator(self, tokIter, tree, info, depth=0):
         '''
         : ':' constant_expression 
         | declarator (':' constant_expression)?
@@ -2766,36 +2954,36 @@ class Parser():
         ':',
         '*', IDENTIFIER, '('
         '''
-        logger.debug('%s%s' % (indent, 'struct_declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'struct_declarator')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_VALUE] == ':':
             nodes.append(tokIter.getToken())
-            logger.debug('%s%s' % (indent,str(token)))
-            assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse constant_expression @ %s' % info['path']
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+            assert self.constant_expression(tokIter, tree, info, depth+1), 'failed to parse constant_expression @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_STRUCT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
-        elif self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        elif self.declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
             if token[TOK_VALUE] == ':':
                 nodes.append(tokIter.getToken())
-                logger.debug('%s%s' % (indent,str(token)))
-                assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse constant_expression @ %s' % info['path']
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+                assert self.constant_expression(tokIter, tree, info, depth+1), 'failed to parse constant_expression @ %s' % info['path']
                 nodes.append(tree.pop())
 
             tree.append((NODE_STRUCT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def declarator(self, tokIter, tree, info, indent=''):
+    def declarator(self, tokIter, tree, info, depth=0):
         '''
         : (pointer)? direct_declarator (direct_declarator_suffix)?
         | pointer (direct_declarator (direct_declarator_suffix)?)?
@@ -2812,30 +3000,30 @@ class Parser():
         IDENTIFIER (TYPE_NAME),
         '{', '=', ':' , ')'
         '''
-        logger.debug('%s%s' % (indent, 'declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'declarator')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
 
-        if token[TOK_VALUE] == '*' and self.pointer(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if token[TOK_VALUE] == '*' and self.pointer(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
-        if self.direct_declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        if self.direct_declarator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
 
             token = tokIter.lookaheadToken(1)
-            if token[TOK_VALUE] in '[(' and self.direct_declarator_suffix(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_VALUE] in '[(' and self.direct_declarator_suffix(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
         if nodes:
             tree.append((NODE_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def direct_declarator(self, tokIter, tree, info, indent=''):
+    def direct_declarator(self, tokIter, tree, info, depth=0):
         '''
         : IDENTIFIER
         | '(' declarator ')'
@@ -2843,40 +3031,40 @@ class Parser():
         First Set:
         IDENTIFIER, '('
         '''
-        logger.debug('%s%s' % (indent, 'direct_declarator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'direct_declarator')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_TYPE] == TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
             tree.append((NODE_DIRECT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_VALUE] == '(':
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
 
-            if self.declarator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if self.declarator(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
             else:
-                logger.error('failed to parse direct_declarator @ %s' % info['path'])
+                logger.error('failed to parse direct_declarator @ %s', info['path'])
 
             token = tokIter.getToken()
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
 
             tree.append((NODE_DIRECT_DECLARATOR, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,str(token)))
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def direct_declarator_suffix(self, tokIter, tree, info, indent=''):
+    def direct_declarator_suffix(self, tokIter, tree, info, depth=0):
         '''
         #: (parameter_specifier|dimension_specifier)+
         : parameter_specifier
@@ -2885,54 +3073,54 @@ class Parser():
         First Set:
         '[', '('
         '''
-        logger.debug('%s%s' % (indent, 'direct_declarator_suffix'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'direct_declarator_suffix')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '(':
-            assert self.parameter_specifier(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse direct_declarator_suffix @ %s' % info['path']
+            assert self.parameter_specifier(tokIter, tree, info, depth+1), 'failed to parse direct_declarator_suffix @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_DIRECT_DECLARATOR_SUFFIX, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_VALUE] == '[':
             while True:
-                assert self.dimension_specifier(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse direct_declarator_suffix @ %s' % info['path']
+                assert self.dimension_specifier(tokIter, tree, info, depth+1), 'failed to parse direct_declarator_suffix @ %s' % info['path']
                 nodes.append(tree.pop())
                 token = tokIter.lookaheadToken(1)
                 if token[TOK_VALUE] != '[':
                     break
             tree.append((NODE_DIRECT_DECLARATOR_SUFFIX, nodes))
-            logger.debug('%s%s' % (indent,True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent,False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def parameter_specifier(self, tokIter, tree, info, indent=''):
+    def parameter_specifier(self, tokIter, tree, info, depth=0):
         '''
         : '(' ')'
         | '(' parameter_list ')'
         | '(' identifier_list ')'
         '''
-        logger.debug('%s%s' % (indent, 'parameter_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'parameter_specifier')
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_VALUE] == '(':
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes = deque()
             nodes.append(tokIter.getToken())
             token = tokIter.lookaheadToken(1)
 
             if token[TOK_VALUE] == ')':
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
                 nodes.append(tokIter.getToken())
-            elif self.parameter_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.parameter_list(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-            elif self.identifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            elif self.identifier_list(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), info['path'])
@@ -2941,13 +3129,13 @@ class Parser():
                 raise Exception('failed to parse parameter_specifier @ %s' % info['path'])
 
             tree.append((NODE_PARAMETER_SPECIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def dimension_specifier(self, tokIter, tree, info, indent=''):
+    def dimension_specifier(self, tokIter, tree, info, depth=0):
         '''
         : '[' ']'
         | '[' '*' ']'
@@ -2958,102 +3146,102 @@ class Parser():
         | '[' type_qualifier_list STATIC assignment_expression ']'
         | '[' type_qualifier_list assignment_expression ']'
         '''
-        logger.debug('%s%s' % (indent, 'dimension_specifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'dimension_specifier')
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] != '[':
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         nodes.append(tokIter.getToken())
         token = tokIter.lookaheadToken(1)
 
         if token[TOK_VALUE] == ']':
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(tokIter.getToken())
         elif token[TOK_VALUE] == '*':
             nodes.append(tokIter.getToken())
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         elif token[TOK_TYPE] == TOK_STATIC:
             nodes.append(tokIter.getToken())
 
-            assert self.type_qualifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse direct_declarator @ %s' % info['path']
+            assert self.type_qualifier_list(tokIter, tree, info, depth+1), 'failed to parse direct_declarator @ %s' % info['path']
             nodes.append(tree.pop())
 
-            assert self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse direct_declarator @ %s' % info['path']
+            assert self.assignment_expression(tokIter, tree, info, depth+1), 'failed to parse direct_declarator @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
-            logger.debug('%s%s' % (indent, str(token)))
-        elif self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+        elif self.assignment_expression(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
-            logger.debug('%s%s' % (indent, str(token)))
-        elif self.type_qualifier_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+        elif self.type_qualifier_list(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
             token = tokIter.lookaheadToken(1)
 
             if token[TOK_VALUE] == ']':
                 nodes.append(tokIter.getToken())
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             elif token[TOK_VALUE] == '*':
                 nodes.append(tokIter.getToken())
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             elif token[TOK_TYPE] == TOK_STATIC:
                 nodes.append(tokIter.getToken())
 
-                assert self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse direct_declarator @ %s' % info['path']
+                assert self.assignment_expression(tokIter, tree, info, depth+1), 'failed to parse direct_declarator @ %s' % info['path']
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-                logger.debug('%s%s' % (indent, str(token)))
-            elif self.assignment_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+            elif self.assignment_expression(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
                 assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
                 nodes.append(token)
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             else:
                 raise Exception('failed to parse dimension_specifier @ %s' % info['path'])
         else:
             raise Exception('failed to parse dimension_specifier @ %s' % info['path'])
 
         tree.append((NODE_DIMENSION_SPECIFIER, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def identifier_list(self, tokIter, tree, info, indent=''):
+    def identifier_list(self, tokIter, tree, info, depth=0):
         '''
         : IDENTIFIER (',' IDENTIFIER)*
 
         First Set:
         IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'identifier_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'identifier_list')
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] != TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
         nodes.append(tokIter.getToken())
 
-        logger.debug('%s%s' % (indent,str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         token = tokIter.lookaheadToken(1)
 
         while token[TOK_VALUE] == ',':
@@ -3062,15 +3250,15 @@ class Parser():
             token = tokIter.getToken()
             assert token[TOK_TYPE] == TOK_IDENTIFIER, 'expected IDENTIFIER but got %s' % str(token)
 
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(token)
             token = tokIter.lookaheadToken(1)
 
         tree.append((NODE_IDENTIFIER_LIST, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def enum_specifier(self, tokIter, tree, info, indent=''):
+    def enum_specifier(self, tokIter, tree, info, depth=0):
         '''
         : ENUM '{' enumerator_list '}'
         | ENUM IDENTIFIER ('{' enumerator_list '}')?
@@ -3078,11 +3266,11 @@ class Parser():
         First Set:
         ENUM
         '''
-        logger.debug('%s%s' % (indent, 'enum_specifer'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'enum_specifer')
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] != TOK_ENUM:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -3097,7 +3285,7 @@ class Parser():
             if token[TOK_VALUE] == '{':
                 nodes.append(tokIter.getToken())
 
-                assert self.enumerator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse enum_specifer @ %s' % info['path']
+                assert self.enumerator_list(tokIter, tree, info, depth+1), 'failed to parse enum_specifer @ %s' % info['path']
                 nodes.append(tree.pop())
 
                 token = tokIter.getToken()
@@ -3111,7 +3299,7 @@ class Parser():
             assert token[TOK_VALUE] == '{', "expected '{' but got %s @ %s" % (str(token), info['path'])
             nodes.append(tokIter.getToken())
 
-            assert self.enumerator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse enum_specifer @ %s' % info['path']
+            assert self.enumerator_list(tokIter, tree, info, depth+1), 'failed to parse enum_specifer @ %s' % info['path']
             nodes.append(tree.pop())
 
             token = tokIter.getToken()
@@ -3123,19 +3311,19 @@ class Parser():
             nodes.append(token)
 
             tree.append((NODE_ENUM_SPECIFIER, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def enumerator_list(self, tokIter, tree, info, indent=''):
+    def enumerator_list(self, tokIter, tree, info, depth=0):
         '''
         : enumerator (',' enumerator)* (',')?
 
         First Set:
         IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'enumerator_list'))
-        if not self.enumerator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'enumerator_list')
+        if not self.enumerator(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         nodes = deque()
@@ -3146,48 +3334,48 @@ class Parser():
             nodes.append(tokIter.getToken())
 
             token = tokIter.lookaheadToken(1)
-            if token[TOK_TYPE] == TOK_IDENTIFIER and self.enumerator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+            if token[TOK_TYPE] == TOK_IDENTIFIER and self.enumerator(tokIter, tree, info, depth+1):
                 nodes.append(tree.pop())
                 token = tokIter.lookaheadToken(1)
             else:
                 break
 
         tree.append((NODE_ENUMERATOR_LIST, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def enumerator(self, tokIter, tree, info, indent=''):
+    def enumerator(self, tokIter, tree, info, depth=0):
         '''
         : IDENTIFIER ('=' constant_expression)?
 
         First Set:
         IDENTIFIER
         '''
-        logger.debug('%s%s' % (indent, 'enumerator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'enumerator')
 
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] != TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
         token = tokIter.getToken()
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         nodes.append(token)
 
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '=':
             nodes.append(tokIter.getToken())
-            logger.debug('%s%s' % (indent, str(token)))
-            assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse constant_expression @ %s' % info['path']
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
+            assert self.constant_expression(tokIter, tree, info, depth+1), 'failed to parse constant_expression @ %s' % info['path']
             nodes.append(tree.pop())
             tree.append((NODE_ENUMERATOR, nodes))
         else:
             tree.append((NODE_ENUMERATOR, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def type_qualifier(self, tokIter, tree, info, indent=''):
+    def type_qualifier(self, tokIter, tree, info, depth=0):
         '''
         : CONST
         | RESTRICT
@@ -3196,29 +3384,29 @@ class Parser():
         First Set:
         CONST, RESTRICT, VOLATILE
         '''
-        logger.debug('%s%s' % (indent, 'type_qualifier'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'type_qualifier')
         token = tokIter.lookaheadToken(1)
         if token[TOK_TYPE] & TOK_TYPE_QUAL:
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes = deque()
             nodes.append(tokIter.getToken())
             tree.append((NODE_TYPE_QUALIFIER, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def designation(self, tokIter, tree, info, indent=''):
+    def designation(self, tokIter, tree, info, depth=0):
         '''
         : designator_list '='
 
         First Set:
         '[', '.'
         '''
-        logger.debug('%s%s' % (indent, 'designation'))
-        if not self.designator_list(tokIter, tree, info, '%s%s'%(indent,INDENT)):
-            logger.debug('%s%s' % (indent, False))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'designation')
+        if not self.designator_list(tokIter, tree, info, depth+1):
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
         nodes = deque()
         nodes.append(tree.pop())
@@ -3226,29 +3414,29 @@ class Parser():
         assert token[TOK_VALUE] == '=', "expected '=' but got %s @ %s" % (str(token), info['path'])
         nodes.append(token)
         tree.append((NODE_DESIGNATION, nodes))
-        logger.debug('%s%s' % (indent, True))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, True)
         return True
 
-    def designator_list(self, tokIter, tree, info, indent=''):
+    def designator_list(self, tokIter, tree, info, depth=0):
         '''
         : (designator)+
 
         First Set:
         '[', '.'
         '''
-        logger.debug('%s%s' % (indent, 'designator_list'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'designator_list')
         nodes = deque()
-        while self.designator(tokIter, tree, info, '%s%s'%(indent,INDENT)):
+        while self.designator(tokIter, tree, info, depth+1):
             nodes.append(tree.pop())
         if nodes:
             tree.append((NODE_DESIGNATOR_LIST, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
-    def designator(self, tokIter, tree, info, indent=''):
+    def designator(self, tokIter, tree, info, depth=0):
         '''
         : '[' constant_expression ']'
         | '.' IDENTIFIER
@@ -3256,29 +3444,37 @@ class Parser():
         First Set:
         '[', '.'
         '''
-        logger.debug('%s%s' % (indent, 'designator'))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, 'designator')
         nodes = deque()
         token = tokIter.lookaheadToken(1)
         if token[TOK_VALUE] == '[':
             nodes.append(tokIter.getToken())
-            assert self.constant_expression(tokIter, tree, info, '%s%s'%(indent,INDENT)), 'failed to parse designator @ %s' % info['path']
+            assert self.constant_expression(tokIter, tree, info, depth+1), 'failed to parse designator @ %s' % info['path']
             nodes.append(tree.pop())
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ']', "expected ']' but got %s @ %s" % (str(token), info['path'])
             nodes.append(token)
             tree.append((NODE_DESIGNATOR, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         elif token[TOK_VALUE] == '.':
             nodes.append(tokIter.getToken())
             token = tokIter.getToken()
             assert token[TOK_TYPE] == TOK_IDENTIFIER, "expected IDENTIFIER but got %s @ %s" % (str(token), info['path'])
-            logger.debug('%s%s' % (indent,str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             nodes.append(token)
             tree.append((NODE_DESIGNATOR, nodes))
-            logger.debug('%s%s' % (indent, True))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, True)
             return True
         else:
-            logger.debug('%s%s' % (indent, False))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, False)
             return False
 
+
+#
+# the dispatch tables call the functions of the rules rather than look them up by name
+#
+for table in (BLOCK_ITEM_RULES, STATEMENT_RULES, DECLARATION_SPECIFIER_RULES, TYPE_SPECIFIER_RULES):
+    for key, rules in table.items():
+        table[key] = tuple([getattr(Parser, rule).im_func for rule in rules])
+del table, key, rules
@@ -62,6 +62,7 @@ NODE_TYPE_QUALIFIER                    = NODE + i; i += 1
 NODE_DESIGNATION                       = NODE + i; i += 1
 NODE_DESIGNATOR_LIST                   = NODE + i; i += 1
 NODE_DESIGNATOR                        = NODE + i; i += 1
+NODE_FUNCTION_BODY                     = NODE + i; i += 1
 
 node_type_to_str = {
     NODE_EXTERNAL_DECLARATION              : 'EXTERNAL_DECLARATION',
@@ -123,6 +124,7 @@ node_type_to_str = {
     NODE_DESIGNATION                       : 'DESIGNATION',
     NODE_DESIGNATOR_LIST                   : 'DESIGNATOR_LIST',
     NODE_DESIGNATOR                        : 'DESIGNATOR',
+    NODE_FUNCTION_BODY                     : 'FUNCTION_BODY',
 }
 
 BUILTIN   = 0
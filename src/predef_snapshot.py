@@ -0,0 +1,90 @@
+import os
+import cPickle
+import sha
+import subprocess
+import tempfile
+from distutils.spawn import find_executable
+
+
+DEFAULT_PREDEF_SNAPSHOT_DIR = os.path.expanduser('~/.pycodeanalyzer/predef')
+
+# bump when getPredefMacros(), define_directive() or the snapshot layout changes
+PREDEF_SNAPSHOT_VERSION = 1
+
+
+class PredefSnapshot:
+    '''
+    Snapshot of what the preprocessor learns from the compiler on startup.
+
+    It holds the output of getPredefMacros() and getDefaultIncDirs(), which
+    run cpp in a subprocess, and the macro tables preprocess_predef() builds
+    by scanning every predefined macro. Each part is added by the first run
+    which needs it, so a snapshot may hold only some of them. A snapshot is stored per compiler,
+    keyed by the path, size and mtime of the cpp executable, so installing
+    another compiler version makes a new snapshot instead of reusing a stale
+    one. No subprocess is run to load a snapshot.
+    '''
+
+    def __init__(self, snapshotDir=DEFAULT_PREDEF_SNAPSHOT_DIR, cpp='cpp'):
+        self.snapshotDir = snapshotDir
+        self.cppPath = find_executable(cpp)
+        if self.cppPath:
+            self.cppPath = os.path.realpath(self.cppPath)
+
+    def getKey(self):
+        '''
+        returns the key of the compiler or None if there is no compiler
+        '''
+        if not self.cppPath:
+            return None
+        st = os.stat(self.cppPath)
+        return sha.new('%d\0%s\0%d\0%r' % (PREDEF_SNAPSHOT_VERSION, self.cppPath, st.st_size, st.st_mtime)).hexdigest()
+
+    def getCompilerVersion(self):
+        p = subprocess.Popen([self.cppPath, '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out = p.communicate()[0]
+        return out.split('\n')[0].strip()
+
+    def load(self):
+        '''
+        returns the snapshot of the compiler or None
+        '''
+        key = self.getKey()
+        if key is None:
+            return None
+
+        try:
+            with open(os.path.join(self.snapshotDir, '%s.predef' % key), 'rb') as f:
+                return cPickle.loads(f.read())
+        except (IOError, EOFError, ValueError, TypeError, cPickle.UnpicklingError):
+            return None
+
+    def save(self, snapshot):
+        key = self.getKey()
+        if key is None:
+            return
+
+        if not os.path.exists(self.snapshotDir):
+            os.makedirs(self.snapshotDir)
+
+        snapshot = dict(snapshot, compiler=self.cppPath)
+        if not snapshot.get('compilerVersion'):
+            snapshot['compilerVersion'] = self.getCompilerVersion()
+
+        #
+        # write to a temporary file first so that other processes never load a partial snapshot
+        #
+        fd, tmpPath = tempfile.mkstemp(dir=self.snapshotDir, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(cPickle.dumps(snapshot, cPickle.HIGHEST_PROTOCOL))
+        os.rename(tmpPath, os.path.join(self.snapshotDir, '%s.predef' % key))
+
+    def clear(self):
+        if not os.path.isdir(self.snapshotDir):
+            return
+        for name in os.listdir(self.snapshotDir):
+            if name.endswith('.predef'):
+                try:
+                    os.remove(os.path.join(self.snapshotDir, name))
+                except OSError:
+                    pass
@@ -7,6 +7,11 @@ import subprocess
 from scanner import Scanner
 from scanner_types import *
 from token_iter import TokenIterator
+from token_array import TokenArray
+from token_cache import TokenCache, DEFAULT_TOKEN_CACHE_SIZE
+from predef_snapshot import PredefSnapshot, DEFAULT_PREDEF_SNAPSHOT_DIR
+from json_trace import add_json_trace
+from token_writer import TokenWriter
 
 
 logger = logging.getLogger('cpp')
@@ -20,13 +25,19 @@ logger.addHandler(ch)
 
 INDENT='  '
 
+# trace calls are guarded by this rather than left to the logger, so that
+# nothing is formatted or called unless DEBUG is enabled
+DEBUG = logger.isEnabledFor(logging.DEBUG)
+
 
 class Preprocessor:
     global logger
 
     tokenTbl = defaultdict(deque)
+    guardTbl = {}
     predefMacroDefs = defaultdict(deque)
     predefMacroKeys = defaultdict(deque) 
+    predefInfo = None
     sysIncDirs = None
     appIncDirs = None
     predefMacros = None
@@ -91,11 +102,83 @@ class Preprocessor:
     @classmethod
     def clearTokenCache(cls):
         cls.tokenTbl.clear()
+        cls.guardTbl.clear()
 
     @classmethod
-    def getIncDirs(cls):
+    def loadPredefSnapshot(cls, predefSnapshot):
+        '''
+        take the compiler probes and the predefined macro tables from the snapshot
+
+        a snapshot only holds what some run asked for, so each part is taken
+        if it is there and not known yet. returns False if there is no snapshot
+        of the compiler
+        '''
+        snapshot = predefSnapshot.load()
+        if snapshot is None:
+            return False
+
+        if cls.predefMacros is None:
+            cls.predefMacros = snapshot.get('predefMacros')
         if cls.sysIncDirs is None and cls.appIncDirs is None:
-            cls.sysIncDirs, cls.appIncDirs = cls.getDefaultIncDirs()
+            cls.sysIncDirs, cls.appIncDirs = snapshot.get('sysIncDirs'), snapshot.get('appIncDirs')
+        if cls.predefInfo is None and snapshot.get('predefInfo') is not None:
+            cls.predefMacroKeys.clear()
+            cls.predefMacroKeys.update(snapshot['predefMacroKeys'])
+            cls.predefMacroDefs.clear()
+            cls.predefMacroDefs.update(snapshot['predefMacroDefs'])
+            cls.predefInfo = snapshot['predefInfo']
+        return True
+
+    @classmethod
+    def savePredefSnapshot(cls, predefSnapshot):
+        '''
+        add what is known of the compiler to its snapshot
+
+        nothing is probed here, so the include dirs are only stored once
+        getIncDirs() was asked for them
+        '''
+        snapshot = predefSnapshot.load() or {}
+        if cls.predefMacros is not None:
+            snapshot['predefMacros'] = cls.predefMacros
+        if cls.sysIncDirs is not None or cls.appIncDirs is not None:
+            snapshot['sysIncDirs'] = cls.sysIncDirs
+            snapshot['appIncDirs'] = cls.appIncDirs
+        if cls.predefInfo is not None:
+            snapshot['predefMacroKeys'] = dict(cls.predefMacroKeys)
+            snapshot['predefMacroDefs'] = dict(cls.predefMacroDefs)
+            snapshot['predefInfo'] = cls.predefInfo
+        predefSnapshot.save(snapshot)
+
+    @classmethod
+    def getSnapshotPredefMacros(cls, predefSnapshotDir=DEFAULT_PREDEF_SNAPSHOT_DIR):
+        '''
+        returns the predefined macros of the compiler from the snapshot in predefSnapshotDir,
+        or from cpp -dM, which adds them to the snapshot. an empty predefSnapshotDir disables the snapshot
+        '''
+        if cls.predefMacros is None:
+            predefSnapshot = PredefSnapshot(predefSnapshotDir) if predefSnapshotDir else None
+            if predefSnapshot:
+                cls.loadPredefSnapshot(predefSnapshot)
+            if cls.predefMacros is None:
+                cls.predefMacros = cls.getPredefMacros()
+                if predefSnapshot:
+                    cls.savePredefSnapshot(predefSnapshot)
+        return dict(cls.predefMacros)
+
+    @classmethod
+    def getIncDirs(cls, predefSnapshotDir=DEFAULT_PREDEF_SNAPSHOT_DIR):
+        '''
+        returns the include dirs of the compiler from the snapshot in predefSnapshotDir,
+        or from cpp -v, which adds them to the snapshot. an empty predefSnapshotDir disables the snapshot
+        '''
+        if cls.sysIncDirs is None and cls.appIncDirs is None:
+            predefSnapshot = PredefSnapshot(predefSnapshotDir) if predefSnapshotDir else None
+            if predefSnapshot:
+                cls.loadPredefSnapshot(predefSnapshot)
+            if cls.sysIncDirs is None and cls.appIncDirs is None:
+                cls.sysIncDirs, cls.appIncDirs = cls.getDefaultIncDirs()
+                if predefSnapshot:
+                    cls.savePredefSnapshot(predefSnapshot)
         return cls.sysIncDirs, cls.appIncDirs
 
     @classmethod
@@ -123,18 +206,29 @@ class Preprocessor:
     def setAppIncDirs(cls, incDirs):
         cls.appIncDirs = incDirs
 
-    def __init__(self, sysIncDirs=None, appIncDirs=None, predefMacros=None, save=False, removeComment=False, outputDir='', expandObjMacro=False, expandFuncMacro=False, externalLogger=None, logLevel=None, logPath=None):
+    def __init__(self, sysIncDirs=None, appIncDirs=None, predefMacros=None, save=False, removeComment=False, outputDir='', expandObjMacro=False, expandFuncMacro=False, externalLogger=None, logLevel=None, logPath=None, useRegexScanner=False, tokenCacheDir='', tokenCacheSize=DEFAULT_TOKEN_CACHE_SIZE, tracePath=None, predefSnapshotDir=DEFAULT_PREDEF_SNAPSHOT_DIR, saveCompressed=False):
         self.globalMacroDefs = defaultdict(tuple)
         self.globalMacroKeys = defaultdict(deque)
         self.eval_stack = deque()
+        self.onceFiles = set()
+        self.searchTbl = {}
+        self.dirTbl = {}
+        self.searchHits = 0
+        self.searchMisses = 0
 
         self.saveFile = save
+        self.saveCompressed = saveCompressed
         self.removeComment = removeComment
         self.outputDir = outputDir
         self.expandObjMacro = expandObjMacro
         self.expandFuncMacro = expandFuncMacro
         self.expandMacro = self.expandObjMacro or self.expandFuncMacro
+        self.useRegexScanner = useRegexScanner
+        self.tokenCache = None if not tokenCacheDir else TokenCache(tokenCacheDir, tokenCacheSize)
+        self.predefSnapshot = None if not predefSnapshotDir else PredefSnapshot(predefSnapshotDir)
 
+        if self.__class__.predefMacros is None and self.predefSnapshot:
+            self.__class__.loadPredefSnapshot(self.predefSnapshot)
         if self.__class__.predefMacros is None:
             self.__class__.predefMacros = self.__class__.getPredefMacros()
         self.predefMacros = predefMacros if predefMacros is not None else self.__class__.predefMacros
@@ -152,6 +246,12 @@ class Preprocessor:
         if logLevel:
             logger.setLevel(eval('logging.%s' % logLevel))
 
+        if tracePath:
+            add_json_trace(logger, tracePath, INDENT)
+
+        global DEBUG
+        DEBUG = logger.isEnabledFor(logging.DEBUG)
+
         if logPath:
             if os.path.exists(logPath):
                 os.remove(logPath)
@@ -168,24 +268,37 @@ class Preprocessor:
             logger.addHandler(fh)
 
     def preprocess_predef(self):
-        predefInfo = {
-            'path'      : 'predefined',
-            'defines'   : deque(),
-            'macroCalls': deque(),
-        }
-
-        scanner = Scanner()
-        for name, val in self.__class__.predefMacros.items():
-            scanner.setString('%s %s' % (name, val))
-            self.define_directive(scanner, predefInfo)
-
-        self.__class__.predefMacroKeys.update(self.globalMacroKeys)
-        self.__class__.predefMacroDefs.update(self.globalMacroDefs)
+        '''
+        the predefined macros are scanned once per compiler, later runs load them from the snapshot
+        '''
+        predefInfo = self.__class__.predefInfo
+
+        if predefInfo is None:
+            predefInfo = {
+                'path'      : 'predefined',
+                'defines'   : deque(),
+                'macroCalls': deque(),
+            }
+
+            scanner = Scanner(useRegex=self.useRegexScanner)
+            for name, val in self.__class__.predefMacros.items():
+                scanner.setString('%s %s' % (name, val))
+                self.define_directive(scanner, predefInfo)
+
+            self.__class__.predefMacroKeys.update(self.globalMacroKeys)
+            self.__class__.predefMacroDefs.update(self.globalMacroDefs)
+            self.__class__.predefInfo = predefInfo
+
+            if self.predefSnapshot:
+                self.__class__.savePredefSnapshot(self.predefSnapshot)
+        else:
+            self.globalMacroKeys.update(self.__class__.predefMacroKeys)
+            self.globalMacroDefs.update(self.__class__.predefMacroDefs)
 
         ppInfo = {
             'path'      : 'predefined',
-            'defines'   : predefInfo['defines'],
-            'macroCalls': predefInfo['macroCalls'],
+            'defines'   : deque(predefInfo['defines']),
+            'macroCalls': deque(predefInfo['macroCalls']),
             'tokens'    : deque(),
             'undefs'    : deque(),
             'includes'  : deque(),
@@ -194,9 +307,10 @@ class Preprocessor:
         return ppInfo
 
     def preprocess(self, path):
-        logger.info('preprocess %s' % path)
+        logger.info('preprocess %s', path)
 
         self.eval_stack.clear()
+        self.onceFiles.clear()
         self.globalMacroKeys.clear()
         self.globalMacroDefs.clear()
 
@@ -204,25 +318,32 @@ class Preprocessor:
         self.globalMacroDefs.update(self.__class__.predefMacroDefs)
         return self._preprocess(path, None)
 
-    def _preprocess(self, curPath, parents, indent=''):
-        logger.info('%s_preprocess %s' % (indent, curPath))
+    def _preprocess(self, curPath, parents, depth=0):
+        logger.info('%s_preprocess %s', INDENT * depth, curPath)
 
         #oldcwd = os.getcwd()
         cwd = os.path.split(curPath)[0]
         #os.chdir(cwd)
-        #logger.debug('%schdir %s' % (indent, cwd))
+        #logger.debug('%schdir %s', INDENT * depth, cwd)
 
         if not self.__class__.tokenTbl.has_key(curPath):
-            self.__class__.tokenTbl[curPath] = Scanner(curPath).tokenize()
+            self.__class__.tokenTbl[curPath] = TokenArray(self.tokenize(curPath))
+            self.__class__.guardTbl[curPath] = self.find_include_guard(self.__class__.tokenTbl[curPath])
+
+        if self.__class__.guardTbl[curPath][0]:
+            self.onceFiles.add(curPath)
 
         tokIter = TokenIterator(self.__class__.tokenTbl[curPath])
 
+        if not parents:
+            parents = deque()
+
         outTokens = deque()
-        saveTokens = None if not self.saveFile else deque()
+        saveTokens = None if not self.saveFile else self.save_tokens(self.outputDir, curPath, parents)
 
         ppInfo = {'path': curPath,
                   'cwd': cwd,
-                  'parents': parents if parents else deque(),
+                  'parents': parents,
                   'tokens': outTokens,
                   'saveTokens': saveTokens,
                   'defines': deque(),
@@ -241,10 +362,10 @@ class Preprocessor:
         while token:
             if token[TOK_TYPE] & TOK_OPERATOR and token[TOK_VALUE] == '#':
                 if saveTokens is not None: appendSave(token)
-                self.directives(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                self.directives(tokIter, ppInfo, depth+1)
             elif token[TOK_TYPE] == TOK_IDENTIFIER:
                 if saveTokens is not None and not self.expandMacro: appendSave(token)
-                ident = self.identifier(token, tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                ident = self.identifier(token, tokIter, ppInfo, depth+1)
                 if ident == token:
                     appendOut(ident)
                     if saveTokens is not None and self.expandMacro: appendSave(ident)
@@ -282,17 +403,122 @@ class Preprocessor:
             token = getToken()
 
         if saveTokens is not None:
-            self.save_tokens(self.outputDir, ppInfo, '%s%s'%(indent,INDENT))
+            saveTokens.close()
 
         #os.chdir(oldcwd)
-        #logger.debug('%schdir %s' % (indent, oldcwd))
+        #logger.debug('%schdir %s', INDENT * depth, oldcwd)
 
         del ppInfo['cwd']
         del ppInfo['saveTokens']
+        ppInfo['tokens'] = TokenArray(outTokens)
 
         return ppInfo
 
-    def directives(self, tokIter, ppInfo, indent=''):
+    def tokenize(self, path):
+        '''
+        tokenize the file, using the token cache shared by the workers if enabled
+        '''
+        if not self.tokenCache:
+            return Scanner(path, useRegex=self.useRegexScanner).tokenize()
+
+        key = self.tokenCache.getKey(path)
+        tokens = self.tokenCache.get(key)
+        if tokens is not None:
+            return tokens
+
+        #
+        # another process is tokenizing the file, use its entry
+        #
+        if not self.tokenCache.acquire(key):
+            tokens = self.tokenCache.wait(key)
+            if tokens is not None:
+                return tokens
+            return Scanner(path, useRegex=self.useRegexScanner).tokenize()
+
+        try:
+            tokens = Scanner(path, useRegex=self.useRegexScanner).tokenize()
+            self.tokenCache.put(key, tokens)
+        finally:
+            self.tokenCache.release(key)
+        return tokens
+
+    def find_include_guard(self, tokens):
+        '''
+        returns (pragmaOnce, guardTok) of the file
+
+        guardTok is the IDENTIFIER token of a classic include guard
+
+            #ifndef X
+            #define X
+            ...
+            #endif
+
+        where the #endif closes the #ifndef and nothing follows it, otherwise None.
+        '''
+        toks = [t for t in tokens if t[TOK_TYPE] != TOK_COMMENT and t[TOK_TYPE] != TOK_EOF]
+
+        guardTok = None
+        if len(toks) > 5 and \
+           toks[1][TOK_TYPE] == TOK_PP_IFNDEF and toks[2][TOK_TYPE] == TOK_IDENTIFIER and \
+           toks[4][TOK_TYPE] == TOK_PP_DEFINE and toks[5][TOK_VALUE] == toks[2][TOK_VALUE] and \
+           toks[0][TOK_VALUE] == '#' and toks[3][TOK_VALUE] == '#':
+            guardTok = toks[2]
+
+        pragmaOnce = False
+        depth = 0
+        lastRow = toks[-1][TOK_ROW] if toks else 0
+        prevRow = 0
+        for i, token in enumerate(toks):
+            row = token[TOK_ROW]
+            if token[TOK_VALUE] != '#' or row == prevRow or i + 1 == len(toks):
+                prevRow = row
+                continue
+            prevRow = row
+
+            tokType = toks[i + 1][TOK_TYPE]
+            if TOK_PP_IF <= tokType <= TOK_PP_IFNDEF:
+                depth += 1
+            elif tokType == TOK_PP_ENDIF:
+                depth -= 1
+                if depth == 0 and row != lastRow:
+                    guardTok = None
+            elif TOK_PP_ELIF <= tokType <= TOK_PP_ELSE:
+                if depth == 1:
+                    guardTok = None
+            elif tokType == TOK_PP_PRAGMA:
+                if i + 2 < len(toks) and toks[i + 2][TOK_VALUE] == 'once' and depth <= (1 if guardTok else 0):
+                    pragmaOnce = True
+
+        return pragmaOnce, guardTok
+
+    def skip_include(self, abspath, parents, depth=0):
+        '''
+        returns ppInfo of a header which is known to expand to nothing, otherwise None
+        '''
+        if self.saveFile or not self.__class__.guardTbl.has_key(abspath):
+            return None
+
+        pragmaOnce, guardTok = self.__class__.guardTbl[abspath]
+        if guardTok and self.globalMacroKeys.has_key(guardTok[TOK_VALUE]):
+            if DEBUG: logger.debug('%sskip %s guarded by %s', INDENT * depth, abspath, guardTok[TOK_VALUE])
+            macroCalls = deque([(guardTok[TOK_VALUE], guardTok[TOK_ROW:])])
+        elif pragmaOnce and abspath in self.onceFiles:
+            if DEBUG: logger.debug('%sskip %s #pragma once', INDENT * depth, abspath)
+            macroCalls = deque()
+        else:
+            return None
+
+        return {'path': abspath,
+                'parents': parents,
+                'tokens': deque(),
+                'defines': deque(),
+                'macroCalls': macroCalls,
+                'undefs': deque(),
+                'includes': deque(),
+                'pragmas': deque(),
+                }
+
+    def directives(self, tokIter, ppInfo, depth=0):
         '''
         directive
             : define_directive
@@ -316,53 +542,53 @@ class Preprocessor:
         token = tokIter.getToken()
         if token[TOK_TYPE] == TOK_PP_DEFINE:
             if saveTokens is not None: saveTokens.append(token)
-            self.define_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.define_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_INCLUDE:
             if saveTokens is not None: saveTokens.append(token)
-            self.include_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.include_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_ENDIF:
             if saveTokens is not None: saveTokens.pop()
-            self.endif_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.endif_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_IF:
             if saveTokens is not None: saveTokens.pop()
-            self.if_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.if_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_ELIF:
             if saveTokens is not None: saveTokens.pop()
-            self.elif_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.elif_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_IFDEF:
             if saveTokens is not None: saveTokens.pop()
-            self.ifdef_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.ifdef_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_IFNDEF:
             if saveTokens is not None: saveTokens.pop()
-            self.ifndef_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.ifndef_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_ELSE:
             if saveTokens is not None: saveTokens.pop()
-            self.else_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.else_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_UNDEF:
             if saveTokens is not None: saveTokens.append(token)
-            self.undef_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.undef_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_INCLUDE_NEXT:
             if saveTokens is not None: saveTokens.append(token)
-            self.include_next_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.include_next_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_ERROR:
             if saveTokens is not None: saveTokens.pop()
-            self.error_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.error_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_WARNING:
             if saveTokens is not None: saveTokens.pop()
-            self.warning_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.warning_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_IDENT:
             if saveTokens is not None: saveTokens.append(token)
-            self.ident_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.ident_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_LINE:
             if saveTokens is not None: saveTokens.append(token)
-            self.line_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.line_directive(tokIter, ppInfo, depth+1)
         elif token[TOK_TYPE] == TOK_PP_PRAGMA:
             if saveTokens is not None: saveTokens.append(token)
-            self.pragma_directive(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            self.pragma_directive(tokIter, ppInfo, depth+1)
         else:
             raise Exception('unknown directive %s %s' % (str(token), ppInfo['path']))
 
-    def include_directive(self, tokIter, ppInfo, indent=''):
+    def include_directive(self, tokIter, ppInfo, depth=0):
         '''
         include_directive
             : '#' include (STRING | '<' path_specifier '>')
@@ -376,28 +602,30 @@ class Preprocessor:
         if token[TOK_TYPE] == TOK_STRING:
             path = token[TOK_VALUE]
         elif token[TOK_VALUE] == '<':
-            path = '<%s>' % self.path_specifier(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            path = '<%s>' % self.path_specifier(tokIter, ppInfo, depth+1)
             token = tokIter.getToken()
             if saveTokens is not None: saveTokens.append(token)
             assert token[TOK_VALUE] == '>', "expected '>' but got %s @ %s" % (str(token), ppInfo['path'])
         else:
             raise Exception('*** invalid token after include directive %s ***' % str(token))
 
-        logger.debug('%s#include %s %s' % (indent, path, pos))
-        abspath = self.search_file(path, ppInfo, '', '%s%s'%(indent,INDENT))
-        logger.debug('%s%s' % (indent, abspath))
+        if DEBUG: logger.debug('%s#include %s %s', INDENT * depth, path, pos)
+        abspath = self.search_file(path, ppInfo, '', depth+1)
+        if DEBUG: logger.debug('%s%s', INDENT * depth, abspath)
         if abspath:
             parents = ppInfo['parents']
             parents.append(ppInfo['path'])
-            info = self._preprocess(abspath, parents, '%s%s'%(indent,INDENT))
+            info = self.skip_include(abspath, parents, depth+1)
+            if info is None:
+                info = self._preprocess(abspath, parents, depth+1)
             parents.pop()
-            logger.debug('%sdone with %s ... continue on %s' % (indent, abspath, ppInfo['path']))
+            if DEBUG: logger.debug('%sdone with %s ... continue on %s', INDENT * depth, abspath, ppInfo['path'])
         else:
             info = None
-            logger.error('*** %s not found @ %s %s***' % (path, pos, ppInfo['path']))
+            logger.error('*** %s not found @ %s %s***', path, pos, ppInfo['path'])
         ppInfo['includes'].append((path, abspath, pos, info))
 
-    def include_next_directive(self, tokIter, ppInfo, indent=''):
+    def include_next_directive(self, tokIter, ppInfo, depth=0):
         '''
         include_directive
             : '#' include (STRING | '<' path_specifier '>')
@@ -411,27 +639,29 @@ class Preprocessor:
         if token[TOK_TYPE] == TOK_STRING:
             path = token[TOK_VALUE]
         elif token[TOK_VALUE] == '<':
-            path = '<%s>' % self.path_specifier(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            path = '<%s>' % self.path_specifier(tokIter, ppInfo, depth+1)
             token = tokIter.getToken()
             if saveTokens is not None: saveTokens.append(token)
         else:
             raise Exception('*** invalid token after include directive %s ***' % str(token))
 
-        logger.debug('%s#include_next %s %s' % (indent, path, pos))
+        if DEBUG: logger.debug('%s#include_next %s %s', INDENT * depth, path, pos)
         abspath = self.search_file(path, ppInfo, ppInfo['cwd'])
-        logger.debug('%s%s' % (indent, abspath))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, abspath)
         if abspath:
             parents = ppInfo['parents']
             parents.append(ppInfo['path'])
-            info = self._preprocess(abspath, parents, '%s%s'%(indent,INDENT))
+            info = self.skip_include(abspath, parents, depth+1)
+            if info is None:
+                info = self._preprocess(abspath, parents, depth+1)
             parents.pop()
-            logger.debug('%sdone with %s ... continue on %s' % (indent, abspath, ppInfo['path']))
+            if DEBUG: logger.debug('%sdone with %s ... continue on %s', INDENT * depth, abspath, ppInfo['path'])
         else:
             info = None
-            logger.error('*** %s not found @ %s %s ***' % (path, pos, ppInfo['path']))
+            logger.error('*** %s not found @ %s %s ***', path, pos, ppInfo['path'])
         ppInfo['includes'].append((path, abspath, pos, info))
 
-    def define_directive(self, tokIter, ppInfo, indent=''):
+    def define_directive(self, tokIter, ppInfo, depth=0):
         '''
         define_directive
             : '#' define IDENTIFIER['(' [parameter_list] ')'] [macro_value]
@@ -442,7 +672,7 @@ class Preprocessor:
         identTok = getToken()
         if saveTokens is not None: appendSave(identTok)
 
-        logger.debug('%s%s' % (indent, str(identTok)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, identTok)
         assert identTok[TOK_TYPE] == TOK_IDENTIFIER, 'invalid IDENTIFIER %s for #define' % str(identTok)
 
         token = tokIter.lookaheadToken(1)
@@ -451,7 +681,7 @@ class Preprocessor:
             if saveTokens is not None: appendSave(token)
             assert token[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(token), ppInfo['path'])
 
-            params = self.parameter_list(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            params = self.parameter_list(tokIter, ppInfo, depth+1)
 
             token = getToken()
             if saveTokens is not None: appendSave(token)
@@ -479,24 +709,24 @@ class Preprocessor:
 
         name = identTok[TOK_VALUE]
         pos  = identTok[TOK_ROW:]
-        logger.debug('%smacro: %s(%s) %s %s' % (indent, name,
-                                               None if params is None else ', '.join([p[TOK_VALUE] for p in params if p]),
-                                               ''.join([v[TOK_VALUE] for v in value if v]),
-                                               pos))
+        if DEBUG: logger.debug('%smacro: %s(%s) %s %s', INDENT * depth, name,
+                               None if params is None else ', '.join([p[TOK_VALUE] for p in params if p]),
+                               ''.join([v[TOK_VALUE] for v in value if v]),
+                               pos)
 
         key = (name, ppInfo['path'], pos)
         self.globalMacroKeys[name].append(key)
         self.globalMacroDefs[key] = (params, value)
 
-        expandedValue = self.expand_object_macro(identTok, self.globalMacroDefs[key], ppInfo, '%s%s'%(indent,INDENT))
+        expandedValue = self.expand_object_macro(identTok, self.globalMacroDefs[key], ppInfo, depth+1)
         ppInfo['defines'].append((name,
                                   None if params is None else deque([p[TOK_VALUE] for p in params if p]), 
                                   ' '.join([v[TOK_VALUE] for v in value if v]),
                                   ' '.join([v[TOK_VALUE] for v in expandedValue if v]),
                                   pos))
-        logger.debug('%s%s' % (indent, str(ppInfo['defines'][-1])))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, ppInfo['defines'][-1])
 
-    def undef_directive(self, tokIter, ppInfo, indent=''):
+    def undef_directive(self, tokIter, ppInfo, depth=0):
         '''
         undef_directive
             : '#' undef IDENTIFIER
@@ -505,7 +735,7 @@ class Preprocessor:
 
         token = tokIter.getToken()
         if saveTokens is not None: saveTokens.append(token)
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         assert token[TOK_TYPE] == TOK_IDENTIFIER, 'invalid IDENTIFIER %s for #define' % str(token)
 
         macroName = token[TOK_VALUE]
@@ -515,7 +745,7 @@ class Preprocessor:
             ppInfo['macroCalls'].append((macroName, token[TOK_ROW:]))
             del self.globalMacroKeys[macroName]
 
-    def line_directive(self, tokIter, ppInfo, indent=''):
+    def line_directive(self, tokIter, ppInfo, depth=0):
         '''
         line_directive
             : '#' line NUMBER STRING
@@ -527,9 +757,9 @@ class Preprocessor:
         tokenStr = tokIter.getToken()
         if saveTokens is not None: saveTokens.append(tokenStr)
         assert tokenStr[TOK_TYPE] == TOK_STRING, 'expected STRING but got %s' % str(tokenStr)
-        logger.debug('%s#line %s %s %s' % (indent, tokenLn[TOK_VALUE],tokenStr[TOK_VALUE], tokenLn[TOK_ROW:]))
+        if DEBUG: logger.debug('%s#line %s %s %s', INDENT * depth, tokenLn[TOK_VALUE], tokenStr[TOK_VALUE], tokenLn[TOK_ROW:])
 
-    def if_directive(self, tokIter, ppInfo, indent=''):
+    def if_directive(self, tokIter, ppInfo, depth=0):
         '''
         if_directive
             : '#' if conditional_expression
@@ -539,60 +769,60 @@ class Preprocessor:
             tokens.extend(tokIter.getLineTokens())
 
         if len(tokens) == 1:
-            ret = self.unary_expression(TokenIterator(tokens), ppInfo, '%s%s'%(indent,INDENT))
+            ret = self.unary_expression(TokenIterator(tokens), ppInfo, depth+1)
         else:
-            ret = self.conditional_expression(TokenIterator(tokens), ppInfo, '%s%s'%(indent,INDENT))
+            ret = self.conditional_expression(TokenIterator(tokens), ppInfo, depth+1)
 
         self.eval_stack.append(ret)
-        logger.debug('%s%s' % (indent, str(self.eval_stack)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
 
-        if not ret: self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+        if not ret: self.discard_statements(tokIter, depth+1)
 
-    def elif_directive(self, tokIter, ppInfo, indent=''):
+    def elif_directive(self, tokIter, ppInfo, depth=0):
         '''
         elif_directive
             : '#' elif conditional_expression
         '''
         if self.eval_stack[-1]:
-            self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+            self.discard_statements(tokIter, depth+1)
         else:
             tokens = tokIter.getLineTokens()
             while tokens[-1][TOK_VALUE] == '\\':
                 tokens.extend(tokIter.getLineTokens())
 
             if len(tokens) == 1:
-                ret = self.unary_expression(TokenIterator(tokens), ppInfo, '%s%s'%(indent,INDENT))
+                ret = self.unary_expression(TokenIterator(tokens), ppInfo, depth+1)
             else:
-                ret = self.conditional_expression(TokenIterator(tokens), ppInfo, '%s%s'%(indent,INDENT))
+                ret = self.conditional_expression(TokenIterator(tokens), ppInfo, depth+1)
 
             self.eval_stack[-1] = ret
-            logger.debug('%s%s' % (indent, str(self.eval_stack)))
-            if not ret: self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
+            if not ret: self.discard_statements(tokIter, depth+1)
 
-    def ifdef_directive(self, tokIter, ppInfo, indent=''):
+    def ifdef_directive(self, tokIter, ppInfo, depth=0):
         '''
         ifdef_directive
             : '#' ifdef IDENTIFIER
         '''
 
         token = tokIter.getToken()
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         assert token[TOK_TYPE] == TOK_IDENTIFIER, "expected IDENTIFIER but got %s @ %s" % (str(token), ppInfo['path'])
 
         ppInfo['macroCalls'].append((token[TOK_VALUE], token[TOK_ROW:]))
 
         ret = self.globalMacroKeys.has_key(token[TOK_VALUE])
         self.eval_stack.append(ret)
-        logger.debug('%s%s' % (indent, str(self.eval_stack)))
-        if not ret: self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
+        if not ret: self.discard_statements(tokIter, depth+1)
 
-    def ifndef_directive(self, tokIter, ppInfo, indent=''):
+    def ifndef_directive(self, tokIter, ppInfo, depth=0):
         '''
         ifndef_directive
             : '#' ifndef IDENTIFIER
         '''
         token = tokIter.getToken()
-        logger.debug('%s%s' % (indent, str(token)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, token)
         assert token[TOK_TYPE] == TOK_IDENTIFIER, "expected IDENTIFIER but got %s @ %s" % (str(token), ppInfo['path'])
 
         ppInfo['macroCalls'].append((token[TOK_VALUE], token[TOK_ROW:]))
@@ -600,26 +830,26 @@ class Preprocessor:
         ret = not self.globalMacroKeys.has_key(token[TOK_VALUE])
 
         self.eval_stack.append(ret)
-        logger.debug('%s%s' % (indent, str(self.eval_stack)))
-        if not ret: self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
+        if not ret: self.discard_statements(tokIter, depth+1)
 
-    def else_directive(self, tokIter, ppInfo, indent=''):
+    def else_directive(self, tokIter, ppInfo, depth=0):
         '''
         else_directive
             : '#' else
         '''
         if self.eval_stack[-1]:
-            self.discard_statements(tokIter, '%s%s'%(indent,INDENT))
+            self.discard_statements(tokIter, depth+1)
 
-    def endif_directive(self, tokIter, ppInfo, indent=''):
+    def endif_directive(self, tokIter, ppInfo, depth=0):
         '''
         endif_directive
             : '#' endif
         '''
         self.eval_stack.pop()
-        logger.debug('%s%s' % (indent, str(self.eval_stack)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
 
-    def pragma_directive(self, tokIter, ppInfo, indent=''):
+    def pragma_directive(self, tokIter, ppInfo, depth=0):
         '''
         pragma_directive
             : '#' pragma tokens
@@ -630,9 +860,9 @@ class Preprocessor:
         if self.saveFile: ppInfo['saveTokens'].extend(tokens)
         pragma = ' '.join([t[TOK_VALUE] for t in tokens if t])
         ppInfo['pragmas'].append((pragma, tokens[0][TOK_ROW:]))
-        logger.debug('%s#pragma %s %s' % (indent, pragma, tokens[0][TOK_ROW:]))
+        if DEBUG: logger.debug('%s#pragma %s %s', INDENT * depth, pragma, tokens[0][TOK_ROW:])
 
-    def error_directive(self, tokIter, ppInfo, indent=''):
+    def error_directive(self, tokIter, ppInfo, depth=0):
         '''
         error_directive
             : '#' error tokens
@@ -651,7 +881,7 @@ class Preprocessor:
                         ppInfo['path']
                         ))
 
-    def warning_directive(self, tokIter, ppInfo, indent=''):
+    def warning_directive(self, tokIter, ppInfo, depth=0):
         '''
         warning_directive
             : '#' warning tokens
@@ -666,7 +896,7 @@ class Preprocessor:
                         ))
         raw_input()
 
-    def ident_directive(self, tokIter, ppInfo, indent=''):
+    def ident_directive(self, tokIter, ppInfo, depth=0):
         '''
         ident_directive
             : '#' ident STRING
@@ -674,16 +904,55 @@ class Preprocessor:
         token = tokIter.getToken()
         if self.saveFile: ppInfo['saveTokens'].append(token)
         assert token[TOK_TYPE] == TOK_STRING, 'expected STRING but got %s' % str(token)
-        logger.debug('%s#ident %s' % (indent, token[TOK_VALUE:]))
+        if DEBUG: logger.debug('%s#ident %s', INDENT * depth, token[TOK_VALUE:])
 
-    def search_file(self, path, ppInfo, offsetDir='', indent=''):
+    def search_file(self, path, ppInfo, offsetDir='', depth=0):
         '''
         search absolute path of included file
+
+        results, including files not found, are memoized by
+        (path, directory of the including file, offsetDir)
         '''
+        key = (path, '' if path.startswith('<') else ppInfo['cwd'], offsetDir)
+        if self.searchTbl.has_key(key):
+            self.searchHits += 1
+            return self.searchTbl[key]
+
+        self.searchMisses += 1
+        abspath = self._search_file(path, ppInfo, offsetDir, depth)
+        self.searchTbl[key] = abspath
+        return abspath
+
+    def invalidate_search_cache(self, path=None):
+        '''
+        forget memoized include path resolution
+
+        if path is given only the directory listing of the directory containing
+        path is dropped, e.g. when a file was added or removed in watch mode
+        '''
+        self.searchTbl.clear()
+        if path is None:
+            self.dirTbl.clear()
+        else:
+            self.dirTbl.pop(os.path.dirname(path), None)
+
+    def is_file(self, path):
+        '''
+        os.path.isfile() which consults the directory listing first
+        '''
+        dirName, fileName = os.path.split(path)
+        if not self.dirTbl.has_key(dirName):
+            try:
+                self.dirTbl[dirName] = frozenset(os.listdir(dirName or os.curdir))
+            except OSError:
+                self.dirTbl[dirName] = frozenset()
+        return fileName in self.dirTbl[dirName] and os.path.isfile(path)
+
+    def _search_file(self, path, ppInfo, offsetDir='', depth=0):
         abspath = ''
-        logger.debug('%scurrent working directory: %s' % (indent, ppInfo['cwd']))
+        if DEBUG: logger.debug('%scurrent working directory: %s', INDENT * depth, ppInfo['cwd'])
         if offsetDir:
-            logger.debug('%soffset directory: %s' % (indent, offsetDir))
+            if DEBUG: logger.debug('%soffset directory: %s', INDENT * depth, offsetDir)
 
         if path.startswith('<'):
             #
@@ -695,9 +964,9 @@ class Preprocessor:
                 idx = 0
 
             for inc in self.sysIncDirs[idx:]:
-                logger.debug('%ssearching in %s' % (indent, inc))
+                if DEBUG: logger.debug('%ssearching in %s', INDENT * depth, inc)
                 abspath = os.path.join(inc, path[1:-1])
-                if os.path.isfile(abspath):
+                if self.is_file(abspath):
                     break
                 else:
                     abspath = ''
@@ -706,12 +975,13 @@ class Preprocessor:
             # search current file directory
             #
             cwd = ppInfo['cwd']
-            logger.debug('%ssearching in %s' % (indent, cwd))
+            if DEBUG: logger.debug('%ssearching in %s', INDENT * depth, cwd)
             if not offsetDir or cwd != offsetDir:
                 abspath = os.path.join(cwd, path[1:-1])
-            logger.debug('%s%s%s' % (indent, abspath, os.path.isfile(abspath)))
+            found = bool(abspath) and self.is_file(abspath)
+            if DEBUG: logger.debug('%s%s%s', INDENT * depth, abspath, found)
 
-            if not abspath or not os.path.isfile(abspath):
+            if not found:
                 #
                 # search include directory
                 #
@@ -721,16 +991,16 @@ class Preprocessor:
                     idx = 0
 
                 for inc in self.appIncDirs[idx:]:
-                    logger.debug('%ssearching in %s' % (indent, inc))
+                    if DEBUG: logger.debug('%ssearching in %s', INDENT * depth, inc)
                     abspath = os.path.join(inc, path[1:-1])
-                    if os.path.isfile(abspath):
+                    if self.is_file(abspath):
                         break
                     else:
                         abspath = ''
 
         return abspath
 
-    def path_specifier(self, tokIter, ppInfo, indent=''):
+    def path_specifier(self, tokIter, ppInfo, depth=0):
         '''
         path_specifier
             : [^>]+
@@ -745,7 +1015,7 @@ class Preprocessor:
             token = tokIter.lookaheadToken(1)
         return path
 
-    def parameter_list(self, tokIter, ppInfo, indent=''):
+    def parameter_list(self, tokIter, ppInfo, depth=0):
         '''
         parameter_list :
             IDENTIFIER (, IDENTIFIER)* (, ELLIPSIS)?
@@ -763,7 +1033,7 @@ class Preprocessor:
                 token = tokIter.lookaheadToken(1)
             elif token[TOK_VALUE] != ',':
                 if saveTokens is not None: saveTokens.append(token)
-                logger.debug('%s%s', indent, str(token))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
                 params.append(token)
                 token = tokIter.lookaheadToken(1)
                 if token[TOK_VALUE] == ',':
@@ -776,11 +1046,11 @@ class Preprocessor:
                 token = tokIter.lookaheadToken(1)
         return params
 
-    def conditional_expression(self, tokIter, ppInfo, indent=''):
+    def conditional_expression(self, tokIter, ppInfo, depth=0):
         '''
         : logical_expression ['?' conditional_expression ':' conditional_expression]
         '''
-        ret = self.logical_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+        ret = self.logical_expression(tokIter, ppInfo, depth+1)
         token = tokIter.lookaheadToken(1)
 
         while token and token[TOK_VALUE] == '\\':
@@ -790,21 +1060,21 @@ class Preprocessor:
         if token and token[TOK_VALUE] == '?':
             token = tokIter.getToken() # discard '?'
             assert token[TOK_VALUE] == '?', "expected '?' but got %s @ %s" % (str(token), ppInfo['path'])
-            logger.debug('%s?' % indent)
-            true_val = self.conditional_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            if DEBUG: logger.debug('%s?', INDENT * depth)
+            true_val = self.conditional_expression(tokIter, ppInfo, depth+1)
             token = tokIter.getToken() # discard ':'
             assert token[TOK_VALUE] == ':', "expected ':' but got %s @ %s" % (str(token), ppInfo['path'])
-            logger.debug('%s:' % indent)
-            false_val = self.conditional_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            if DEBUG: logger.debug('%s:', INDENT * depth)
+            false_val = self.conditional_expression(tokIter, ppInfo, depth+1)
             ret = true_val if ret else false_val
-        logger.debug('%s%s', indent, bool(ret))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, bool(ret))
         return ret
 
-    def logical_expression(self, tokIter, ppInfo, indent=''):
+    def logical_expression(self, tokIter, ppInfo, depth=0):
         '''
         unary_expression {binary_op unary_expression}
         '''
-        val1 = self.unary_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+        val1 = self.unary_expression(tokIter, ppInfo, depth+1)
         token = tokIter.lookaheadToken(1)
 
         while token and token[TOK_VALUE] == '\\':
@@ -817,8 +1087,8 @@ class Preprocessor:
                 op = 'and'
             elif op == '||':
                 op = 'or'
-            val2 = self.unary_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
-            logger.debug('%s%d %s %d' % (indent, val1, op, val2))
+            val2 = self.unary_expression(tokIter, ppInfo, depth+1)
+            if DEBUG: logger.debug('%s%d %s %d', INDENT * depth, val1, op, val2)
             val1 = eval('%d %s %d' % (val1, op, val2))
             token = tokIter.lookaheadToken(1)
 
@@ -828,7 +1098,7 @@ class Preprocessor:
 
         return val1
 
-    def unary_expression(self, tokIter, ppInfo, indent=''):
+    def unary_expression(self, tokIter, ppInfo, depth=0):
         '''
         unary_expression
             : TOK_NUMBER
@@ -845,50 +1115,50 @@ class Preprocessor:
 
         ret = 0
         if token[TOK_TYPE] & TOK_OPERATOR and token[TOK_VALUE] in '+-~!':
-            logger.debug('%s%s' % (indent, token[TOK_VALUE]))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token[TOK_VALUE])
             if token[TOK_VALUE] == '!':
-                ret = not self.unary_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                ret = not self.unary_expression(tokIter, ppInfo, depth+1)
             else:
-                ret = eval('%s %d' % (token[TOK_VALUE], self.unary_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))))
+                ret = eval('%s %d' % (token[TOK_VALUE], self.unary_expression(tokIter, ppInfo, depth+1)))
         elif token[TOK_TYPE] == TOK_NUMBER:
-            logger.debug('%s%s' % (indent, token[TOK_VALUE]))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token[TOK_VALUE])
             ret = long(token[TOK_VALUE].strip('ulUL'), 0)
         elif token[TOK_TYPE] == TOK_CHARACTER:
-            logger.debug('%s%s' % (indent, token[TOK_VALUE]))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token[TOK_VALUE])
             ret = ord(token[TOK_VALUE][-2])
         elif token[TOK_TYPE] == TOK_PP_DEFINED:
-            ret = self.defined_operator(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            ret = self.defined_operator(tokIter, ppInfo, depth+1)
         elif token[TOK_VALUE] == '(':
-            logger.debug('%s%s' % (indent, token[TOK_VALUE]))
-            ret = self.conditional_expression(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token[TOK_VALUE])
+            ret = self.conditional_expression(tokIter, ppInfo, depth+1)
             token = tokIter.getToken()
             assert token[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(token), ppInfo['path'])
         elif token[TOK_TYPE] == TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             macroName = token[TOK_VALUE]
             macroDef = self.getMacroDef(macroName)
             if macroDef:
                 nextTok = tokIter.lookaheadToken(1)
                 if macroDef[0] is None:
-                    ret = self.evaluate_object_macro(token, macroDef, ppInfo, '%s%s'%(indent,INDENT))
+                    ret = self.evaluate_object_macro(token, macroDef, ppInfo, depth+1)
                 elif macroDef[0] is not None and nextTok[TOK_VALUE] == '(':
                     nextTok = tokIter.getToken() # discard '('
                     assert nextTok[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(nextTok), ppInfo['path'])
-                    logger.debug('%s(' % indent)
+                    if DEBUG: logger.debug('%s(', INDENT * depth)
                     temp = self.saveFile
                     self.saveFile = False
-                    args = self.argument_list(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                    args = self.argument_list(tokIter, ppInfo, depth+1)
                     self.saveFile = temp
                     nextTok = tokIter.getToken() # discard ')'
                     assert nextTok[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(nextTok), ppInfo['path'])
-                    logger.debug('%s)' % indent)
-                    ret = self.evaluate_function_macro(token, macroDef, args, ppInfo, '%s%s'%(indent,INDENT))
+                    if DEBUG: logger.debug('%s)', INDENT * depth)
+                    ret = self.evaluate_function_macro(token, macroDef, args, ppInfo, depth+1)
         else:
             assert False, 'failed to handle token %s @ %s' % (str(token), ppInfo['path'])
 
         return ret
 
-    def argument_list(self, tokIter, ppInfo, indent=''):
+    def argument_list(self, tokIter, ppInfo, depth=0):
         '''
         argument_list
             : tokens {',' tokens}
@@ -932,7 +1202,7 @@ class Preprocessor:
                 elif token[TOK_TYPE] == TOK_IDENTIFIER:
                     token = tokIter.getToken()
                     if saveTokens is not None and not self.expandMacro: saveTokens.append(token)
-                    ident = self.identifier(token, tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                    ident = self.identifier(token, tokIter, ppInfo, depth+1)
                     if ident == token:
                         arg.append(ident)
                         if saveTokens is not None and self.expandMacro: saveTokens.append(ident)
@@ -949,17 +1219,17 @@ class Preprocessor:
                     arg.append(token)
                     if saveTokens is not None: saveTokens.append(token)
                 token = tokIter.lookaheadToken(1)
-            logger.debug('%s%s' % (indent, ' '.join([a[TOK_VALUE] for a in arg])))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, ' '.join([a[TOK_VALUE] for a in arg]))
             args.append(arg)
         return args
 
-    def identifier(self, identTok, tokIter, ppInfo, indent=''):
+    def identifier(self, identTok, tokIter, ppInfo, depth=0):
         '''
         identifier
             : IDENTIFIER ['(' argument_list ')']
         '''
         saveTokens = None if not self.saveFile or self.expandFuncMacro else ppInfo.get('saveTokens', None)
-        logger.debug('%s%s' % (indent, str(identTok)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, identTok)
 
         macroName = identTok[TOK_VALUE]
         macroDef = self.getMacroDef(macroName)
@@ -969,38 +1239,38 @@ class Preprocessor:
             nextTok = tokIter.lookaheadToken(1)
             if macroDef[0] is None:
                 ppInfo['macroCalls'].append((macroName, identTok[TOK_ROW:]))
-                return self.expand_object_macro(identTok, macroDef, ppInfo, '%s%s'%(indent,INDENT))
+                return self.expand_object_macro(identTok, macroDef, ppInfo, depth+1)
             elif macroDef[0] is not None and nextTok and nextTok[TOK_VALUE] == '(':
                 ppInfo['macroCalls'].append((macroName, identTok[TOK_ROW:]))
                 tok = tokIter.getToken() # discard '('
                 if saveTokens is not None: saveTokens.append(tok)
                 assert tok[TOK_VALUE] == '(', "expected '(' but got %s @ %s" % (str(tok), ppInfo['path'])
-                argList = self.argument_list(tokIter, ppInfo, '%s%s'%(indent,INDENT))
+                argList = self.argument_list(tokIter, ppInfo, depth+1)
                 tok = tokIter.getToken() # discard ')'
                 if saveTokens is not None: saveTokens.append(tok)
                 assert tok[TOK_VALUE] == ')', "expected ')' but got %s @ %s" % (str(tok), ppInfo['path'])
-                return self.expand_function_macro(identTok, macroDef, argList, ppInfo, '%s%s'%(indent,INDENT))
+                return self.expand_function_macro(identTok, macroDef, argList, ppInfo, depth+1)
             else:
                 return identTok
 
-    def getMacroDef(self, macroName, indent=''):
+    def getMacroDef(self, macroName, depth=0):
         keys = self.globalMacroKeys.get(macroName)
         if keys:
             return self.globalMacroDefs[keys[-1]]
         else:
             return None
 
-    def evaluate_object_macro(self, macroNameTok, macroDef, ppInfo, indent=''):
-        logger.debug('%s%s' % (indent, str(macroNameTok[TOK_VALUE:])))
+    def evaluate_object_macro(self, macroNameTok, macroDef, ppInfo, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, macroNameTok[TOK_VALUE:])
         if len(macroDef[1]) == 1:
-            return self.unary_expression(TokenIterator(macroDef[1]), ppInfo, '%s%s'%(indent,INDENT))
+            return self.unary_expression(TokenIterator(macroDef[1]), ppInfo, depth+1)
         else:
-            return self.conditional_expression(TokenIterator(macroDef[1]), ppInfo, '%s%s'%(indent,INDENT))
+            return self.conditional_expression(TokenIterator(macroDef[1]), ppInfo, depth+1)
 
-    def evaluate_function_macro(self, macroNameTok, macroDef, args, ppInfo, indent=''):
-        logger.debug('%s%s' % (indent, str(macroNameTok)))
-        logger.debug('%sparam: %s' % (indent, ', '.join([t[TOK_VALUE] for t in macroDef[0] if t])))
-        logger.debug('%sargs : %s' % (indent, ', '.join([''.join([a[TOK_VALUE] for a in arg if a]) for arg in args])))
+    def evaluate_function_macro(self, macroNameTok, macroDef, args, ppInfo, depth=0):
+        if DEBUG: logger.debug('%s%s', INDENT * depth, macroNameTok)
+        if DEBUG: logger.debug('%sparam: %s', INDENT * depth, ', '.join([t[TOK_VALUE] for t in macroDef[0] if t]))
+        if DEBUG: logger.debug('%sargs : %s', INDENT * depth, ', '.join([''.join([a[TOK_VALUE] for a in arg if a]) for arg in args]))
         #
         # add parameter as macro and set its value to argument
         # in order to replace param name with the argument
@@ -1012,9 +1282,9 @@ class Preprocessor:
                 self.globalMacroDefs[key] = (None, arg)
 
         if len(macroDef[1]) == 1:
-            ret = self.unary_expression(TokenIterator(macroDef[1]), ppInfo, '%s%s'%(indent,INDENT))
+            ret = self.unary_expression(TokenIterator(macroDef[1]), ppInfo, depth+1)
         else:
-            ret = self.conditional_expression(TokenIterator(macroDef[1]), ppInfo, '%s%s'%(indent,INDENT))
+            ret = self.conditional_expression(TokenIterator(macroDef[1]), ppInfo, depth+1)
 
         #
         # delete added parameters
@@ -1025,14 +1295,14 @@ class Preprocessor:
 
         return ret
 
-    def expand_object_macro(self, macroNameTok, macroDef, ppInfo, indent=''):
+    def expand_object_macro(self, macroNameTok, macroDef, ppInfo, depth=0):
         '''
         process '##' and '#' operators.
         removes '\\'.
         expands all macros in the definition
         '''
-        logger.debug('%s%s' % (indent, str(macroNameTok)))
-        logger.debug('%sbef: %s' % (indent, ' '.join([t[TOK_VALUE] for t in macroDef[1] if t])))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, macroNameTok)
+        if DEBUG: logger.debug('%sbef: %s', INDENT * depth, ' '.join([t[TOK_VALUE] for t in macroDef[1] if t]))
 
         tokens = TokenIterator(macroDef[1])
         expandedTokens = deque()
@@ -1043,7 +1313,7 @@ class Preprocessor:
                 # Concatenation
                 ltok = expandedTokens.pop()
                 rtok = tokens.getToken()
-                logger.debug('%slTok:%s %s rTok:%s' % (indent, ltok[TOK_VALUE], token[TOK_VALUE], rtok[TOK_VALUE]))
+                if DEBUG: logger.debug('%slTok:%s %s rTok:%s', INDENT * depth, ltok[TOK_VALUE], token[TOK_VALUE], rtok[TOK_VALUE])
                 if rtok[TOK_VALUE] == '__VA_ARGS__':
                     #
                     # don't concatenate
@@ -1068,7 +1338,7 @@ class Preprocessor:
                 temp = self.saveFile
                 self.saveFile = False
                 if token[TOK_VALUE] != macroNameTok[TOK_VALUE]:
-                    ident = self.identifier(token, tokens, ppInfo, '%s%s'%(indent,INDENT))
+                    ident = self.identifier(token, tokens, ppInfo, depth+1)
                 else:
                     print token
                     raw_input()
@@ -1080,19 +1350,19 @@ class Preprocessor:
                     expandedTokens.extend(ident)
             token = tokens.getToken()
 
-        logger.debug('%saft: %s' % (indent, ' '.join([t[TOK_VALUE] for t in expandedTokens if t])))
+        if DEBUG: logger.debug('%saft: %s', INDENT * depth, ' '.join([t[TOK_VALUE] for t in expandedTokens if t]))
         return expandedTokens
 
-    def expand_function_macro(self, macroNameTok, macroDef, args, ppInfo, indent=''):
+    def expand_function_macro(self, macroNameTok, macroDef, args, ppInfo, depth=0):
         '''
         process '##' and '#' operators.
         removes '\\'.
         expands all macros in the definition and replace parameters with its arguments
         '''
-        logger.debug('%s%s' % (indent, str(macroNameTok)))
-        logger.debug('%sparam: %s' % (indent, ', '.join([t[TOK_VALUE] for t in macroDef[0] if t])))
-        logger.debug('%sargs : %s' % (indent, ', '.join([''.join([a[TOK_VALUE] for a in arg if a]) for arg in args])))
-        logger.debug('%sbef  : %s' % (indent, ' '.join([t[TOK_VALUE] for t in macroDef[1] if t])))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, macroNameTok)
+        if DEBUG: logger.debug('%sparam: %s', INDENT * depth, ', '.join([t[TOK_VALUE] for t in macroDef[0] if t]))
+        if DEBUG: logger.debug('%sargs : %s', INDENT * depth, ', '.join([''.join([a[TOK_VALUE] for a in arg if a]) for arg in args]))
+        if DEBUG: logger.debug('%sbef  : %s', INDENT * depth, ' '.join([t[TOK_VALUE] for t in macroDef[1] if t]))
 
         tbl = defaultdict(tuple)
         for i, (param, arg) in enumerate(zip(macroDef[0], args)):
@@ -1116,7 +1386,7 @@ class Preprocessor:
                 tbl['__VA_ARGS__'] = dq
                 break # '...' must be the last parameter
 
-        logger.debug('%sparam vs args: %s' % (indent, str(tbl)))
+        if DEBUG: logger.debug('%sparam vs args: %s', INDENT * depth, tbl)
 
         tokens = TokenIterator(macroDef[1])
         expandedTokens = deque()
@@ -1127,7 +1397,7 @@ class Preprocessor:
                 # Concatenation
                 ltok = expandedTokens.pop()
                 rtok = tokens.getToken()
-                logger.debug('%slTok:%s %s rTok:%s' % (indent, str(ltok), str(token), str(rtok)))
+                if DEBUG: logger.debug('%slTok:%s %s rTok:%s', INDENT * depth, ltok, token, rtok)
                 if rtok[TOK_VALUE] == '__VA_ARGS__':
                     if tbl and tbl.has_key('__VA_ARGS__'):
                         #
@@ -1155,11 +1425,11 @@ class Preprocessor:
                             print arg
                             raw_input('need to fix')
                     token = (TOK_IDENTIFIER, '%s%s'%(ltok[TOK_VALUE],rtok_val), ltok[TOK_ROW], ltok[TOK_COL])
-                    logger.debug('%s%s' % (indent, str(token)))
+                    if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             elif token[TOK_VALUE] == '#':
                 # Stringification
                 rtok = tokens.getToken()
-                logger.debug('%s%s%s' % (indent, str(token), str(rtok)))
+                if DEBUG: logger.debug('%s%s%s', INDENT * depth, token, rtok)
                 if not tbl:
                     rtok_val = rtok[TOK_VALUE]
                 else:
@@ -1172,7 +1442,7 @@ class Preprocessor:
                         print arg
                         raw_input('need to fix')
                 token = (TOK_STRING, '"%s"' % rtok_val, rtok[TOK_ROW], rtok[TOK_COL])
-                logger.debug('%s%s' % (indent, str(token)))
+                if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             elif token[TOK_VALUE] == '\\':
                 token = tokens.getToken()
                 continue
@@ -1182,13 +1452,13 @@ class Preprocessor:
             else:
                 temp = self.saveFile
                 self.saveFile = False
-                ident = self.identifier(token, tokens, ppInfo, '%s%s'%(indent,INDENT))
+                ident = self.identifier(token, tokens, ppInfo, depth+1)
                 self.saveFile = temp
                 if ident == token:
                     if tbl:
                         arg = tbl.get(token[TOK_VALUE], None)
                         if arg:
-                            logger.debug('%s%s' % (indent, 'replace %s with %s' % (str(token), str(arg))))
+                            if DEBUG: logger.debug('%s%s', INDENT * depth, 'replace %s with %s' % (str(token), str(arg)))
                             expandedTokens.extend(arg)
                         else:
                             expandedTokens.append(token)
@@ -1202,7 +1472,7 @@ class Preprocessor:
                                 continue
                             arg = tbl.get(tok[TOK_VALUE], None)
                             if arg:
-                                logger.debug('%s%s' % (indent, 'replace %s with %s' % (str(tok), str(arg))))
+                                if DEBUG: logger.debug('%s%s', INDENT * depth, 'replace %s with %s' % (str(tok), str(arg)))
                                 expandedTokens.extend(arg)
                             else:
                                 expandedTokens.append(tok)
@@ -1210,10 +1480,10 @@ class Preprocessor:
                         expandedTokens.extend(ident)
             token = tokens.getToken()
 
-        logger.debug('%saft: %s' % (indent, ' '.join([t[TOK_VALUE] for t in expandedTokens if t])))
+        if DEBUG: logger.debug('%saft: %s', INDENT * depth, ' '.join([t[TOK_VALUE] for t in expandedTokens if t]))
         return expandedTokens
 
-    def defined_operator(self, tokIter, ppInfo, indent=''):
+    def defined_operator(self, tokIter, ppInfo, depth=0):
         '''
         defined_expression :
             defined ['('] IDENTIFIER [')']
@@ -1221,12 +1491,12 @@ class Preprocessor:
         token = tokIter.getToken()
 
         if token[TOK_TYPE] == TOK_IDENTIFIER:
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             name = token[TOK_VALUE]
             ppInfo['macroCalls'].append((name, token[TOK_ROW:]))
         elif token[TOK_VALUE] == '(':
             token = tokIter.getToken()
-            logger.debug('%s%s' % (indent, str(token)))
+            if DEBUG: logger.debug('%s%s', INDENT * depth, token)
             name = token[TOK_VALUE]
             ppInfo['macroCalls'].append((name, token[TOK_ROW:]))
             token = tokIter.getToken()
@@ -1235,10 +1505,10 @@ class Preprocessor:
             raise Exception('invalid token after defined operator %s' % token)
 
         ret = self.globalMacroKeys.has_key(name)
-        logger.debug('%s%s' % (indent, bool(ret)))
+        if DEBUG: logger.debug('%s%s', INDENT * depth, bool(ret))
         return ret
 
-    def discard_statements(self, tokIter, indent=''):
+    def discard_statements(self, tokIter, depth=0):
         '''
         discards statements in False clause
         '''
@@ -1254,7 +1524,7 @@ class Preprocessor:
                     tokIter.skipLine()
                     if numIf == 0:
                         self.eval_stack.pop()
-                        logger.debug('%s%s' % (indent, str(self.eval_stack)))
+                        if DEBUG: logger.debug('%s%s', INDENT * depth, self.eval_stack)
                 elif TOK_PP_IF <= token[TOK_TYPE] <= TOK_PP_IFNDEF:
                     numIf += 1
                     tokIter.skipLine()
@@ -1268,10 +1538,10 @@ class Preprocessor:
             else:
                 tokIter.skipLine()
 
-    def save_tokens(self, outDir, ppInfo, indent=''):
-        parents = ppInfo['parents']
-        path = ppInfo['path']
-
+    def save_tokens(self, outDir, path, parents):
+        '''
+        returns the TokenWriter which saves the tokens of the file while it is preprocessed
+        '''
         if parents:
             for p in parents:
                 outDir = '%s%s%s' % (outDir, os.path.sep, p[p.rfind(os.path.sep)+1:p.rfind('.')])
@@ -1282,45 +1552,5 @@ class Preprocessor:
         #path = '%s%s%s' % (outDir, path.replace(os.path.sep, '_'))
         path = '%s%s%s' % (outDir, os.path.sep, path.replace(os.path.sep, '_').strip('_'))
 
-        tokens = ppInfo['saveTokens']
-        data = ''
-        row = 1
-        col = 1
-
-        token = None
-        while tokens:
-            prev_tok = token
-            token = tokens.popleft()
-            padding = ''
-
-            if token[TOK_ROW] > row:
-                delta = token[TOK_ROW] - row
-                padding = '\n' * delta
-                row += delta
-                col = 1
-
-            if token[TOK_ROW] == row and token[TOK_COL] > col:
-                delta = token[TOK_COL] - col
-                padding = '%s%s' % (padding, ' ' * delta)
-                col += delta
-
-            if not padding and not (token[TOK_TYPE] & TOK_OPERATOR) and prev_tok and not (prev_tok[TOK_TYPE] & TOK_OPERATOR):
-                padding = ' '
-
-            data = '%s%s%s' % (data, padding, token[TOK_VALUE])
-
-            if token[TOK_TYPE] == TOK_COMMENT and token[TOK_VALUE].startswith('/*'):
-                newlines = token[TOK_VALUE].count('\n')
-                if newlines > 0:
-                    row += newlines - 1
-                    idx = token[TOK_VALUE].rfind('\n')
-                    col = len(token[TOK_VALUE][idx+1:])
-                else:
-                    col += len(token[TOK_VALUE])
-            else:
-                col += len(token[TOK_VALUE])
-
-        f = open(path, 'w')
-        f.write(data)
-        f.close()
+        return TokenWriter(path, self.saveCompressed)
 
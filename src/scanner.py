@@ -1,13 +1,23 @@
 from collections import deque
+import re
 
 from scanner_types import *
 
 
+TOKEN_REGEX = re.compile('[%s]*(?:%s)' % (IGNORE_CHARS, '|'.join(['(%s)' % p for t, p in TOKEN_PATTERNS])))
+TOKEN_REGEX_TYPES = (None,) + tuple([t for t, p in TOKEN_PATTERNS])
+
+
 class StringBuffer:
 
     def __init__(self, iStr):
         self.buffer = iStr
 
+    def read(self):
+        data = self.buffer
+        self.buffer = ''
+        return data
+
     def readline(self):
         idx = self.buffer.find('\n')
         line = ''
@@ -24,8 +34,14 @@ class StringBuffer:
 
 
 class Scanner:
+    '''
+    useRegex=True reads the whole source at once and matches tokens with
+    TOKEN_REGEX at position offsets instead of the character state machine.
+    '''
+
+    def __init__(self, iFileName='', iStr='', useRegex=False):
+        self.useRegex = useRegex
 
-    def __init__(self, iFileName='', iStr=''):
         if iFileName:
             self.fptr = open(iFileName, 'r')
         elif iStr:
@@ -43,6 +59,9 @@ class Scanner:
         self.tokenQ = deque()
         self.hashSign = False
 
+        if self.useRegex:
+            self._loadText()
+
     def setFile(self, iFileName):
         self.fptr = open(iFileName, 'r')
         self.buf = ''
@@ -54,6 +73,9 @@ class Scanner:
         self.curToken = ''
         self.tokenQ = deque()
 
+        if self.useRegex:
+            self._loadText()
+
     def setString(self, iStr):
         self.fptr = StringBuffer(iStr)
         self.buf = ''
@@ -65,6 +87,9 @@ class Scanner:
         self.curToken = ''
         self.tokenQ = deque()
 
+        if self.useRegex:
+            self._loadText()
+
     def lookaheadToken(self, num):
         if num <= 0:
             raise IndexError('lookahead should be > 0')
@@ -77,6 +102,12 @@ class Scanner:
     def skipLine(self):
         if self.tokenQ:
             self.tokenQ.clear()
+
+        if self.useRegex:
+            idx = self.text.find('\n', self.pos)
+            self.pos = self.textLen if idx < 0 else idx
+            return
+
         self.buf = ''
         self.bufLen = 0
         self.curIdx = -1
@@ -98,6 +129,9 @@ class Scanner:
             return self._getToken()
 
     def tokenize(self):
+        if self.useRegex:
+            return self._tokenizeRegex()
+
         tokens = deque()
         token = self._getToken()
         while token[TOK_TYPE] != TOK_EOF:
@@ -105,6 +139,121 @@ class Scanner:
             token = self._getToken()
         return tokens
 
+    def _loadText(self):
+        '''
+        read the whole source for the regex scanner
+        '''
+        if self.fptr:
+            self.text = self.fptr.read()
+            self.fptr.close()
+            self.fptr = None
+        else:
+            self.text = ''
+        self.textLen = len(self.text)
+        self.pos = 0
+        self.lineStart = 0
+        self.row = 1
+
+    def _tokenizeRegex(self):
+        tokens = deque()
+        append = tokens.append
+        match = TOKEN_REGEX.match
+        types = TOKEN_REGEX_TYPES
+        text = self.text
+        pos = self.pos
+        row = self.row
+        lineStart = self.lineStart
+        hashSign = self.hashSign
+
+        m = match(text, pos)
+        while m:
+            idx = m.lastindex
+            start = m.start(idx)
+            end = m.end()
+
+            nl = text.count('\n', pos, start)
+            if nl:
+                row += nl
+                lineStart = text.rfind('\n', pos, start) + 1
+
+            tokType = types[idx]
+            tokVal = m.group(idx)
+            tokRow = row
+            tokCol = start - lineStart + 1
+
+            if tokType == TOK_IDENTIFIER:
+                if hashSign:
+                    tokType = ppReservedWords.get(tokVal, tokType)
+                else:
+                    tokType = reservedWords.get(tokVal, tokType)
+                hashSign = False
+            else:
+                hashSign = tokVal == '#'
+                if tokType == TOK_COMMENT:
+                    if tokVal[1] == '*':
+                        tokVal = tokVal[1:]
+                    else:
+                        tokVal = tokVal.rstrip(IGNORE_CHARS)
+
+                if '\n' in tokVal:
+                    row += tokVal.count('\n')
+                    lineStart = text.rfind('\n', start, end) + 1
+
+            append((tokType, tokVal, tokRow, tokCol))
+            pos = end
+            m = match(text, pos)
+
+        self.pos = self.textLen
+        self.row = row + text.count('\n', pos)
+        self.lineStart = lineStart
+        self.hashSign = False
+        return tokens
+
+    def _getRegexToken(self):
+        m = TOKEN_REGEX.match(self.text, self.pos)
+        if not m:
+            self.row += self.text.count('\n', self.pos)
+            self.pos = self.textLen
+            self.hashSign = False
+            return TOK_EOF, '', 0, 0
+
+        text = self.text
+        idx = m.lastindex
+        start = m.start(idx)
+        end = m.end()
+
+        nl = text.count('\n', self.pos, start)
+        if nl:
+            self.row += nl
+            self.lineStart = text.rfind('\n', self.pos, start) + 1
+
+        tokType = TOKEN_REGEX_TYPES[idx]
+        tokVal = m.group(idx)
+        tokPos = self.row, start - self.lineStart + 1
+        hashSign = False
+
+        if tokType == TOK_IDENTIFIER:
+            if self.hashSign:
+                tokType = ppReservedWords.get(tokVal, tokType)
+            else:
+                tokType = reservedWords.get(tokVal, tokType)
+        else:
+            hashSign = tokVal == '#'
+            if tokType == TOK_COMMENT:
+                if tokVal[1] == '*':
+                    tokVal = tokVal[1:]
+                else:
+                    tokVal = tokVal.rstrip(IGNORE_CHARS)
+
+            if '\n' in tokVal:
+                self.row += tokVal.count('\n')
+                self.lineStart = text.rfind('\n', start, end) + 1
+
+        self.pos = end
+        self.hashSign = hashSign
+
+        return tokType, tokVal, tokPos[0], tokPos[1]
+
     def _getNext(self):
         self.col += 1
         self.curIdx += 1
@@ -154,6 +303,9 @@ class Scanner:
         return line
 
     def _getToken(self):
+        if self.useRegex:
+            return self._getRegexToken()
+
         state = STATE_START
         tokVal = ''
         tokType = TOK_EOF
@@ -350,35 +502,55 @@ class Scanner:
                     state = STATE_DONE
 
             elif state == STATE_BLOCK_COMMENT:
-                if c == '*':
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                elif c == '*':
                     state = STATE_BLOCK_COMMENT_STAR
 
             elif state == STATE_BLOCK_COMMENT_STAR:
-                if c == '/':
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                elif c == '/':
                     tokVal = self._accept(startIdx, self.curIdx+1)
                     state = STATE_DONE
                 elif c != '*':
                     state = STATE_BLOCK_COMMENT
 
             elif state == STATE_STR:
-                if c == '"':
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                elif c == '"':
                     tokVal = self._accept(startIdx, self.curIdx+1)
                     state = STATE_DONE
                 elif c == '\\':
                     state = STATE_STR_ESCAPED
 
             elif state == STATE_STR_ESCAPED:
-                state = STATE_STR
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                else:
+                    state = STATE_STR
 
             elif state == STATE_CHAR:
-                if c == "'":
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                elif c == "'":
                     tokVal = self._accept(startIdx, self.curIdx+1)
                     state = STATE_DONE
                 elif c == '\\':
                     state = STATE_CHAR_ESCAPED
 
             elif state == STATE_CHAR_ESCAPED:
-                state = STATE_CHAR
+                if not c:
+                    tokVal = self._accept(startIdx, self.curIdx)
+                    state = STATE_DONE
+                else:
+                    state = STATE_CHAR
 
             else:
                 raw_input('*** scan error ***')
@@ -180,3 +180,23 @@ TOK_TYPE  = i; i += 1
 TOK_VALUE = i; i += 1
 TOK_ROW   = i; i += 1
 TOK_COL   = i; i += 1
+
+#
+# token patterns of the regex scanner (Scanner(useRegex=True))
+# do not change order: the first matching pattern wins
+#
+TOKEN_PATTERNS = (
+    (TOK_COMMENT    , r'/\*(?:[^*]*\*+(?:[^/*][^*]*\*+)*/|[\s\S]*)'),
+    (TOK_COMMENT    , r'//[^\n]*'),
+    (TOK_STRING     , r'[a-zA-Z_]?"[^"\\]*(?:\\[\s\S]?[^"\\]*)*"?'),
+    (TOK_CHARACTER  , r"'[^'\\]*(?:\\[\s\S]?[^'\\]*)*'?"),
+    (TOK_IDENTIFIER , r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    (TOK_NUMBER     , r'[0-9][.0-9a-fA-FpPxXuUlL]*'),
+    (TOK_OPERATOR   , r'[=!]='),
+    (TOK_ASSIGN_OP  , r'>>=|<<=|[*%^/+\-&|]='),
+    (TOK_OPERATOR   , r'>>|<<|[<>]=|\+\+|--|->|&&|\|\|'),
+    (TOK_ELLIPSIS   , r'\.\.[\s\S]?'),
+    (TOK_CONCAT_OP  , r'##'),
+    (TOK_ASSIGN_OP  , r'='),
+    (TOK_OPERATOR   , r'[^ \t\v\r\n\f]'),
+)
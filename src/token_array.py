@@ -0,0 +1,72 @@
+from collections import deque
+from array import array
+from itertools import izip, imap
+from operator import itemgetter
+
+from scanner_types import TOK_TYPE, TOK_VALUE, TOK_ROW, TOK_COL
+
+
+class TokenArray:
+    '''
+    Compact sequence of (type, value, row, col) tokens.
+
+    type, row and col are packed into parallel array('i') columns and every
+    value is stored once in a string table, so a token costs 16 bytes instead
+    of a tuple with its own references. Indexing and iteration return the
+    usual token tuples, which is all TokenIterator and the parser need.
+    '''
+
+    def __init__(self, tokens=()):
+        self.types = array('i')
+        self.valueIds = array('i')
+        self.rows = array('i')
+        self.cols = array('i')
+        self.values = []
+        self.valueIdx = None
+
+        self.extend(tokens)
+        # the index is only needed while tokens are added
+        self.valueIdx = None
+
+    def append(self, token):
+        self.extend((token,))
+
+    def extend(self, tokens):
+        if not isinstance(tokens, (list, tuple, deque)):
+            tokens = list(tokens)
+        if not tokens:
+            return
+
+        if self.valueIdx is None:
+            self.valueIdx = dict([(v, i) for i, v in enumerate(self.values)])
+
+        #
+        # columns are split with map() and filled with fromlist() rather than per token
+        #
+        tokValues = map(itemgetter(TOK_VALUE), tokens)
+
+        valueIdx = self.valueIdx
+        for tokValue in set(tokValues).difference(valueIdx):
+            valueIdx[tokValue] = len(self.values)
+            self.values.append(tokValue)
+
+        self.types.fromlist(map(itemgetter(TOK_TYPE), tokens))
+        self.valueIds.fromlist(map(valueIdx.__getitem__, tokValues))
+        self.rows.fromlist(map(itemgetter(TOK_ROW), tokens))
+        self.cols.fromlist(map(itemgetter(TOK_COL), tokens))
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        return (self.types[i], self.values[self.valueIds[i]], self.rows[i], self.cols[i])
+
+    def __iter__(self):
+        return izip(self.types, imap(self.values.__getitem__, self.valueIds), self.rows, self.cols)
+
+    def __getstate__(self):
+        return (self.types, self.valueIds, self.rows, self.cols, self.values)
+
+    def __setstate__(self, state):
+        self.types, self.valueIds, self.rows, self.cols, self.values = state
+        self.valueIdx = None
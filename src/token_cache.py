@@ -0,0 +1,152 @@
+from collections import deque
+import os
+import marshal
+import sha
+import tempfile
+import time
+
+
+DEFAULT_TOKEN_CACHE_DIR = os.path.expanduser('~/.pycodeanalyzer/token_cache')
+DEFAULT_TOKEN_CACHE_SIZE = 512 * 1024 * 1024 # bytes
+
+# bump when the token format or the scanner output changes
+TOKEN_CACHE_VERSION = 1
+
+# seconds to wait for another process to store an entry it claimed
+TOKEN_CACHE_LOCK_TIMEOUT = 30
+
+
+class TokenCache:
+    '''
+    Persistent cache of Scanner.tokenize() output.
+
+    Each entry is a file named after the SHA1 of (path, size, mtime, SHA1 of
+    the file content) and holds the tokens serialized with marshal.
+    Entries are touched on every hit and the least recently used ones are
+    removed once the directory grows beyond maxSize bytes.
+
+    The cache can be shared by several processes. A process claims a missing
+    entry with acquire() before tokenizing the file, and the others wait()
+    for the entry instead of tokenizing the same file again.
+    '''
+
+    def __init__(self, cacheDir=DEFAULT_TOKEN_CACHE_DIR, maxSize=DEFAULT_TOKEN_CACHE_SIZE):
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+        self.size = sum([size for _, size, _ in self._entries()])
+
+    def getKey(self, path):
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = sha.new(f.read()).hexdigest()
+        return sha.new('%d\0%s\0%d\0%r\0%s' % (TOKEN_CACHE_VERSION, path, st.st_size, st.st_mtime, digest)).hexdigest()
+
+    def get(self, key):
+        '''
+        returns cached tokens of the entry or None
+        '''
+        entryPath = os.path.join(self.cacheDir, key)
+        try:
+            with open(entryPath, 'rb') as f:
+                tokens = marshal.load(f)
+        except (IOError, EOFError, ValueError, TypeError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(entryPath, None)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return deque(tokens)
+
+    def put(self, key, tokens):
+        data = marshal.dumps(list(tokens))
+
+        #
+        # write to a temporary file first so that other workers never see a partial entry
+        #
+        fd, tmpPath = tempfile.mkstemp(dir=self.cacheDir, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmpPath, os.path.join(self.cacheDir, key))
+
+        self.size += len(data)
+        if self.size > self.maxSize:
+            self.evict()
+
+    def acquire(self, key):
+        '''
+        claim the entry. returns False if another process already claimed it
+        '''
+        try:
+            os.close(os.open(self._lockPath(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except OSError:
+            return False
+        return True
+
+    def release(self, key):
+        try:
+            os.remove(self._lockPath(key))
+        except OSError:
+            pass
+
+    def wait(self, key, timeout=TOKEN_CACHE_LOCK_TIMEOUT):
+        '''
+        wait until the process which claimed the entry stores it, then returns
+        the tokens of the entry or None
+        '''
+        lockPath = self._lockPath(key)
+        deadline = time.time() + timeout
+        while os.path.exists(lockPath):
+            if time.time() > deadline:
+                # the claiming process is gone, e.g. terminated by a canceled analysis
+                self.release(key)
+                break
+            time.sleep(0.01)
+        return self.get(key)
+
+    def evict(self):
+        '''
+        remove least recently used entries until the cache is within maxSize
+        '''
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self.size = sum([size for _, size, _ in entries])
+        while entries and self.size > self.maxSize:
+            entryPath, size, _ = entries.pop(0)
+            try:
+                os.remove(entryPath)
+            except OSError:
+                pass
+            self.size -= size
+
+    def clear(self):
+        for entryPath, _, _ in self._entries():
+            try:
+                os.remove(entryPath)
+            except OSError:
+                pass
+        self.size = 0
+
+    def _lockPath(self, key):
+        return os.path.join(self.cacheDir, '.lock%s' % key)
+
+    def _entries(self):
+        entries = deque()
+        for name in os.listdir(self.cacheDir):
+            if name.startswith('.'):
+                continue
+            entryPath = os.path.join(self.cacheDir, name)
+            try:
+                st = os.stat(entryPath)
+            except OSError:
+                continue
+            entries.append((entryPath, st.st_size, st.st_mtime))
+        return entries
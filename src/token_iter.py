@@ -1,7 +1,12 @@
 from collections import deque
+from itertools import islice
 from scanner import TOK_ROW
 
 
+# number of tokens BufferedTokenIterator takes from the source at a time
+TOKEN_BUFFER_SIZE = 4096
+
+
 class TokenIterator:
 
     def __init__(self, iTokens):
@@ -65,3 +70,45 @@ class TokenIterator:
         except StopIteration:
             return None
 
+
+
+class BufferedTokenIterator:
+    '''
+    Lookahead and getToken() of TokenIterator over a list buffer.
+
+    The parser looks ahead several times per token, so a lookahead is an
+    index into the buffer rather than a refill of a cache deque. Tokens are
+    taken from the source TOKEN_BUFFER_SIZE at a time, so the buffer does not
+    hold a whole translation unit.
+    '''
+
+    def __init__(self, iTokens):
+        self.setTokens(iTokens)
+
+    def setTokens(self, iTokens):
+        self.tokens = iTokens
+        self.iter = iter(iTokens)
+        self.buf = []
+        self.pos = 0
+        self.end = 0
+
+    def _fill(self, num):
+        '''
+        make num tokens available from pos. returns False if there are fewer left
+        '''
+        self.buf = self.buf[self.pos:]
+        self.buf.extend(islice(self.iter, TOKEN_BUFFER_SIZE))
+        self.pos = 0
+        self.end = len(self.buf)
+        return num <= self.end
+
+    def lookaheadToken(self, num):
+        if self.pos + num > self.end and not self._fill(num):
+            return None
+        return self.buf[self.pos + num - 1]
+
+    def getToken(self):
+        if self.pos >= self.end and not self._fill(1):
+            return None
+        self.pos += 1
+        return self.buf[self.pos - 1]
@@ -0,0 +1,87 @@
+import gzip
+
+from scanner_types import *
+
+
+# number of padded tokens joined into a single write
+WRITE_CHUNK_TOKENS = 4096
+
+
+class TokenWriter:
+    '''
+    Writes the tokens a preprocessor saves for a file while it preprocesses it.
+
+    Each token is padded with newlines and spaces to its row and column, so the
+    output lines up with the source. The last token is held back until the
+    next one comes, because a directive takes its '#' back with pop() once it
+    knows the directive is not saved. With compress the file is gzipped and
+    gets a .gz suffix.
+    '''
+
+    def __init__(self, path, compress=False):
+        self.path = '%s.gz' % path if compress else path
+        self.f = gzip.open(self.path, 'wb') if compress else open(self.path, 'wb')
+        self.parts = []
+        self.pending = None
+        self.prevTok = None
+        self.row = 1
+        self.col = 1
+
+    def append(self, token):
+        if self.pending is not None:
+            self._write(self.pending)
+        self.pending = token
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token)
+
+    def pop(self):
+        assert self.pending is not None, 'pop from %s without a pending token' % self.path
+        token = self.pending
+        self.pending = None
+        return token
+
+    def close(self):
+        if self.pending is not None:
+            self._write(self.pending)
+            self.pending = None
+        self.f.write(''.join(self.parts))
+        self.f.close()
+
+    def _write(self, token):
+        padding = ''
+
+        if token[TOK_ROW] > self.row:
+            delta = token[TOK_ROW] - self.row
+            padding = '\n' * delta
+            self.row += delta
+            self.col = 1
+
+        if token[TOK_ROW] == self.row and token[TOK_COL] > self.col:
+            delta = token[TOK_COL] - self.col
+            padding = '%s%s' % (padding, ' ' * delta)
+            self.col += delta
+
+        if not padding and not (token[TOK_TYPE] & TOK_OPERATOR) and self.prevTok and not (self.prevTok[TOK_TYPE] & TOK_OPERATOR):
+            padding = ' '
+
+        if padding:
+            self.parts.append(padding)
+        self.parts.append(token[TOK_VALUE])
+        if len(self.parts) >= WRITE_CHUNK_TOKENS:
+            self.f.write(''.join(self.parts))
+            del self.parts[:]
+
+        if token[TOK_TYPE] == TOK_COMMENT and token[TOK_VALUE].startswith('/*'):
+            newlines = token[TOK_VALUE].count('\n')
+            if newlines > 0:
+                self.row += newlines - 1
+                idx = token[TOK_VALUE].rfind('\n')
+                self.col = len(token[TOK_VALUE][idx+1:])
+            else:
+                self.col += len(token[TOK_VALUE])
+        else:
+            self.col += len(token[TOK_VALUE])
+
+        self.prevTok = token
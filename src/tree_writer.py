@@ -0,0 +1,99 @@
+import json
+
+from scanner_types import TOK_VALUE
+from parser_types import NODE_TYPE, NODE_VALUE, node_type_to_str
+
+
+XML_INDENT = '    '
+
+
+def escape_xml(data):
+    '''
+    escape text the way xml.dom.minidom does
+    '''
+    return data.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+class XmlTreeWriter:
+    '''
+    Writes parse trees to an XML file one external declaration at a time.
+
+    The file is the same as toprettyxml() of a minidom document with a
+    PARSE_TREE element per translation unit, but only the declaration being
+    written is held in memory.
+    '''
+
+    extension = 'xml'
+
+    def __init__(self, path):
+        self.f = open(path, 'w')
+        self.f.write('<?xml version="1.0" ?>\n')
+        self.empty = True
+
+    def write(self, node):
+        if self.empty:
+            self.f.write('<PARSE_TREE>\n')
+            self.empty = False
+        parts = []
+        self._write(node, XML_INDENT, parts)
+        self.f.write(''.join(parts))
+
+    def _write(self, node, indent, parts):
+        name = node_type_to_str[node[NODE_TYPE]]
+        children = node[NODE_VALUE]
+        if not children:
+            parts.append('%s<%s/>\n' % (indent, name))
+        elif len(children) == 1 and len(children[0]) == 4:
+            parts.append('%s<%s>%s</%s>\n' % (indent, name, escape_xml(children[0][TOK_VALUE]), name))
+        else:
+            parts.append('%s<%s>\n' % (indent, name))
+            childIndent = indent + XML_INDENT
+            for n in children:
+                if len(n) == 4:
+                    parts.append('%s%s\n' % (childIndent, escape_xml(n[TOK_VALUE])))
+                else:
+                    self._write(n, childIndent, parts)
+            parts.append('%s</%s>\n' % (indent, name))
+
+    def close(self):
+        self.f.write('<PARSE_TREE/>\n' if self.empty else '</PARSE_TREE>\n')
+        self.f.close()
+
+
+class JsonLinesTreeWriter:
+    '''
+    Writes parse trees as a JSON array per external declaration and line.
+
+    A node is [name, child, ...] and a token [type, value, row, col]. Token
+    values are read as UTF-8, or as latin-1 in a declaration which is not
+    valid UTF-8, so that no byte of the source is lost.
+    '''
+
+    extension = 'jsonl'
+
+    def __init__(self, path):
+        self.f = open(path, 'w')
+
+    def write(self, node):
+        tree = self._encode(node)
+        try:
+            line = json.dumps(tree, separators=(',', ':'))
+        except UnicodeDecodeError:
+            line = json.dumps(tree, encoding='latin-1', separators=(',', ':'))
+        self.f.write(line)
+        self.f.write('\n')
+
+    def _encode(self, node):
+        if len(node) == 4:
+            return node
+        return [node_type_to_str[node[NODE_TYPE]]] + [self._encode(n) for n in node[NODE_VALUE]]
+
+    def close(self):
+        self.f.close()
+
+
+# writers of the parse tree formats, see Parser(treeFormat=...)
+TREE_WRITERS = {
+    'xml'  : XmlTreeWriter,
+    'jsonl': JsonLinesTreeWriter,
+}
@@ -0,0 +1,132 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from analysis import analyze, ProgressWriter, DEFAULT_LOG_LEVEL
+
+
+#
+# api.h uses myint of types.h without including it, so it is not re-analyzed
+# when types.h changes
+#
+SOURCES = {
+    'types.h': 'typedef int myint;\nenum color { RED, GREEN };\nstruct point { int x; };\nextern int counter;\nint next(void);\n',
+    'api.h'  : 'myint api(struct point *p, enum color c);\nstatic int api_next(void) { struct point p; p.x = GREEN; return next() + counter + p.x; }\ntypedef myint api_t;\n',
+    'onlyb.h': '#define ONLYB 1\nint onlyb(int x);\n',
+    'b.c'    : '#include "types.h"\n#include "onlyb.h"\nint b(void) { return onlyb(ONLYB) + next(); }\n',
+    'main.c' : '#include "types.h"\n#include "api.h"\nint main(void)\n{\n    if (counter)\n        return api(0, RED);\n    else if (next())\n        return 1;\n    else\n        return 0;\n}\n',
+}
+
+# rows which differ from run to run
+IGNORED_TABLES = ('AnalysisTime', 'Metrics')
+
+
+def dump_db(path):
+    '''
+    returns the rows of every table, with the rowids a row refers to replaced
+    by the rows they refer to, so that databases built in another order compare
+    equal. a reference to a row which does not exist becomes ('missing', table)
+    '''
+    conn = sqlite3.connect(path)
+    try:
+        tables = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+                  if name not in IGNORED_TABLES]
+        columns = dict([(t, [c[1] for c in conn.execute('PRAGMA table_info(%s)' % t)]) for t in tables])
+        refs = dict([(t, dict([(fk[3], fk[2]) for fk in conn.execute('PRAGMA foreign_key_list(%s)' % t)])) for t in tables])
+        rows = dict([(t, dict([(r[0], r[1:]) for r in conn.execute('SELECT rowid, * FROM %s' % t)])) for t in tables])
+    finally:
+        conn.close()
+
+    keys = {}
+    def key(t, rowid, path=()):
+        if rowid is None:
+            return None
+        if not rows[t].has_key(rowid):
+            return ('missing', t)
+        if (t, rowid) in path:
+            return ('cycle', t)
+        if not keys.has_key((t, rowid)):
+            keys[(t, rowid)] = tuple([key(refs[t][c], v, path + ((t, rowid),)) if refs[t].has_key(c) else v
+                                      for c, v in zip(columns[t], rows[t][rowid])])
+        return keys[(t, rowid)]
+
+    return dict([(t, sorted([key(t, rowid) for rowid in rows[t]])) for t in tables])
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='test_incremental-')
+        for name, text in SOURCES.items():
+            self.write(name, text)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, True)
+
+    def write(self, name, text):
+        f = open(os.path.join(self.dir, name), 'w')
+        f.write(text)
+        f.close()
+
+    def analyze(self, dbName, incremental=False, srcFiles=('main.c',)):
+        ppCfg = {'appIncDirs': [self.dir],
+                 'sysIncDirs': [],
+                 'logLevel': DEFAULT_LOG_LEVEL,
+                 'logPath': os.path.join(self.dir, 'preprocessor.log'),
+                 'predefSnapshotDir': '',
+                 }
+        parserCfg = {'logLevel': DEFAULT_LOG_LEVEL,
+                     'logPath': os.path.join(self.dir, 'parser.log'),
+                     }
+        dbPath = os.path.join(self.dir, dbName)
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            analyze(ProgressWriter(StringIO()), dbPath, ppCfg, parserCfg, [os.path.join(self.dir, name) for name in srcFiles],
+                    incremental=incremental)
+        finally:
+            sys.stdout = stdout
+        return dbPath
+
+    def assertSameAsFullRebuild(self, incPath, srcFiles=('main.c',)):
+        incTables = dump_db(incPath)
+        fullTables = dump_db(self.analyze('full.sqlite', srcFiles=srcFiles))
+        self.assertEqual(sorted(incTables.keys()), sorted(fullTables.keys()))
+        for tableName in sorted(fullTables.keys()):
+            self.assertEqual(incTables[tableName], fullTables[tableName], 'incremental %s differs from a full rebuild' % tableName)
+
+    def test_usages_of_changed_header(self):
+        incPath = self.analyze('incremental.sqlite')
+        self.write('types.h', '/* moved */\n\n' + SOURCES['types.h'])
+        self.analyze('incremental.sqlite', incremental=True)
+
+        apiUsages = [u for u in dump_db(incPath)['TypedefUsage'] if u[2][0].endswith('api.h')]
+        self.assertTrue(apiUsages)
+        self.assertEqual([(u[0][4], u[0][6][0]) for u in apiUsages], [('myint', os.path.join(self.dir, 'types.h'))] * len(apiUsages))
+        self.assertSameAsFullRebuild(incPath)
+
+    def test_changed_source(self):
+        incPath = self.analyze('incremental.sqlite')
+        self.write('main.c', SOURCES['main.c'].replace('return 1;', 'return 2;\n'))
+        self.analyze('incremental.sqlite', incremental=True)
+        self.assertSameAsFullRebuild(incPath)
+
+    def test_header_no_longer_included(self):
+        srcFiles = ('main.c', 'b.c')
+        incPath = self.analyze('incremental.sqlite', srcFiles=srcFiles)
+        self.write('b.c', 'int b(void) { return 0; }\n')
+        self.analyze('incremental.sqlite', incremental=True, srcFiles=srcFiles)
+
+        self.assertFalse([f for f in dump_db(incPath)['File'] if f[0].endswith('onlyb.h')])
+        self.assertSameAsFullRebuild(incPath, srcFiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+from distutils.spawn import find_executable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from preprocessor import Preprocessor
+from predef_snapshot import PredefSnapshot
+
+
+def probe():
+    raise AssertionError('cpp -v probed')
+
+
+@unittest.skipIf(find_executable('cpp') is None, 'no cpp to snapshot')
+class PredefSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='test_predef_snapshot-')
+        self.getDefaultIncDirs = Preprocessor.__dict__['getDefaultIncDirs']
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+        self.reset()
+
+    def tearDown(self):
+        Preprocessor.getDefaultIncDirs = self.getDefaultIncDirs
+        sys.stdout = self.stdout
+        self.reset()
+        shutil.rmtree(self.dir, True)
+
+    def reset(self):
+        '''
+        forget what this process learnt of the compiler, as a new run would
+        '''
+        Preprocessor.predefMacros = None
+        Preprocessor.sysIncDirs = None
+        Preprocessor.appIncDirs = None
+        Preprocessor.predefInfo = None
+        Preprocessor.predefMacroKeys.clear()
+        Preprocessor.predefMacroDefs.clear()
+
+    def test_inc_dirs_added_on_demand(self):
+        Preprocessor.getDefaultIncDirs = staticmethod(probe)
+        Preprocessor(predefSnapshotDir=self.dir).preprocess_predef()
+        snapshot = PredefSnapshot(self.dir).load()
+        self.assertTrue(snapshot['predefInfo'])
+        self.assertFalse(snapshot.has_key('sysIncDirs'))
+
+        self.reset()
+        Preprocessor.getDefaultIncDirs = self.getDefaultIncDirs
+        incDirs = Preprocessor.getIncDirs(self.dir)
+        snapshot = PredefSnapshot(self.dir).load()
+        self.assertEqual((snapshot['sysIncDirs'], snapshot['appIncDirs']), incDirs)
+        self.assertTrue(snapshot['predefInfo'])
+
+        self.reset()
+        Preprocessor.getDefaultIncDirs = staticmethod(probe)
+        self.assertEqual(Preprocessor.getIncDirs(self.dir), incDirs)
+
+    def test_disabled_snapshot(self):
+        Preprocessor.getIncDirs(self.dir)
+        self.reset()
+        Preprocessor.getDefaultIncDirs = staticmethod(probe)
+        self.assertRaises(AssertionError, Preprocessor.getIncDirs, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,18 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from db_manager import DatabaseManager
+
+
+class QueryPlanTest(unittest.TestCase):
+
+    def test_no_full_table_scans(self):
+        plans = [(' '.join(sql.split()), [p[-1] for p in plan]) for sql, plan in DatabaseManager.checkQueryPlans()]
+        self.assertEqual(plans, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
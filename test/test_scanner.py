@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', 'src'))
+
+from scanner import Scanner
+
+
+#
+# sources on which the regex scanner has to give the tokens of the state machine
+#
+EDGE_CASES = {
+    'unterminated string'         : 'char *s = "abc\nint i;\n',
+    'unterminated string at EOF'  : 'char *s = "abc',
+    'unterminated char'           : "char c = 'a\nint i;\n",
+    'unterminated comment'        : 'int i; /* comment\nint j;\n',
+    'unterminated comment star'   : 'int i; /* comment **',
+    'comment opened at EOF'       : 'int i; /*',
+    'escape at EOF'               : 'char *s = "abc\\',
+    'char escape at EOF'          : "char c = '\\",
+    'escaped quotes'              : 'char *s = "a\\"b\\\\"; char c = \'\\\'\';\n',
+    'line continuation'           : '#define MAX(a, b) \\\n    ((a) > (b) ? \\\n     (a) : (b))\nint i = MAX(1, 2);\n',
+    'continued string'            : 'char *s = "abc\\\ndef";\n',
+    'continued line comment'      : '// comment \\\nint i;\nint j;\n',
+    'digraphs'                    : '%:define X <: 1 :>\nint a<:2:> = <% 1, 2 %>;\n%:%: x\n',
+    'multi-line comment'          : 'int i; /* one\n * two\n   three */ int j;\n/**/int k;/***/\n',
+    'comment markers in strings'  : 'char *s = "/* not */ // a comment";\n',
+    'numbers'                     : 'x = 0x1fUL + 1.5e-3f + .5 + 07 + 1e+10L;\n',
+    'operators'                   : 'a<<=b>>=c->d++--e...f&&g||h!=i==j;\n',
+    'no trailing newline'         : 'int i',
+    'CRLF line endings'           : 'int i;\r\nint j;\r\n',
+    'empty'                       : '',
+}
+
+
+class ScannerParityTest(unittest.TestCase):
+    '''
+    Scanner(useRegex=True) is opt-in, so nothing else stops it from drifting
+    from the character state machine.
+    '''
+
+    def assertParity(self, tokens, regexTokens, name):
+        self.assertEqual(list(tokens), list(regexTokens), 'regex scanner differs on %s' % name)
+
+    def test_files(self):
+        for name in ('test.c', 'test.h'):
+            path = os.path.join(TEST_DIR, name)
+            self.assertParity(Scanner(path).tokenize(), Scanner(path, useRegex=True).tokenize(), name)
+
+    def test_edge_cases(self):
+        for name, source in sorted(EDGE_CASES.items()):
+            self.assertParity(Scanner(iStr=source).tokenize(), Scanner(iStr=source, useRegex=True).tokenize(), name)
+
+
+if __name__ == '__main__':
+    unittest.main()